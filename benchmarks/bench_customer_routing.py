@@ -0,0 +1,75 @@
+"""Throughput of customer routing: naive per-client substring scan vs. the prebuilt alias index.
+
+    python benchmarks/bench_customer_routing.py --names 1000000 --clients 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from customer_routing import CustomerRouter, extract_customer_name
+
+
+def make_clients(count, rng):
+    return {f'Client {i}': [f'client{i:05d}', f'acct-{rng.randrange(10**8):08d}'] for i in range(count)}
+
+
+def make_names(count, clients, unique, rng):
+    aliases = [alias for client_aliases in clients.values() for alias in client_aliases]
+    pool = [f'"{rng.choice(aliases)} {rng.choice(["EU", "US", "APAC"])}" | Ticket {i}' for i in range(unique)]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def naive_route(names, clients):
+    aliases_by_client = list(clients.items())
+    routed = 0
+    for name in names:
+        customer = extract_customer_name(name)
+        if not customer:
+            continue
+        customer_lc = customer.lower()
+        routed += sum(1 for _, aliases in aliases_by_client if any(alias in customer_lc for alias in aliases))
+    return routed
+
+
+def indexed_route(names, router):
+    return sum(len(router.route(name)) for name in names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--names', type=int, default=1_000_000)
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--unique', type=int, default=50_000, help='distinct task names in the stream')
+    parser.add_argument('--naive-sample', type=int, default=2_000, help='names timed with the naive scan')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    clients = make_clients(args.clients, rng)
+    names = make_names(args.names, clients, args.unique, rng)
+
+    started = time.perf_counter()
+    router = CustomerRouter(clients)
+    build_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    routed = indexed_route(names, router)
+    indexed_seconds = time.perf_counter() - started
+
+    sample = names[:args.naive_sample]
+    started = time.perf_counter()
+    naive_routed = naive_route(sample, clients)
+    naive_seconds = time.perf_counter() - started
+    assert naive_routed == indexed_route(sample, router), 'indexed routing disagrees with the naive scan'
+
+    print(f"clients={args.clients} names={args.names} unique={args.unique}")
+    print(f"index build:  {build_seconds:.3f}s")
+    print(f"indexed:      {args.names / indexed_seconds:,.0f} names/s ({routed} routes)")
+    print(f"naive scan:   {len(sample) / naive_seconds:,.0f} names/s (sample of {len(sample)})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""Local stand-in for the ClickUp, Asana and Google Sheets APIs, for load tests on a laptop.
+
+    python benchmarks/fake_api_server.py --port 8099 --tasks-per-list 20000 --latency-ms 80 --rate-limit 0.02
+
+then point the services at it:
+
+    export CLICKUP_BASE_URL=http://127.0.0.1:8099/api/v2
+    export ASANA_BASE_URL=http://127.0.0.1:8099/api/1.0
+    export SHEETS_API_ENDPOINT=http://127.0.0.1:8099     # plain http => no Google OAuth
+
+Served endpoints:
+  ClickUp  GET  /api/v2/team, /api/v2/list/{id}/task?page=, /api/v2/list/{id}/field, /api/v2/task/{id}
+  Asana    GET  /api/1.0/users/me, /workspaces, /projects, /projects/{id}/sections, /tasks?section=,
+                /tasks/{id}, /tasks/{id}/stories, /events      POST /api/1.0/batch
+  Sheets   GET  /v4/spreadsheets/{id}, /v4/spreadsheets/{id}/values/{range}
+           PUT  /v4/spreadsheets/{id}/values/{range}
+           POST /v4/spreadsheets/{id}:batchUpdate, /v4/spreadsheets/{id}/values:batchUpdate
+  Server   GET  /_stats (request counts per route, 429s injected)
+
+Payloads come from payloads.py, so they are seeded and reproducible. Sheets data is held in a sheets_store.SheetsStore.
+"""
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+try:
+    from payloads import ClickUpPayloads, AsanaPayloads, clickup_task
+    from sheets_store import SheetsStore
+except ModuleNotFoundError:
+    from benchmarks.payloads import ClickUpPayloads, AsanaPayloads, clickup_task
+    from benchmarks.sheets_store import SheetsStore
+
+
+class FakeApi:
+    """Routing and fault injection shared by every request handler thread"""
+
+    def __init__(self, tasks_per_list=1000, asana_tasks=1000, asana_sections=12, page_size=100,
+                 latency_ms=0.0, jitter_ms=0.0, rate_limit=0.0, retry_after=1, seed=1):
+        self.clickup = ClickUpPayloads([], 0, seed=seed, page_size=page_size, default_count=tasks_per_list)
+        self.asana = AsanaPayloads(asana_tasks, sections=asana_sections, seed=seed)
+        self.sheets = SheetsStore()
+        self.page_size = page_size
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': {}, 'rate_limited': 0}
+
+    def _count(self, route):
+        with self.lock:
+            self.stats['requests'][route] = self.stats['requests'].get(route, 0) + 1
+            throttle = self.rate_limit and self.rng.random() < self.rate_limit
+            if throttle:
+                self.stats['rate_limited'] += 1
+            delay = self.latency + (self.rng.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+        return throttle, max(delay, 0)
+
+    def handle(self, method, path, query, body):
+        """Returns (status, json body, extra headers)"""
+        route, response = self._route(method, path, query, body)
+        if route == '_stats':
+            with self.lock:
+                return 200, json.loads(json.dumps(self.stats)), {}
+        throttle, delay = self._count(route)
+        if delay:
+            time.sleep(delay)
+        if throttle:
+            return 429, {'err': 'Rate limit reached', 'errors': [{'message': 'Rate limited'}]}, {
+                'Retry-After': str(self.retry_after)}
+        status, payload = response()
+        return status, payload, {}
+
+    def _route(self, method, path, query, body):
+        q = {key: values[-1] for key, values in query.items()}
+        parts = [unquote(part) for part in path.strip('/').split('/')]
+
+        if path == '/_stats':
+            return '_stats', None
+
+        # ClickUp
+        if parts[:2] == ['api', 'v2']:
+            rest = parts[2:]
+            if rest == ['team']:
+                return 'clickup.team', lambda: (200, {'teams': [{'id': '1', 'name': 'Local'}]})
+            if len(rest) == 3 and rest[0] == 'list' and rest[2] == 'task':
+                return 'clickup.list.task', lambda: (200, self.clickup.page(rest[1], int(q.get('page', 0))))
+            if len(rest) == 2 and rest[0] == 'task':
+                def task():
+                    list_id, _, number = rest[1].rpartition('-')
+                    if not list_id or not number.isdigit():
+                        return 404, {'err': 'Task not found', 'ECODE': 'ITEM_015'}
+                    return 200, clickup_task(self.clickup.seed, list_id, int(number))
+                return 'clickup.task', task
+            if len(rest) == 3 and rest[0] == 'list' and rest[2] == 'field':
+                return 'clickup.list.field', lambda: (200, self.clickup.fields(rest[1]))
+
+        # Asana
+        if parts[:2] == ['api', '1.0']:
+            rest = parts[2:]
+            if rest == ['users', 'me']:
+                return 'asana.users.me', lambda: (200, {'data': {'gid': 'u1', 'name': 'Local User'}})
+            if rest == ['workspaces']:
+                return 'asana.workspaces', lambda: (200, {'data': [{'gid': 'ws-1', 'name': 'wurl.com'}], 'next_page': None})
+            if rest == ['projects']:
+                return 'asana.projects', lambda: (200, {'data': [
+                    {'gid': self.asana.project_id, 'name': 'Transmit Live SSAI Dashboard'}], 'next_page': None})
+            if len(rest) == 3 and rest[0] == 'projects' and rest[2] == 'sections':
+                return 'asana.sections', lambda: (200, {'data': self.asana.sections, 'next_page': None})
+            if rest == ['tasks']:
+                limit = min(int(q.get('limit', 100)), 100)
+                return 'asana.tasks', lambda: (200, self.asana.task_page(q.get('section'), int(q.get('offset', 0)), limit))
+            if len(rest) == 2 and rest[0] == 'tasks':
+                def task():
+                    found = self.asana.task_with_memberships(rest[1])
+                    return (200, {'data': found}) if found else (404, {'errors': [{'message': 'Not found'}]})
+                return 'asana.task', task
+            if len(rest) == 3 and rest[0] == 'tasks' and rest[2] == 'stories':
+                return 'asana.stories', lambda: (200, self.asana.stories(rest[1]))
+            if rest == ['events']:
+                def events():
+                    token = f"sync-{int(time.time())}"
+                    if not q.get('sync'):
+                        return 412, {'errors': [{'message': 'Sync token invalid or too old'}], 'sync': token}
+                    return 200, {'data': [], 'sync': token, 'has_more': False}
+                return 'asana.events', events
+            if rest == ['batch'] and method == 'POST':
+                return 'asana.batch', lambda: (200, {'data': [
+                    self._batch_action(action) for action in (body or {}).get('data', {}).get('actions', [])
+                ]})
+
+        # Google Sheets v4
+        if parts[:2] == ['v4', 'spreadsheets'] and len(parts) >= 3:
+            spreadsheet_id, _, action = parts[2].partition(':')
+            if len(parts) == 3 and method == 'GET':
+                return 'sheets.get', lambda: self.sheets.get(spreadsheet_id)
+            if len(parts) == 3 and action == 'batchUpdate':
+                return 'sheets.batchUpdate', lambda: self.sheets.batch_update(spreadsheet_id, body or {})
+            if len(parts) == 4 and parts[3] == 'values:batchUpdate':
+                def values_batch():
+                    responses = []
+                    for entry in (body or {}).get('data', []):
+                        status, result = self.sheets.write(spreadsheet_id, entry['range'], entry.get('values', []))
+                        if status != 200:
+                            return status, result
+                        responses.append(result)
+                    return 200, {'spreadsheetId': spreadsheet_id, 'responses': responses,
+                                 'totalUpdatedRows': sum(r['updatedRows'] for r in responses)}
+                return 'sheets.values.batchUpdate', values_batch
+            if len(parts) >= 5 and parts[3] == 'values':
+                range_name = '/'.join(parts[4:])
+                if method == 'GET':
+                    return 'sheets.values.get', lambda: self.sheets.read(
+                        spreadsheet_id, range_name, q.get('majorDimension', 'ROWS'))
+                if method == 'PUT':
+                    return 'sheets.values.update', lambda: self.sheets.write(
+                        spreadsheet_id, range_name, (body or {}).get('values', []))
+
+        return 'unknown', lambda: (404, {'error': f'No stand-in for {method} {path}'})
+
+    def _batch_action(self, action):
+        relative = action.get('relative_path', '')
+        parts = relative.strip('/').split('/')
+        if len(parts) == 3 and parts[0] == 'tasks' and parts[2] == 'stories':
+            return {'status_code': 200, 'body': self.asana.stories(parts[1])}
+        return {'status_code': 404, 'body': {'errors': [{'message': f'No stand-in for {relative}'}]}}
+
+
+def make_handler(api):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 so clients keep connections alive, as against the real APIs
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _dispatch(self, method):
+            url = urlparse(self.path)
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+            try:
+                body = json.loads(raw) if raw else None
+            except ValueError:
+                body = None
+            status, payload, headers = api.handle(method, url.path, parse_qs(url.query), body)
+            data = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=UTF-8')
+            if 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+                data = gzip.compress(data, 1)
+                self.send_header('Content-Encoding', 'gzip')
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._dispatch('GET')
+
+        def do_POST(self):
+            self._dispatch('POST')
+
+        def do_PUT(self):
+            self._dispatch('PUT')
+
+    return Handler
+
+
+def make_server(api, host='127.0.0.1', port=0):
+    """ThreadingHTTPServer serving `api`; port 0 picks a free port (see server.server_address)"""
+    server = ThreadingHTTPServer((host, port), make_handler(api))
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the ClickUp, Asana and Google Sheets APIs.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--tasks-per-list', type=int, default=1000, help='ClickUp tasks served for every list ID')
+    parser.add_argument('--asana-tasks', type=int, default=1000, help='tasks in the Asana project')
+    parser.add_argument('--asana-sections', type=int, default=12)
+    parser.add_argument('--page-size', type=int, default=100, help='ClickUp tasks per page')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='+/- random spread on the latency')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='fraction of requests answered 429')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    api = FakeApi(
+        tasks_per_list=args.tasks_per_list, asana_tasks=args.asana_tasks, asana_sections=args.asana_sections,
+        page_size=args.page_size, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        rate_limit=args.rate_limit, retry_after=args.retry_after, seed=args.seed,
+    )
+    server = make_server(api, args.host, args.port)
+    base = f"http://{args.host}:{server.server_address[1]}"
+    print(f"Fake APIs listening on {base}")
+    print(f"  export CLICKUP_BASE_URL={base}/api/v2")
+    print(f"  export ASANA_BASE_URL={base}/api/1.0")
+    print(f"  export SHEETS_API_ENDPOINT={base}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Seeded generators for realistic ClickUp and Asana API payloads.
+
+Everything is derived from (seed, list/section, page) so any page can be regenerated on
+demand without holding a million raw tasks in memory, and two runs see identical data.
+"""
+import random
+
+CLIENT_ALIASES = ['Dirt Vision', 'DirtVision', 'DV', 'Gotham', 'YES Network', 'Marquee', 'Wurl', 'Yahoo']
+OTHER_CUSTOMERS = ['Acme Streaming', 'Blue Harbor TV', 'Northwind Media', 'Contoso Sports', 'Fabrikam FAST']
+SUBJECTS = ['Stream down', 'Ads missing in pod', 'EPG not updating', 'Login bug', 'Captions out of sync',
+            'Bitrate ladder request', 'SCTE markers dropped', 'Dashboard slow', 'Feed delayed', 'Thumbnail broken']
+STATUSES = ['to do', 'in progress', 'review', 'blocked', 'complete', 'closed']
+PRIORITIES = [None, 'low', 'normal', 'high', 'urgent']
+WORDS = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt '
+         'ut labore et dolore magna aliqua').split()
+
+FILER_FIELD_ID = 'cf-work-email'
+CLICKUP_PAGE_SIZE = 100
+ASANA_PAGE_LIMIT = 100
+
+
+def _rng(seed, *parts):
+    return random.Random(f"{seed}:" + ":".join(str(part) for part in parts))
+
+
+def _text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def task_name(rng):
+    """A task name following the tracker's conventions (and its usual mistakes)"""
+    roll = rng.random()
+    customer = rng.choice(CLIENT_ALIASES) if rng.random() < 0.7 else rng.choice(OTHER_CUSTOMERS)
+    subject = rng.choice(SUBJECTS)
+    if roll < 0.55:
+        return f"{customer} | {subject}"
+    if roll < 0.75:
+        return f'"{customer}" | {subject}'
+    if roll < 0.8:
+        return f"| {subject}"
+    return f"{subject} for {customer}"
+
+
+def clickup_custom_fields(rng, task_number):
+    fields = [{
+        'id': f'cf-{i}', 'name': f'Field {i}', 'type': 'short_text',
+        'type_config': {}, 'date_created': '1690000000000', 'hide_from_guests': False,
+        'value': _text(rng, 3) if rng.random() < 0.5 else None, 'required': False,
+    } for i in range(11)]
+    email = f'filer{task_number % 997}@example.com' if rng.random() < 0.8 else ''
+    fields.insert(rng.randrange(len(fields)), {
+        'id': FILER_FIELD_ID, 'name': 'Work email address?', 'type': 'email',
+        'type_config': {}, 'date_created': '1690000000000', 'hide_from_guests': False,
+        'value': email, 'required': False,
+    })
+    return fields
+
+
+def clickup_task(seed, list_id, task_number):
+    rng = _rng(seed, 'clickup', list_id, task_number)
+    priority = rng.choice(PRIORITIES)
+    updated = 1700000000000 + task_number * 1000
+    return {
+        'id': f'{list_id}-{task_number}',
+        'custom_id': None,
+        'name': task_name(rng),
+        'text_content': _text(rng, 60),
+        'description': _text(rng, 60),
+        'status': {'status': rng.choice(STATUSES), 'color': '#d3d3d3', 'type': 'custom', 'orderindex': 1},
+        'orderindex': str(task_number),
+        'date_created': str(updated - 86400000),
+        'date_updated': str(updated),
+        'date_closed': None,
+        'creator': {'id': 1, 'username': 'creator', 'color': '#000', 'email': 'creator@example.com'},
+        'assignees': [{'id': 2, 'username': rng.choice(['sam', 'alex', 'jordan']), 'color': '#111',
+                       'email': 'owner@example.com', 'profilePicture': None}],
+        'watchers': [{'id': i, 'username': f'watcher{i}'} for i in range(3)],
+        'checklists': [],
+        'tags': [{'name': rng.choice(['ssai', 'epg', 'player']), 'tag_fg': '#fff', 'tag_bg': '#000'}],
+        'priority': {'id': '1', 'priority': priority, 'color': '#f00', 'orderindex': '1'} if priority else None,
+        'due_date': None,
+        'custom_fields': clickup_custom_fields(rng, task_number),
+        'list': {'id': list_id, 'name': 'List', 'access': True},
+        'folder': {'id': 'folder', 'name': 'Folder', 'hidden': False, 'access': True},
+        'space': {'id': 'space'},
+        'url': f'https://app.clickup.com/t/{list_id}-{task_number}',
+    }
+
+
+class ClickUpPayloads:
+    """`total_tasks` spread evenly over `list_ids`, served as /list/{id}/task pages"""
+
+    def __init__(self, list_ids, total_tasks, seed=1, page_size=CLICKUP_PAGE_SIZE, default_count=0):
+        self.list_ids = list(list_ids)
+        self.seed = seed
+        self.page_size = page_size
+        # Tasks served for a list that isn't in list_ids (the local API server accepts any list)
+        self.default_count = default_count
+        self.counts = {}
+        if self.list_ids:
+            base, extra = divmod(total_tasks, len(self.list_ids))
+            self.counts = {list_id: base + (1 if i < extra else 0) for i, list_id in enumerate(self.list_ids)}
+
+    def page(self, list_id, page):
+        count = self.counts.get(list_id, self.default_count)
+        start = page * self.page_size
+        end = min(start + self.page_size, count)
+        tasks = [clickup_task(self.seed, list_id, number) for number in range(start, end)]
+        return {'tasks': tasks, 'last_page': end >= count}
+
+    def fields(self, list_id):
+        fields = [{'id': f'cf-{i}', 'name': f'Field {i}', 'type': 'short_text'} for i in range(11)]
+        fields.append({'id': FILER_FIELD_ID, 'name': 'Work email address?', 'type': 'email'})
+        return {'fields': fields}
+
+
+class AsanaPayloads:
+    """One project: `sections` sections sharing `total_tasks` tasks, each with a few stories"""
+
+    def __init__(self, total_tasks, sections=12, seed=1, project_id='proj-1'):
+        self.seed = seed
+        self.project_id = project_id
+        names = ['Submitted', 'Onboarding', 'Bootstrap / Config', 'In QA', 'Ready for Handoff', 'Live',
+                 'On Hold', 'Cancelled']
+        self.sections = [{'gid': f'sec-{i}', 'name': f'{names[i % len(names)]} {i // len(names) or ""}'.strip()}
+                         for i in range(sections)]
+        base, extra = divmod(total_tasks, sections)
+        self.counts = {s['gid']: base + (1 if i < extra else 0) for i, s in enumerate(self.sections)}
+
+    def task(self, section_gid, number):
+        rng = _rng(self.seed, 'asana', section_gid, number)
+        assigned = rng.random() < 0.8
+        return {
+            'gid': f'{section_gid}-t{number}',
+            'name': f'{rng.choice(CLIENT_ALIASES + OTHER_CUSTOMERS)} channel {number}',
+            'completed': rng.random() < 0.2,
+            'assignee': {'gid': 'u1', 'name': 'Sam Lee', 'email': 'sam@example.com'} if assigned else None,
+            'created_at': '2024-03-01T12:00:00.000Z',
+            'modified_at': f'2024-06-01T12:00:{number % 60:02d}.000Z',
+        }
+
+    def task_page(self, section_gid, offset=0, limit=ASANA_PAGE_LIMIT):
+        count = self.counts.get(section_gid, 0)
+        end = min(offset + limit, count)
+        data = [self.task(section_gid, number) for number in range(offset, end)]
+        next_page = {'offset': str(end), 'path': '/tasks', 'uri': ''} if end < count else None
+        return {'data': data, 'next_page': next_page}
+
+    def task_with_memberships(self, task_gid):
+        """GET /tasks/{gid} with memberships, or None for a gid this project never had"""
+        section_gid, _, number = task_gid.rpartition('-t')
+        if section_gid not in self.counts or not number.isdigit() or int(number) >= self.counts[section_gid]:
+            return None
+        task = self.task(section_gid, int(number))
+        task['memberships'] = [{'project': {'gid': self.project_id}, 'section': {'gid': section_gid}}]
+        return task
+
+    def stories(self, task_gid):
+        rng = _rng(self.seed, 'stories', task_gid)
+        stories = []
+        for i in range(rng.randrange(0, 9)):
+            if rng.random() < 0.4:
+                stories.append({'type': 'comment', 'text': _text(rng, 25)})
+            else:
+                stories.append({'type': 'system', 'text': 'changed the due date'})
+        return {'data': stories, 'next_page': None}
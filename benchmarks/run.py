@@ -0,0 +1,234 @@
+"""Benchmark suite for the tracker's hot paths, writing machine-readable JSON.
+
+    python benchmarks/run.py                          # 1k and 100k tasks, JSON to stdout
+    python benchmarks/run.py --sizes 1k,100k,1m --output results.json
+    python benchmarks/run.py --only routing,format_task_row --compare results.json
+
+Exports run against stubbed ClickUp/Asana/Sheets transports (see stubs.py). Payloads are
+generated before the clock starts; that time is reported as `prepare_seconds`.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from clickup_service import ClickUpService  # noqa: E402
+from asana_service import AsanaService  # noqa: E402
+from asana_sheets_service import AsanaSheetsService  # noqa: E402
+from customer_routing import extract_customer_name  # noqa: E402
+from models import TaskRecord  # noqa: E402
+from payloads import ClickUpPayloads, AsanaPayloads, task_name, PRIORITIES, STATUSES  # noqa: E402
+from stubs import StubClickUpHttp, StubAsanaHttp, StubSheetsService, install_stub_sheets  # noqa: E402
+
+SIZE_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    if text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def make_records(count, seed):
+    """TaskRecords as the exports see them, without paying for full raw payload generation"""
+    rng = random.Random(seed)
+    return [
+        TaskRecord(
+            id=str(i), name=task_name(rng), url=f'https://app.clickup.com/t/{i}',
+            severity=rng.choice(PRIORITIES) or 'normal', status=rng.choice(STATUSES),
+            filer_email=f'filer{i % 997}@example.com', board_name='Client Issues (External)', board_id='75793048'
+        )
+        for i in range(count)
+    ]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+@contextlib.contextmanager
+def quiet():
+    """The exporters print every row; keep that out of the timings and the terminal"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def bench_extract_customer_name(size, seed):
+    names = [record.name for record in make_records(size, seed)]
+    extract_customer_name.cache_clear()
+    seconds, _ = timed(lambda: [extract_customer_name(name) for name in names])
+    return seconds, {'distinct_names': len(set(names))}
+
+
+def bench_format_task_row(size, seed):
+    service = ClickUpService()
+    records = make_records(size, seed)
+    seconds, _ = timed(lambda: [service.format_task_row(record, '|' in record.name) for record in records])
+    batch_seconds, _ = timed(lambda: service.format_rows(records))
+    return seconds, {'format_rows_seconds': round(batch_seconds, 6)}
+
+
+def bench_calculate_data_ranges(size, seed):
+    service = ClickUpService()
+    rng = random.Random(seed)
+    shapes = [([None] * rng.randrange(1, 50), [None] * rng.randrange(0, 10)) for _ in range(min(size, 1000))]
+    seconds, _ = timed(lambda: [
+        service.calculate_data_ranges(2 + i % 500, *shapes[i % len(shapes)]) for i in range(size)
+    ])
+    return seconds, {}
+
+
+def bench_routing(size, seed):
+    service = ClickUpService()
+    records = make_records(size, seed)
+    seconds, partitions = timed(lambda: service.partition_tasks_by_client(records))
+    return seconds, {'routed': sum(len(tasks) for tasks in partitions.values())}
+
+
+def bench_all_clients_export(size, seed):
+    service = ClickUpService()
+    service.incremental = False
+    payloads = ClickUpPayloads(list(service.all_boards().values()), size, seed)
+    service.http = StubClickUpHttp(payloads).prepare()
+    sheets = StubSheetsService()
+    install_stub_sheets(sheets)
+    with quiet():
+        seconds, summary = timed(lambda: service.export_all_clients_to_spreadsheets())
+    return seconds, {
+        'prepare_seconds': round(service.http.prepare_seconds, 6),
+        'compressed_body_bytes': service.http.body_bytes,
+        'clickup_requests': service.http.requests,
+        'sheets_requests': sheets.requests,
+        'cells_written': sheets.cells_written,
+        'clients_ok': sum(1 for result in summary.values() if result['ok']),
+    }
+
+
+def bench_asana_export(size, seed):
+    payloads = AsanaPayloads(size, seed=seed)
+    service = AsanaService()
+    service.incremental = False
+    service.comment_cache = False
+    service.http = StubAsanaHttp(payloads).prepare()
+    sheets = StubSheetsService(tabs=())
+    install_stub_sheets(sheets)
+
+    def export():
+        tasks = service.get_all_tasks_for_sheets(payloads.project_id)
+        return AsanaSheetsService().export_asana_data(tasks)
+
+    with quiet():
+        seconds, ok = timed(export)
+    return seconds, {
+        'prepare_seconds': round(service.http.prepare_seconds, 6),
+        'asana_requests': service.http.requests,
+        'sheets_requests': sheets.requests,
+        'cells_written': sheets.cells_written,
+        'ok': ok,
+    }
+
+
+BENCHMARKS = {
+    'extract_customer_name': bench_extract_customer_name,
+    'format_task_row': bench_format_task_row,
+    'calculate_data_ranges': bench_calculate_data_ranges,
+    'routing': bench_routing,
+    'all_clients_export': bench_all_clients_export,
+    'asana_export': bench_asana_export,
+}
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names, sizes, seed):
+    results = []
+    for name in names:
+        for size in sizes:
+            seconds, extra = BENCHMARKS[name](size, seed)
+            results.append({
+                'benchmark': name,
+                'size': size,
+                'seconds': round(seconds, 6),
+                'per_second': round(size / seconds, 1) if seconds > 0 else None,
+                'extra': extra,
+            })
+            print(f"{name:<24} {size:>9,} tasks  {seconds:9.3f}s", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline_path):
+    """Print how each result moved against a previous run's JSON (ratio > 1 = faster now)"""
+    with open(baseline_path) as f:
+        baseline = {(r['benchmark'], r['size']): r for r in json.load(f)['results']}
+    for result in results:
+        before = baseline.get((result['benchmark'], result['size']))
+        if before and result['seconds']:
+            ratio = before['seconds'] / result['seconds']
+            print(f"{result['benchmark']:<24} {result['size']:>9,}  {before['seconds']:9.3f}s -> "
+                  f"{result['seconds']:9.3f}s  x{ratio:.2f}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the ClickUp/Asana export hot paths.')
+    parser.add_argument('--sizes', default='1k,100k', help='comma-separated task counts, e.g. 1k,100k,1m')
+    parser.add_argument('--only', help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write the JSON report here instead of stdout')
+    parser.add_argument('--compare', help='previous JSON report to compare against')
+    args = parser.parse_args()
+
+    names = args.only.split(',') if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    sizes = [parse_size(size) for size in args.sizes.split(',')]
+
+    # Keep the exporters' state files (sync state, metadata cache) out of the working tree
+    with tempfile.TemporaryDirectory() as state_dir:
+        os.environ['SYNC_STATE_PATH'] = os.path.join(state_dir, 'sync_state.sqlite3')
+        os.environ.pop('SHEETS_METADATA_TTL', None)
+        results = run(names, sizes, args.seed)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
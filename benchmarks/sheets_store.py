@@ -0,0 +1,255 @@
+"""In-memory Google Sheets shared by every Sheets fake: the local API server, the benchmark stub
+and the test double all keep their grids in a SheetsStore and parse A1 ranges with parse_range.
+
+InMemorySheetsService wraps a store in the googleapiclient resource shape the services call
+(`service.spreadsheets().values().get(...).execute()`), recording each call.
+"""
+import re
+import threading
+
+_CELL = re.compile(r'^([A-Z]+)?(\d+)?$')
+
+
+def column_index(letters):
+    """'A' -> 0, 'Z' -> 25, 'AA' -> 26"""
+    index = 0
+    for char in letters:
+        index = index * 26 + (ord(char) - 64)
+    return index - 1
+
+
+def parse_range(range_name):
+    """'Tab'!A2:G5 -> (tab, first_row, first_col, last_row, last_col), 0-based, None = open-ended"""
+    tab, _, cells = range_name.rpartition('!')
+    tab = tab.strip("'")
+    if not tab:
+        tab, cells = cells.strip("'"), ''
+    start, _, end = cells.partition(':')
+    end = end or start
+    start_col, start_row = _CELL.match(start).groups() if start else (None, None)
+    end_col, end_row = _CELL.match(end).groups() if end else (None, None)
+    return (
+        tab,
+        int(start_row) - 1 if start_row else 0,
+        column_index(start_col) if start_col else 0,
+        int(end_row) - 1 if end_row else None,
+        column_index(end_col) if end_col else None,
+    )
+
+
+class SheetsStore:
+    """In-memory spreadsheets: tab grids plus developer metadata.
+
+    Every method answers (status, body) like the Sheets v4 API; a spreadsheet comes into
+    existence with `default_tabs` the first time it is used.
+    """
+
+    DEFAULT_TABS = ('production', 'Project Summary')
+
+    def __init__(self, default_tabs=DEFAULT_TABS):
+        self.default_tabs = tuple(default_tabs)
+        self.lock = threading.Lock()
+        self.spreadsheets = {}
+
+    def spreadsheet(self, spreadsheet_id):
+        """The {'tabs', 'properties', 'metadata'} dict of a spreadsheet, created on first use"""
+        with self.lock:
+            return self._spreadsheet(spreadsheet_id)
+
+    def _spreadsheet(self, spreadsheet_id):
+        sheet = self.spreadsheets.get(spreadsheet_id)
+        if sheet is None:
+            sheet = {'tabs': {}, 'properties': {}, 'metadata': []}
+            self.spreadsheets[spreadsheet_id] = sheet
+            for title in self.default_tabs:
+                self._add_tab(sheet, title)
+        return sheet
+
+    def _add_tab(self, sheet, title):
+        properties = {'title': title, 'sheetId': len(sheet['properties']) + 1,
+                      'gridProperties': {'rowCount': 1000, 'columnCount': 26}}
+        sheet['properties'][title] = properties
+        sheet['tabs'][title] = []
+        return properties
+
+    def get(self, spreadsheet_id):
+        with self.lock:
+            sheet = self._spreadsheet(spreadsheet_id)
+            sheets = []
+            for properties in sheet['properties'].values():
+                entry = {'properties': dict(properties)}
+                metadata = [m for m in sheet['metadata'] if m['location'].get('sheetId') == properties['sheetId']]
+                if metadata:
+                    entry['developerMetadata'] = metadata
+                sheets.append(entry)
+            return 200, {'spreadsheetId': spreadsheet_id, 'sheets': sheets}
+
+    def batch_update(self, spreadsheet_id, body):
+        with self.lock:
+            sheet = self._spreadsheet(spreadsheet_id)
+            replies = []
+            for request in body.get('requests', []):
+                if 'addSheet' in request:
+                    title = request['addSheet']['properties']['title']
+                    if title in sheet['properties']:
+                        return 400, {'error': {'code': 400, 'message': f'A sheet with the name "{title}" already exists.'}}
+                    replies.append({'addSheet': {'properties': dict(self._add_tab(sheet, title))}})
+                elif 'createDeveloperMetadata' in request:
+                    entry = dict(request['createDeveloperMetadata']['developerMetadata'])
+                    entry['metadataId'] = len(sheet['metadata']) + 1
+                    sheet['metadata'].append(entry)
+                    replies.append({'createDeveloperMetadata': {'developerMetadata': entry}})
+                elif 'updateDeveloperMetadata' in request:
+                    update = request['updateDeveloperMetadata']
+                    metadata_id = update['dataFilters'][0]['developerMetadataLookup']['metadataId']
+                    for entry in sheet['metadata']:
+                        if entry['metadataId'] == metadata_id:
+                            entry.update(update['developerMetadata'])
+                    replies.append({'updateDeveloperMetadata': {}})
+                else:
+                    replies.append({})
+            return 200, {'spreadsheetId': spreadsheet_id, 'replies': replies}
+
+    def read(self, spreadsheet_id, range_name, major_dimension='ROWS'):
+        with self.lock:
+            sheet = self._spreadsheet(spreadsheet_id)
+            tab, first_row, first_col, last_row, last_col = parse_range(range_name)
+            if tab not in sheet['tabs']:
+                return 400, {'error': {'code': 400, 'message': f'Unable to parse range: {range_name}'}}
+            rows = sheet['tabs'][tab]
+            last_row = len(rows) - 1 if last_row is None else min(last_row, len(rows) - 1)
+            values = []
+            for row in rows[first_row:last_row + 1]:
+                end = len(row) if last_col is None else last_col + 1
+                values.append(row[first_col:end])
+            while values and not any(values[-1]):
+                values.pop()
+            if major_dimension == 'COLUMNS':
+                width = max((len(r) for r in values), default=0)
+                values = [[r[i] if i < len(r) else '' for r in values] for i in range(width)]
+            body = {'range': range_name, 'majorDimension': major_dimension}
+            if values:
+                body['values'] = values
+            return 200, body
+
+    def write(self, spreadsheet_id, range_name, values):
+        with self.lock:
+            sheet = self._spreadsheet(spreadsheet_id)
+            tab, first_row, first_col, _, _ = parse_range(range_name)
+            if tab not in sheet['tabs']:
+                return 400, {'error': {'code': 400, 'message': f'Unable to parse range: {range_name}'}}
+            rows = sheet['tabs'][tab]
+            for offset, values_row in enumerate(values):
+                index = first_row + offset
+                while len(rows) <= index:
+                    rows.append([])
+                row = rows[index]
+                while len(row) < first_col + len(values_row):
+                    row.append('')
+                row[first_col:first_col + len(values_row)] = [str(v) if v is not None else '' for v in values_row]
+            return 200, {'updatedRange': range_name, 'updatedRows': len(values),
+                         'updatedCells': sum(len(r) for r in values)}
+
+
+class SheetsApiError(Exception):
+    """A non-200 answer from the store, raised where googleapiclient would raise HttpError"""
+
+    def __init__(self, status, body):
+        super().__init__(f"{status}: {body.get('error', {}).get('message', '')}")
+        self.status = status
+
+
+class _Request:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        status, body = self._fn()
+        if status != 200:
+            raise SheetsApiError(status, body)
+        return body
+
+
+class InMemorySheetsService:
+    """googleapiclient-shaped Sheets v4 resource over one spreadsheet of a SheetsStore.
+
+    Every spreadsheetId lands in that one spreadsheet. Calls are recorded in `calls` as
+    ('get', fields), ('batchUpdate', request count), ('values.get', range),
+    ('values.update', range) or ('values.batchUpdate', [ranges]); `cells_written` counts
+    the cells sent.
+    """
+
+    SPREADSHEET_ID = 'in-memory'
+
+    def __init__(self, tabs=None, store=None):
+        self.store = store or SheetsStore(default_tabs=())
+        self.sheet = self.store.spreadsheet(self.SPREADSHEET_ID)
+        self.calls = []
+        self.cells_written = 0
+        for title, rows in (tabs or {}).items():
+            self.store.batch_update(self.SPREADSHEET_ID, {'requests': [{'addSheet': {'properties': {'title': title}}}]})
+            self.tabs[title] = [list(row) for row in rows]
+
+    @property
+    def tabs(self):
+        """title -> rows (lists of cell strings), edited in place by writes"""
+        return self.sheet['tabs']
+
+    @property
+    def properties(self):
+        return self.sheet['properties']
+
+    @property
+    def developer_metadata(self):
+        return self.sheet['metadata']
+
+    # resource navigation
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return _Values(self)
+
+    # spreadsheets.get / batchUpdate
+    def get(self, spreadsheetId, fields=None, **kwargs):
+        self.calls.append(('get', fields))
+        return _Request(lambda: self.store.get(self.SPREADSHEET_ID))
+
+    def batchUpdate(self, spreadsheetId, body):
+        self.calls.append(('batchUpdate', len(body['requests'])))
+        return _Request(lambda: self.store.batch_update(self.SPREADSHEET_ID, body))
+
+    def read(self, range_name):
+        """Rows of a range, trailing empty rows dropped"""
+        _, body = self.store.read(self.SPREADSHEET_ID, range_name)
+        return body.get('values', [])
+
+    def write(self, range_name, values):
+        self.cells_written += sum(len(row) for row in values)
+        return self.store.write(self.SPREADSHEET_ID, range_name, values)
+
+
+class _Values:
+    def __init__(self, service):
+        self.service = service
+
+    def get(self, spreadsheetId, range, majorDimension='ROWS', fields=None, **kwargs):
+        self.service.calls.append(('values.get', range))
+        return _Request(lambda: self.service.store.read(self.service.SPREADSHEET_ID, range, majorDimension))
+
+    def update(self, spreadsheetId, range, valueInputOption, body):
+        self.service.calls.append(('values.update', range))
+        return _Request(lambda: self.service.write(range, body['values']))
+
+    def batchUpdate(self, spreadsheetId, body):
+        self.service.calls.append(('values.batchUpdate', [entry['range'] for entry in body['data']]))
+
+        def run():
+            rows = 0
+            for entry in body['data']:
+                status, result = self.service.write(entry['range'], entry['values'])
+                if status != 200:
+                    return status, result
+                rows += result['updatedRows']
+            return 200, {'totalUpdatedRows': rows}
+        return _Request(run)
@@ -0,0 +1,160 @@
+"""In-process stand-ins for the ClickUp, Asana and Google Sheets transports.
+
+Every response body is generated and serialized up front (`prepare()`), then kept
+zlib-compressed the way a gzip-encoded response arrives. During the timed run a request
+only costs a dict lookup, decompression and json parsing, as with a real client, and the
+exporters' thread pools are free to overlap requests.
+"""
+import json
+import sys
+import time
+import zlib
+from urllib.parse import urlparse
+
+try:
+    from sheets_store import InMemorySheetsService
+except ModuleNotFoundError:
+    from benchmarks.sheets_store import InMemorySheetsService
+
+
+class StubResponse:
+    def __init__(self, compressed, status_code=200):
+        self._compressed = compressed
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return json.loads(zlib.decompress(self._compressed))
+
+
+def _pack(body):
+    return zlib.compress(json.dumps(body, separators=(',', ':')).encode('utf-8'), 1)
+
+
+_NOT_FOUND = _pack({'errors': [{'message': 'not stubbed'}]})
+
+
+class _PreparedHttp:
+    def __init__(self):
+        self.bodies = {}
+        self.requests = 0
+        self.prepare_seconds = 0.0
+        self.body_bytes = 0
+
+    def prepare(self):
+        started = time.perf_counter()
+        self._prepare()
+        self.prepare_seconds = time.perf_counter() - started
+        self.body_bytes = sum(len(body) for body in self.bodies.values())
+        return self
+
+    def _serve(self, key):
+        self.requests += 1
+        body = self.bodies.get(key)
+        return StubResponse(body) if body is not None else StubResponse(_NOT_FOUND, 404)
+
+
+class StubClickUpHttp(_PreparedHttp):
+    """Serves /list/{id}/task pages and /list/{id}/field from a ClickUpPayloads"""
+
+    def __init__(self, payloads):
+        super().__init__()
+        self.payloads = payloads
+
+    def _prepare(self):
+        self.bodies['empty'] = _pack({'tasks': [], 'last_page': True})
+        for list_id in self.payloads.list_ids:
+            self.bodies[(list_id, 'field')] = _pack(self.payloads.fields(list_id))
+            page = 0
+            while True:
+                body = self.payloads.page(list_id, page)
+                self.bodies[(list_id, page)] = _pack(body)
+                if body['last_page']:
+                    break
+                page += 1
+
+    def get(self, url, headers=None, params=None):
+        parts = urlparse(url).path.split('/list/')[1].split('/')
+        list_id, resource = parts[0], parts[1]
+        if resource == 'field':
+            return self._serve((list_id, 'field'))
+        key = (list_id, int(params.get('page', 0)))
+        if key not in self.bodies and list_id in self.payloads.counts:
+            # Pages past the end (requested speculatively by the page window) come back empty
+            key = 'empty'
+        return self._serve(key)
+
+
+class StubAsanaHttp(_PreparedHttp):
+    """Serves sections, section task pages and /batch story lookups from an AsanaPayloads"""
+
+    def __init__(self, payloads):
+        super().__init__()
+        self.payloads = payloads
+        self.stories = {}
+
+    def _prepare(self):
+        self.bodies['sections'] = _pack({'data': self.payloads.sections, 'next_page': None})
+        for section in self.payloads.sections:
+            offset = 0
+            while True:
+                body = self.payloads.task_page(section['gid'], offset)
+                self.bodies[(section['gid'], offset)] = _pack(body)
+                for task in body['data']:
+                    stories = self.payloads.stories(task['gid'])
+                    self.bodies[('stories', task['gid'])] = _pack(stories)
+                    self.stories[task['gid']] = json.dumps(stories, separators=(',', ':'))
+                if not body['next_page']:
+                    break
+                offset = int(body['next_page']['offset'])
+
+    def get(self, url, headers=None, params=None):
+        path = urlparse(url).path.split('/api/1.0', 1)[1]
+        params = params or {}
+        if path.endswith('/sections'):
+            return self._serve('sections')
+        if path == '/tasks':
+            return self._serve((params['section'], int(params.get('offset', 0))))
+        if path.endswith('/stories'):
+            return self._serve(('stories', path.split('/')[2]))
+        return self._serve(None)
+
+    def post(self, url, headers=None, json=None):
+        # Batch bodies depend on which tasks the client groups together, so they are
+        # stitched from the pre-serialized story lists rather than prepared whole
+        self.requests += 1
+        results = ','.join(
+            '{"status_code":200,"body":%s}' % self.stories[action['relative_path'].split('/')[2]]
+            for action in json['data']['actions']
+        )
+        return StubResponse(zlib.compress(('{"data":[%s]}' % results).encode('utf-8'), 1))
+
+
+class StubSheetsService(InMemorySheetsService):
+    """Holds what the exporters write in a SheetsStore and counts requests and cells written"""
+
+    def __init__(self, tabs=('Production', 'production')):
+        super().__init__(tabs={title: [] for title in tabs})
+
+    @property
+    def requests(self):
+        return len(self.calls)
+
+
+class StubSheetsFactory:
+    def __init__(self, service):
+        self._service = service
+
+    def service(self):
+        return self._service
+
+
+def install_stub_sheets(stub):
+    """Point every loaded copy of sheets_service at `stub` instead of authenticating with Google"""
+    for name in ('sheets_service', 'src.sheets_service'):
+        module = sys.modules.get(name)
+        if module is not None:
+            module._shared_factory = StubSheetsFactory(stub)
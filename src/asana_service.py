@@ -1,22 +1,59 @@
-import requests
 import os
+import requests
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+try:
+    from http_client import get_http_client
+    from sync_state import SyncStateStore
+    from models import AsanaTaskRecord
+    from metrics import get_metrics, instrumented
+except ModuleNotFoundError:
+    from src.http_client import get_http_client
+    from src.sync_state import SyncStateStore
+    from src.models import AsanaTaskRecord
+    from src.metrics import get_metrics, instrumented
+
 load_dotenv()
 
 class AsanaService:
+    # Only what AsanaTaskRecord keeps; notes (task descriptions) were the bulk of every page
+    TASK_OPT_FIELDS = 'name,completed,assignee.name,assignee.email,created_at,modified_at'
+    STORY_OPT_FIELDS = 'text,created_at,created_by.name,type'
+    # The last_update column only needs to know which stories are comments and their text
+    LAST_COMMENT_FIELDS = ['type', 'text']
+    # Asana accepts at most 10 actions per /batch request
+    BATCH_SIZE = 10
+    # Largest page Asana serves for collection endpoints
+    PAGE_LIMIT = 100
+    # Longest last_update text written to the sheet (and kept in the comment cache)
+    LAST_UPDATE_MAX_LENGTH = 500
+    
     def __init__(self):
         self.api_token = os.getenv('ASANA_API_TOKEN')
-        self.base_url = 'https://app.asana.com/api/1.0'
+        # Override to point at a local stand-in (benchmarks/fake_api_server.py)
+        self.base_url = os.getenv('ASANA_BASE_URL', 'https://app.asana.com/api/1.0').rstrip('/')
+        # Shared pooled session - keeps connections to Asana alive between calls
+        self.http = get_http_client()
         self.headers = {
             'Authorization': f'Bearer {self.api_token}',
             'Accept': 'application/json'
         }
+        
+        # Incremental mode: replay the project's /events feed instead of rescanning everything
+        self.incremental = os.getenv('ASANA_INCREMENTAL', 'false').lower() == 'true'
+        self.force_full_resync = False
+        self.state_store = None
+        
+        # Story lookups run on a small worker pool, one /batch request per worker at a time
+        self.story_workers = int(os.getenv('ASANA_STORY_WORKERS', '4'))
+        # Cache last comments by task gid + modified_at so unchanged tasks skip /stories entirely
+        self.comment_cache = os.getenv('ASANA_COMMENT_CACHE', 'true').lower() == 'true'
     
     def test_connection(self):
         """Test Asana API connection"""
         try:
-            response = requests.get(f'{self.base_url}/users/me', headers=self.headers)
+            response = self.http.get(f'{self.base_url}/users/me', headers=self.headers)
             if response.status_code == 200:
                 user_data = response.json()
                 print("✅ Asana API connection successful!")
@@ -27,13 +64,32 @@ class AsanaService:
             print(f"❌ Connection error: {e}")
             return False
     
+    def iter_collection(self, path, params=None):
+        """Yield every item of an Asana collection endpoint, one page (limit=100) at a time.
+        
+        Follows next_page.offset until Asana stops returning one, so callers can start
+        working on the first page while memory stays bounded by a single page. A failed page
+        raises requests.exceptions.HTTPError (429s were already retried by the transport), so
+        nobody mistakes a truncated collection for the whole of it.
+        """
+        params = dict(params or {})
+        params['limit'] = self.PAGE_LIMIT
+        while True:
+            response = self.http.get(f'{self.base_url}{path}', headers=self.headers, params=params)
+            if response.status_code != 200:
+                raise requests.exceptions.HTTPError(f"Asana returned {response.status_code} for {path}",
+                                                    response=response)
+            body = response.json()
+            yield from body.get('data', [])
+            next_page = body.get('next_page')
+            if not next_page or not next_page.get('offset'):
+                return
+            params['offset'] = next_page['offset']
+    
     def get_workspaces(self):
         """Get all workspaces"""
         try:
-            response = requests.get(f'{self.base_url}/workspaces', headers=self.headers)
-            if response.status_code == 200:
-                return response.json()['data']
-            return []
+            return list(self.iter_collection('/workspaces'))
         except Exception as e:
             print(f"❌ Error getting workspaces: {e}")
             return []
@@ -41,14 +97,7 @@ class AsanaService:
     def get_projects(self, workspace_id):
         """Get all projects in workspace"""
         try:
-            response = requests.get(
-                f'{self.base_url}/projects',
-                headers=self.headers,
-                params={'workspace': workspace_id}
-            )
-            if response.status_code == 200:
-                return response.json()['data']
-            return []
+            return list(self.iter_collection('/projects', {'workspace': workspace_id}))
         except Exception as e:
             print(f"❌ Error getting projects: {e}")
             return []
@@ -56,13 +105,7 @@ class AsanaService:
     def get_project_sections(self, project_id):
         """Get all sections/buckets in a project"""
         try:
-            response = requests.get(
-                f'{self.base_url}/projects/{project_id}/sections',
-                headers=self.headers
-            )
-            if response.status_code == 200:
-                return response.json()['data']
-            return []
+            return list(self.iter_collection(f'/projects/{project_id}/sections'))
         except Exception as e:
             print(f"❌ Error getting sections: {e}")
             return []
@@ -70,76 +113,347 @@ class AsanaService:
     def get_tasks_in_section(self, section_id):
         """Get all tasks in a specific section with detailed info"""
         try:
-            response = requests.get(
-                f'{self.base_url}/tasks',
-                headers=self.headers,
-                params={
-                    'section': section_id,
-                    'opt_fields': 'name,completed,assignee.name,assignee.email,created_at,completed_at,notes'
-                }
-            )
-            if response.status_code == 200:
-                return response.json()['data']
-            return []
+            return self._section_tasks(section_id)
         except Exception as e:
             print(f"❌ Error getting tasks: {e}")
             return []
     
+    def _section_tasks(self, section_id):
+        return [AsanaTaskRecord.from_api(task) for task in self.iter_collection('/tasks', {
+            'section': section_id,
+            'opt_fields': self.TASK_OPT_FIELDS
+        })]
+    
     def get_task_comments(self, task_id):
         """Get comments/stories for a specific task"""
         try:
-            response = requests.get(
-                f'{self.base_url}/tasks/{task_id}/stories',
-                headers=self.headers,
-                params={
-                    'opt_fields': 'text,created_at,created_by.name,type'
+            stories = self.iter_collection(f'/tasks/{task_id}/stories', {'opt_fields': self.STORY_OPT_FIELDS})
+            return self.filter_comments(stories)
+        except Exception as e:
+            print(f"❌ Error getting comments: {e}")
+            return []
+    
+    def get_last_comment(self, task_id, offset=None):
+        """Stream a task's stories and keep only the last comment's text (truncated); None if that failed"""
+        params = {'opt_fields': ','.join(self.LAST_COMMENT_FIELDS)}
+        if offset:
+            params['offset'] = offset
+        last_comment = ""
+        try:
+            for story in self.iter_collection(f'/tasks/{task_id}/stories', params):
+                if story.get('type') == 'comment' and story.get('text'):
+                    last_comment = story['text']
+        except Exception as e:
+            print(f"❌ Error getting comments: {e}")
+            return None
+        return last_comment[:self.LAST_UPDATE_MAX_LENGTH]
+    
+    def filter_comments(self, stories):
+        """Keep only actual comments (not system updates) from a task's stories"""
+        return [story for story in stories if story.get('type') == 'comment' and story.get('text')]
+    
+    def last_comment_text(self, comments):
+        """Text of the most recent comment, truncated for the sheet, or '' when there are none"""
+        if comments:
+            return comments[-1].get('text', '')[:self.LAST_UPDATE_MAX_LENGTH]
+        return ""
+    
+    def get_last_comments(self, tasks):
+        """Map each task gid to its (truncated) last comment text.
+        
+        `tasks` are AsanaTaskRecords (or task dicts) with a gid and, ideally, modified_at. Tasks whose
+        modified_at matches the comment cache are answered locally; the rest are looked
+        up 10 per /batch call, with batches spread over `story_workers` threads.
+        """
+        tasks = [AsanaTaskRecord.coerce(task) for task in tasks]
+        last_comments = {}
+        cache = self._load_comment_cache() if self.comment_cache else {}
+        
+        misses = []
+        for task in tasks:
+            cached = cache.get(task.gid)
+            if cached and task.modified_at and cached['modified_at'] == task.modified_at:
+                last_comments[task.gid] = cached['text']
+            else:
+                misses.append(task)
+        if tasks:
+            print(f"💬 Last comments: {len(tasks) - len(misses)} cached, {len(misses)} to fetch")
+        
+        batches = [
+            [task.gid for task in misses[start:start + self.BATCH_SIZE]]
+            for start in range(0, len(misses), self.BATCH_SIZE)
+        ]
+        with ThreadPoolExecutor(max_workers=max(1, self.story_workers)) as pool:
+            for result in pool.map(self._batch_last_comments, batches):
+                last_comments.update(result)
+        
+        # Failed lookups (None) show as no comment this run but are not cached, so they are retried
+        if self.comment_cache and misses:
+            self.get_state_store().upsert_records('asana', 'last_comments', {
+                task.gid: {
+                    'gid': task.gid,
+                    'modified_at': task.modified_at,
+                    'text': last_comments[task.gid]
                 }
+                for task in misses if task.modified_at and last_comments.get(task.gid) is not None
+            })
+        return {gid: text or '' for gid, text in last_comments.items()}
+    
+    def _load_comment_cache(self):
+        return {entry['gid']: entry for entry in self.get_state_store().load_records('asana', 'last_comments')}
+    
+    def _batch_last_comments(self, task_ids):
+        """Look up the last comment for up to BATCH_SIZE tasks in a single /batch request"""
+        actions = [{
+            'method': 'get',
+            'relative_path': f'/tasks/{task_id}/stories',
+            'options': {'fields': self.LAST_COMMENT_FIELDS, 'limit': self.PAGE_LIMIT}
+        } for task_id in task_ids]
+        results = []
+        try:
+            response = self.http.post(
+                f'{self.base_url}/batch',
+                headers=self.headers,
+                json={'data': {'actions': actions}}
             )
             if response.status_code == 200:
-                stories = response.json()['data']
-                # Filter for actual comments (not system updates)
-                comments = [story for story in stories if story.get('type') == 'comment' and story.get('text')]
-                return comments
-            return []
+                results = response.json()['data']
+            else:
+                print(f"⚠️ Batch comment lookup failed ({response.status_code}), falling back to per-task requests")
         except Exception as e:
-            print(f"❌ Error getting comments: {e}")
-            return []
+            print(f"⚠️ Batch comment lookup failed ({e}), falling back to per-task requests")
+        
+        last_comments = {}
+        for index, task_id in enumerate(task_ids):
+            result = results[index] if index < len(results) else None
+            if result and result.get('status_code') == 200:
+                body = result.get('body') or {}
+                next_page = body.get('next_page')
+                if next_page and next_page.get('offset'):
+                    # Long story history: stream the remaining pages, the last comment is near the end
+                    later = self.get_last_comment(task_id, offset=next_page['offset'])
+                    if later is None:
+                        last_comments[task_id] = None
+                        continue
+                    if later:
+                        last_comments[task_id] = later
+                        continue
+                last_comments[task_id] = self.last_comment_text(self.filter_comments(body.get('data', [])))
+            else:
+                last_comments[task_id] = self.get_last_comment(task_id)
+        return last_comments
     
-    def get_all_tasks_for_sheets(self, project_id):
-        """Get all tasks formatted for Google Sheets export"""
-        print("🔄 Fetching all tasks for Google Sheets export...")
+    def format_task_for_sheets(self, task, section_name, last_comment):
+        """Format one Asana task plus its last comment text as a row dict for Google Sheets"""
+        task = AsanaTaskRecord.coerce(task)
+        return {
+            'channel_name': task.name,
+            'assigned_to': task.assignee_name or 'Unassigned',
+            'email': task.assignee_email,
+            'date_created': task.created_at.split('T')[0],  # Just date part
+            'status': 'Completed' if task.completed else 'In Progress',
+            'last_update': last_comment[:self.LAST_UPDATE_MAX_LENGTH] if last_comment else 'No comments',  # Limit comment length
+            'section': section_name  # Track which section this came from
+        }
+    
+    def get_task(self, task_id):
+        """Get a single task with its project memberships, or None if it no longer exists (404).
         
-        sections = self.get_project_sections(project_id)
-        all_tasks = []
+        Any other failure raises a requests exception: a task that could not be read is not gone.
+        """
+        response = self.http.get(
+            f'{self.base_url}/tasks/{task_id}',
+            headers=self.headers,
+            params={
+                'opt_fields': f'{self.TASK_OPT_FIELDS},memberships.project.gid,memberships.section.gid'
+            }
+        )
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError(f"Asana returned {response.status_code} for task {task_id}",
+                                                response=response)
+        return AsanaTaskRecord.from_api(response.json()['data'])
+    
+    def get_events(self, resource_id, sync_token=None):
+        """Read the /events feed for a project.
         
+        Returns (events, new_sync_token, has_more, token_valid). Asana answers 412 with a
+        fresh token when `sync_token` is missing or too old to replay.
+        """
+        params = {'resource': resource_id}
+        if sync_token:
+            params['sync'] = sync_token
+        try:
+            response = self.http.get(f'{self.base_url}/events', headers=self.headers, params=params)
+            body = response.json()
+            if response.status_code == 200:
+                return body.get('data', []), body.get('sync'), body.get('has_more', False), True
+            return [], body.get('sync'), False, False
+        except Exception as e:
+            print(f"❌ Error getting events: {e}")
+            return [], None, False, False
+    
+    def _fetch_project_snapshot(self, project_id):
+        """Full scan of a project. Returns (sections, [(section_gid, task_gid, sheet_row)]).
+        
+        Raises if any page fails: a partial scan must never be stored or written as the project.
+        """
+        sections = list(self.iter_collection(f'/projects/{project_id}/sections'))
+        entries = []
+        
+        section_tasks = []
         for section in sections:
             print(f"📋 Processing section: {section['name']}")
-            tasks = self.get_tasks_in_section(section['gid'])
-            
-            for task in tasks:
-                # Get the last comment for this task
-                comments = self.get_task_comments(task['gid'])
-                last_comment = ""
-                if comments:
-                    # Get the most recent comment
-                    last_comment = comments[-1].get('text', '')
-                
-                # Format task data for sheets
-                task_data = {
-                    'channel_name': task.get('name', ''),
-                    'assigned_to': task.get('assignee', {}).get('name', 'Unassigned') if task.get('assignee') else 'Unassigned',
-                    'email': task.get('assignee', {}).get('email', '') if task.get('assignee') else '',
-                    'date_created': task.get('created_at', '').split('T')[0] if task.get('created_at') else '',  # Just date part
-                    'status': 'Completed' if task.get('completed', False) else 'In Progress',
-                    'last_update': last_comment[:500] if last_comment else 'No comments',  # Limit comment length
-                    'section': section['name']  # Track which section this came from
-                }
-                
-                all_tasks.append(task_data)
+            for task in self._section_tasks(section['gid']):
+                section_tasks.append((section, task))
+        
+        # Last comment for every task, 10 tasks per /batch round trip
+        last_comments = self.get_last_comments(task for _, task in section_tasks)
+        
+        for section, task in section_tasks:
+            row = self.format_task_for_sheets(task, section['name'], last_comments.get(task.gid, ''))
+            entries.append((section['gid'], task.gid, row))
+        
+        return sections, entries
+    
+    def get_all_tasks_for_sheets(self, project_id):
+        """Get all tasks formatted for Google Sheets export"""
+        print("🔄 Fetching all tasks for Google Sheets export...")
+        
+        with get_metrics().phase('fetch'):
+            if self.incremental:
+                all_tasks = self.sync_project_incremental(project_id, full_resync=self.force_full_resync)
+            else:
+                _, entries = self._fetch_project_snapshot(project_id)
+                all_tasks = [row for _, _, row in entries]
         
         print(f"✅ Found {len(all_tasks)} total tasks across all sections")
         return all_tasks
     
+    def get_state_store(self):
+        """SQLite store holding the events sync token and cached rows for incremental mode"""
+        if self.state_store is None:
+            self.state_store = SyncStateStore(os.getenv('ASANA_SYNC_STATE') or None)
+        return self.state_store
+    
+    def sync_project_incremental(self, project_id, full_resync=False):
+        """Return sheet rows for a project, refetching only tasks the /events feed says changed.
+        
+        The first run (or an expired sync token, or `full_resync`) does a full scan and
+        stores the rows; later runs replay events since the stored token and merge.
+        """
+        store = self.get_state_store()
+        sections_scope = f'{project_id}/sections'
+        token = None if full_resync else store.get_watermark('asana', project_id)
+        
+        events = []
+        valid = False
+        if token:
+            has_more = True
+            while has_more:
+                page, token, has_more, valid = self.get_events(project_id, token)
+                if not valid:
+                    break
+                events.extend(page)
+        
+        if not valid:
+            print("🔄 Asana sync token missing or expired - running a full scan")
+            # Take the token before scanning so nothing that changes mid-scan is lost
+            fresh_token = token or self.get_events(project_id)[1]
+            sections, entries = self._fetch_project_snapshot(project_id)
+            store.replace_records('asana', sections_scope, {s['gid']: s for s in sections})
+            store.replace_records('asana', project_id, {
+                task_gid: {'section_gid': section_gid, 'row': row}
+                for section_gid, task_gid, row in entries
+            })
+            if fresh_token:
+                store.set_watermark('asana', project_id, fresh_token)
+            return [row for _, _, row in entries]
+        
+        changed, removed, sections_changed = self._changes_from_events(project_id, events)
+        print(f"🔄 Asana events: {len(changed)} changed tasks, {len(removed)} removed")
+        
+        try:
+            if sections_changed:
+                sections = list(self.iter_collection(f'/projects/{project_id}/sections'))
+            else:
+                sections = store.load_records('asana', sections_scope)
+            section_names = {s['gid']: s['name'] for s in sections}
+            
+            live_tasks = {}
+            for task_gid in changed:
+                task = self.get_task(task_gid)
+                section_gid = task.section_in(project_id) if task else None
+                if section_gid not in section_names:
+                    # Deleted, or no longer in one of this project's sections
+                    removed.add(task_gid)
+                    continue
+                live_tasks[task_gid] = (section_gid, task)
+        except requests.exceptions.RequestException as e:
+            # Keep the stored token so the next run replays these events again
+            print(f"⚠️ Could not refetch changed Asana tasks ({e}) - keeping the previous rows until the next run")
+            sections = store.load_records('asana', sections_scope)
+            return self._cached_rows(project_id, sections)
+        
+        last_comments = self.get_last_comments(task for _, task in live_tasks.values())
+        updates = {}
+        for task_gid, (section_gid, task) in live_tasks.items():
+            updates[task_gid] = {
+                'section_gid': section_gid,
+                'row': self.format_task_for_sheets(task, section_names[section_gid], last_comments.get(task_gid, ''))
+            }
+        
+        if sections_changed:
+            store.replace_records('asana', sections_scope, {s['gid']: s for s in sections})
+        store.delete_records('asana', project_id, removed)
+        store.upsert_records('asana', project_id, updates)
+        # Only now that the changes are stored may the events be considered consumed
+        if token:
+            store.set_watermark('asana', project_id, token)
+        return self._cached_rows(project_id, sections)
+    
+    def _cached_rows(self, project_id, sections):
+        """The stored rows of a project, in section order"""
+        store = self.get_state_store()
+        section_names = {s['gid']: s['name'] for s in sections}
+        # Keep rows grouped in project section order, refreshing names after renames
+        section_order = {s['gid']: i for i, s in enumerate(sections)}
+        cached = [c for c in store.load_records('asana', project_id) if c['section_gid'] in section_order]
+        cached.sort(key=lambda c: section_order[c['section_gid']])
+        rows = []
+        for cached_task in cached:
+            row = dict(cached_task['row'])
+            row['section'] = section_names[cached_task['section_gid']]
+            rows.append(row)
+        return rows
+    
+    def _changes_from_events(self, project_id, events):
+        """Reduce an events page to (changed task gids, removed task gids, sections_changed)"""
+        changed = set()
+        removed = set()
+        sections_changed = False
+        for event in events:
+            resource = event.get('resource') or {}
+            parent = event.get('parent') or {}
+            resource_type = resource.get('resource_type')
+            if resource_type == 'task':
+                if event.get('action') == 'deleted' or (
+                        event.get('action') == 'removed' and parent.get('gid') == project_id):
+                    removed.add(resource['gid'])
+                    changed.discard(resource['gid'])
+                else:
+                    changed.add(resource['gid'])
+                    removed.discard(resource['gid'])
+            elif resource_type == 'story' and parent.get('resource_type') == 'task':
+                # New comment (or other story) on a task - its last_update may have changed
+                if parent['gid'] not in removed:
+                    changed.add(parent['gid'])
+            elif resource_type == 'section':
+                sections_changed = True
+        return changed, removed, sections_changed
+    
+    @instrumented('export_to_wurl_sheets')
     def export_to_wurl_sheets(self):
         """Export Asana data to Wurl Google Sheets"""
         try:
@@ -187,9 +501,15 @@ class AsanaService:
             return False
 
 if __name__ == "__main__":
+    import sys
     print("🔄 Testing Asana to Wurl Sheets Export...")
     
     asana = AsanaService()
+    if '--incremental' in sys.argv:
+        asana.incremental = True
+    if '--full-resync' in sys.argv:
+        asana.incremental = True
+        asana.force_full_resync = True
     
     if asana.test_connection():
         success = asana.export_to_wurl_sheets()
@@ -0,0 +1,271 @@
+import time
+import asyncio
+import aiohttp
+
+try:
+    from http_client import DEFAULT_MAX_RETRIES
+    from metrics import get_metrics, endpoint_name
+    from clickup_service import ClickUpService
+    from asana_service import AsanaService
+    from models import AsanaTaskRecord
+except ModuleNotFoundError:
+    from src.http_client import DEFAULT_MAX_RETRIES
+    from src.metrics import get_metrics, endpoint_name
+    from src.clickup_service import ClickUpService
+    from src.asana_service import AsanaService
+    from src.models import AsanaTaskRecord
+
+
+class AsyncHttpClient:
+    """aiohttp session with keep-alive pooling and a semaphore bounding in-flight requests."""
+
+    def __init__(self, max_concurrency=50, limit_per_host=0, timeout=30, max_retries=DEFAULT_MAX_RETRIES):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self._session = None
+        self._semaphore = None
+
+    def _ensure_session(self):
+        # The session and semaphore must be created inside the running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=30
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Accept-Encoding': 'gzip, deflate'}
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def get(self, url, headers=None, params=None, raise_for_status=False):
+        """GET url and return (status, parsed JSON body or None)"""
+        session = self._ensure_session()
+        if params:
+            params = {key: str(value) for key, value in params.items()}
+        endpoint = endpoint_name('GET', url)
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                async with session.get(url, headers=headers, params=params) as response:
+                    if response.status == 429 and attempt < self.max_retries:
+                        delay = self._retry_after(response, attempt)
+                    else:
+                        body = await response.read()
+                        get_metrics().record_call(endpoint, response.status, response_bytes=len(body),
+                                                  seconds=time.perf_counter() - started, retries=attempt)
+                        if raise_for_status:
+                            response.raise_for_status()
+                        if response.status != 200:
+                            return response.status, None
+                        return response.status, await response.json(content_type=None)
+            # Wait out the rate limit without holding a concurrency slot
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _retry_after(response, attempt):
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return 0.5 * (2 ** attempt)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+
+class AsyncClickUpService:
+    """asyncio counterpart of ClickUpService; configuration and parsing come from the sync class."""
+
+    def __init__(self, service=None, max_concurrency=20, http=None):
+        self.sync = service or ClickUpService()
+        self.base_url = self.sync.base_url
+        self.headers = self.sync.headers
+        self.issue_boards = self.sync.issue_boards
+        self.feature_boards = self.sync.feature_boards
+        self.http = http or AsyncHttpClient(max_concurrency=max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.http.close()
+
+    async def test_connection(self):
+        """Test the ClickUp API connection"""
+        try:
+            await self.http.get(f"{self.base_url}/team", headers=self.headers, raise_for_status=True)
+            print("✅ ClickUp API connection successful!")
+            return True
+        except aiohttp.ClientError as e:
+            print(f"❌ ClickUp API connection failed: {e}")
+            return False
+
+    async def resolve_filer_field_id(self, list_id):
+        """Async counterpart of ClickUpService.get_filer_field_id, sharing its per-list cache"""
+        if list_id not in self.sync._filer_field_ids:
+            field_id = None
+            try:
+                _, data = await self.http.get(f"{self.base_url}/list/{list_id}/field", headers=self.headers)
+                field_id = self.sync._find_filer_field_id(data or {})
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"⚠️ Could not read custom fields of list {list_id}: {e}")
+            self.sync._filer_field_ids[list_id] = field_id
+        return self.sync._filer_field_ids[list_id]
+
+    async def iter_tasks(self, list_id, list_name="Unknown"):
+        """Yield every task in a ClickUp list, one page at a time"""
+        await self.resolve_filer_field_id(list_id)
+        page = 0
+        while True:
+            _, data = await self.http.get(
+                f"{self.base_url}/list/{list_id}/task",
+                headers=self.headers,
+                params=self.sync._task_page_params(page),
+                raise_for_status=True
+            )
+            tasks, is_last = self.sync._parse_task_page(data or {}, list_id, list_name)
+            for task in tasks:
+                yield task
+            if is_last:
+                return
+            page += 1
+
+    async def get_tasks_from_list(self, list_id, list_name="Unknown"):
+        """Get all tasks from a specific ClickUp list (every page)"""
+        try:
+            print(f"📋 Fetching tasks from {list_name} (ID: {list_id})...")
+            tasks = [task async for task in self.iter_tasks(list_id, list_name)]
+            print(f"✅ Found {len(tasks)} tasks in {list_name}")
+            return tasks
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"❌ Error fetching tasks from {list_name}: {e}")
+            return []
+
+    async def fetch_board_tasks(self, boards):
+        """Fetch all boards concurrently and return their tasks as one list in board order"""
+        results = await asyncio.gather(*(
+            self.get_tasks_from_list(list_id, board_name)
+            for board_name, list_id in boards.items()
+        ))
+        return [task for tasks in results for task in tasks]
+
+    async def get_issue_tasks(self):
+        """Get tasks from issue boards (External + Internal)"""
+        return await self.fetch_board_tasks(self.issue_boards)
+
+    async def get_feature_tasks(self):
+        """Get tasks from feature boards"""
+        return await self.fetch_board_tasks(self.feature_boards)
+
+
+class AsyncAsanaService:
+    """asyncio counterpart of AsanaService; configuration and formatting come from the sync class."""
+
+    def __init__(self, service=None, max_concurrency=50, http=None):
+        self.sync = service or AsanaService()
+        self.base_url = self.sync.base_url
+        self.headers = self.sync.headers
+        self.http = http or AsyncHttpClient(max_concurrency=max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.http.close()
+
+    async def _get_data(self, path, params=None):
+        """Read every page (limit/offset) of an Asana collection endpoint.
+
+        Like AsanaService.iter_collection, a failed page raises (aiohttp.ClientResponseError)
+        instead of handing back the items read so far as if they were the whole collection.
+        """
+        params = dict(params or {})
+        params['limit'] = self.sync.PAGE_LIMIT
+        items = []
+        while True:
+            _, body = await self.http.get(f"{self.base_url}{path}", headers=self.headers, params=params,
+                                          raise_for_status=True)
+            body = body or {}
+            items.extend(body.get('data', []))
+            next_page = body.get('next_page')
+            if not next_page or not next_page.get('offset'):
+                return items
+            params['offset'] = next_page['offset']
+
+    async def _get_data_or_empty(self, path, params=None, what="data"):
+        """_get_data, printing the error and returning [] if a page failed"""
+        try:
+            return await self._get_data(path, params)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"❌ Error getting {what}: {e}")
+            return []
+
+    async def test_connection(self):
+        """Test Asana API connection"""
+        try:
+            status, body = await self.http.get(f"{self.base_url}/users/me", headers=self.headers)
+            if status == 200:
+                print("✅ Asana API connection successful!")
+                print(f"👤 User: {body['data']['name']}")
+                return True
+            return False
+        except Exception as e:
+            print(f"❌ Connection error: {e}")
+            return False
+
+    async def get_workspaces(self):
+        """Get all workspaces"""
+        return await self._get_data_or_empty('/workspaces', what="workspaces")
+
+    async def get_projects(self, workspace_id):
+        """Get all projects in workspace"""
+        return await self._get_data_or_empty('/projects', params={'workspace': workspace_id}, what="projects")
+
+    async def get_project_sections(self, project_id):
+        """Get all sections/buckets in a project; raises if a page failed"""
+        return await self._get_data(f'/projects/{project_id}/sections')
+
+    async def get_tasks_in_section(self, section_id):
+        """Get all tasks in a specific section with detailed info; raises if a page failed"""
+        params = {'section': section_id, 'opt_fields': self.sync.TASK_OPT_FIELDS}
+        tasks = await self._get_data('/tasks', params=params)
+        return [AsanaTaskRecord.from_api(task) for task in tasks]
+
+    async def get_task_comments(self, task_id):
+        """Get comments/stories for a specific task"""
+        stories = await self._get_data_or_empty(
+            f'/tasks/{task_id}/stories',
+            params={'opt_fields': self.sync.STORY_OPT_FIELDS},
+            what="comments"
+        )
+        return self.sync.filter_comments(stories)
+
+    async def get_all_tasks_for_sheets(self, project_id):
+        """Get all tasks formatted for Google Sheets export, fetching sections and stories concurrently"""
+        print("🔄 Fetching all tasks for Google Sheets export...")
+
+        sections = await self.get_project_sections(project_id)
+        section_tasks = await asyncio.gather(*(self.get_tasks_in_section(s['gid']) for s in sections))
+
+        # Every story request is in flight at once; the HTTP client's semaphore bounds them
+        pairs = [(section, task) for section, tasks in zip(sections, section_tasks) for task in tasks]
+        comments = await asyncio.gather(*(self.get_task_comments(task.gid) for _, task in pairs))
+
+        all_tasks = [
+            self.sync.format_task_for_sheets(task, section['name'], self.sync.last_comment_text(task_comments))
+            for (section, task), task_comments in zip(pairs, comments)
+        ]
+        print(f"✅ Found {len(all_tasks)} total tasks across all sections")
+        return all_tasks
@@ -1,49 +1,80 @@
 import requests
 import os
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from dotenv import load_dotenv
 
+try:
+    from http_client import get_http_client
+    from sheets_service import GoogleSheetsService, SheetWritePlan, RowUpsertSync, SectionedUpsertSync
+    from sync_state import SyncStateStore
+    from models import TaskRecord, TaskSnapshot
+    from customer_routing import CustomerRouter, extract_customer_name
+    from metrics import get_metrics, instrumented
+except ModuleNotFoundError:
+    from src.http_client import get_http_client
+    from src.sheets_service import GoogleSheetsService, SheetWritePlan, RowUpsertSync, SectionedUpsertSync
+    from src.sync_state import SyncStateStore
+    from src.models import TaskRecord, TaskSnapshot
+    from src.customer_routing import CustomerRouter, extract_customer_name
+    from src.metrics import get_metrics, instrumented
+
 # Load environment variables
 load_dotenv()
 
+# Row-level dumps of what gets written; shown with LOG_LEVEL=DEBUG
+logger = logging.getLogger(__name__)
+
 class ClickUpService:
     def format_task_row(self, task, has_pipe):
         """Format a single task row for spreadsheet output."""
-        task_name = task.get('name', '') or ''
-        priority = task.get('priority', {})
-        severity = priority.get('priority', 'normal') if priority else 'normal'
-        status = task.get('status', {})
-        current_status = status.get('status', 'Unknown') if status else 'Unknown'
-        filer_email = ""
-        custom_fields = task.get('custom_fields', [])
-        for field in custom_fields:
-            if field.get('name') == 'Work email address?':
-                filer_email = field.get('value', '')
-                break
-        if not filer_email or filer_email.strip() == "":
-            filer_email = "Not Available"
-        if has_pipe:
-            parts = task_name.split('|', 1)
-            account = parts[0].strip()
-            subject = parts[1].strip() if len(parts) > 1 else ''
-            return [
-                account,
-                task.get('url', ''),
-                subject,
-                severity,
-                current_status,
-                filer_email,
-                task.get('board_name', '')
+        return self.format_rows([task], has_pipe=has_pipe)[0]
+
+    def format_rows(self, tasks, layout='client', has_pipe=None):
+        """Ready-to-write 2D values for a batch of tasks, built column by column.
+
+        Layouts:
+          'client'     - Account (before the pipe), Link, Subject (after the pipe), Severity, Status, Filed By, Board
+          'account'    - Account (extracted customer), Link, full task name, Severity, Status, Filed By, Board
+          'production' - Link, Subject, Severity, Status, Filed By (columns A-E of the production tab)
+
+        `has_pipe` forces the client-layout split on or off; by default it follows each task name.
+        """
+        tasks = [TaskRecord.coerce(task) for task in tasks]
+        names = [task.name for task in tasks]
+        urls = [task.url for task in tasks]
+        severities = [task.severity for task in tasks]
+        statuses = [task.status for task in tasks]
+        emails = [task.filer_email for task in tasks]
+
+        if layout == 'production':
+            subjects = [name or 'No Title' for name in names]
+            return [list(row) for row in zip(urls, subjects, severities, statuses, emails)]
+
+        boards = [task.board_name for task in tasks]
+        pipes = [('|' in name) if has_pipe is None else has_pipe for name in names]
+        if layout == 'account':
+            accounts = [(extract_customer_name(name) or '') if pipe else '' for name, pipe in zip(names, pipes)]
+            subjects = [name or 'No Title' for name in names]
+        elif layout == 'client':
+            parts = [name.split('|', 1) if pipe else None for name, pipe in zip(names, pipes)]
+            accounts = [split[0].strip() if split else '' for split in parts]
+            subjects = [
+                (split[1].strip() if len(split) > 1 else '') if split else (name or 'No Title')
+                for name, split in zip(names, parts)
             ]
         else:
-            return [
-                '',
-                task.get('url', ''),
-                task_name if task_name else 'No Title',
-                severity,
-                current_status,
-                filer_email,
-                task.get('board_name', '')
-            ]
+            raise ValueError(f"Unknown row layout: {layout}")
+        return [list(row) for row in zip(accounts, urls, subjects, severities, statuses, emails, boards)]
+
+    def split_by_pipe(self, tasks):
+        """(tasks named 'Customer | Subject', tasks without a pipe), each in input order"""
+        piped, unpiped = [], []
+        for task in tasks:
+            (piped if '|' in self._task_name(task) else unpiped).append(task)
+        return piped, unpiped
 
     def calculate_data_ranges(self, start_row, rows_with_customer, rows_without_pipe):
         """Calculate spreadsheet ranges for customer and non-customer rows, with label row immediately after customer rows."""
@@ -52,14 +83,49 @@ class ClickUpService:
         range_label = f"A{label_row_index}:G{label_row_index}"
         range_name2 = f"A{label_row_index + 1}:G{label_row_index + len(rows_without_pipe)}"
         return range_name1, range_label, range_name2
-    def export_single_client_to_spreadsheet(self, client_name):
-        """Export all tasks for a single client to their specific spreadsheet, writing to the 'production' tab only, with sectioning as in the test template export."""
-        try:
-            from src.sheets_service import GoogleSheetsService
-        except ModuleNotFoundError:
-            import sys, os
-            sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-            from src.sheets_service import GoogleSheetsService
+
+    def get_client_aliases(self, client_name):
+        """Lower-cased aliases used to match a client against extracted customer names"""
+        return [a.lower() for a in self.CLIENT_ALIASES.get(client_name, [client_name])]
+
+    def partition_tasks_by_client(self, tasks, client_names=None):
+        """Route a task snapshot to clients in one pass. Returns {client_name: [tasks]}.
+
+        A task goes to every client whose alias appears in its extracted customer name,
+        the same rule the per-client export has always used. Partitions of an incomplete
+        TaskSnapshot carry its failed boards along.
+        """
+        with get_metrics().phase('route'):
+            partitions = self.get_customer_router(client_names).partition(tasks, name_of=self._task_name)
+        failed_boards = getattr(tasks, 'failed_boards', ())
+        return {client: TaskSnapshot(client_tasks, failed_boards) for client, client_tasks in partitions.items()}
+
+    def get_customer_router(self, client_names=None):
+        """CustomerRouter (prebuilt alias index) for `client_names`, built once per client set"""
+        key = tuple(self.CLIENT_SPREADSHEET_IDS if client_names is None else client_names)
+        router = self._routers.get(key)
+        if router is None:
+            router = CustomerRouter({name: self.get_client_aliases(name) for name in key})
+            self._routers[key] = router
+        return router
+
+    @staticmethod
+    def _task_name(task):
+        return task.name if isinstance(task, TaskRecord) else task.get('name', '') or ''
+
+    def fetch_task_snapshot(self):
+        """Fetch every issue and feature board once; the snapshot can be routed to any number of clients"""
+        return self.fetch_board_tasks(self.all_boards())
+
+    @instrumented('export_single_client_to_spreadsheet')
+    def export_single_client_to_spreadsheet(self, client_name, client_tasks=None):
+        """Export all tasks for a single client to their specific spreadsheet, writing to the 'production' tab only, with sectioning as in the test template export.
+
+        Pass `client_tasks` (already routed to this client) to skip fetching the boards again.
+        In 'upsert' client mode (the default) every task keeps one row and tasks that are gone
+        are removed, unless a board failed to fetch; 'append' adds the whole block below the
+        last used row on every run.
+        """
         spreadsheet_id = self.CLIENT_SPREADSHEET_IDS.get(client_name)
         if not spreadsheet_id:
             print(f"❌ No spreadsheet ID found for client: {client_name}")
@@ -69,205 +135,129 @@ class ClickUpService:
         target_tab = default_tab
 
         print(f"\n🔄 Exporting ALL tasks for {client_name} to their spreadsheet (production tab)...")
-        all_tasks = []
-        # Define aliases for each client for fuzzy matching
-        client_aliases = {
-            'Dirt Vision': ['dirt vision', 'dirtvision', 'dv'],
-            'Gotham/Yes': ['gotham', 'yes'],
-            'Marquee': ['marquee'],
-            'Wurl': ['wurl'],
-            'Yahoo': ['yahoo']
-        }
-        aliases = client_aliases.get(client_name, [client_name])
-        aliases = [a.lower() for a in aliases]
-
-        # Only fetch tasks from boards that are likely to contain Dirt Vision tickets
-        # (If you want to further optimize, you could filter by board name or ID here)
-        for board_name, list_id in {**self.issue_boards, **self.feature_boards}.items():
-            # Optionally skip boards not relevant to Dirt Vision
-            # For now, fetch all, but could add: if 'dirt' not in board_name.lower(): continue
-            tasks = self.get_tasks_from_list(list_id, board_name)
-            for task in tasks:
-                customer = self.extract_customer_name(task.get('name', ''))
-                if customer:
-                    customer_lc = customer.lower()
-                    if any(alias in customer_lc for alias in aliases):
-                        all_tasks.append(task)
+        if client_tasks is None:
+            snapshot = self.fetch_task_snapshot()
+            client_tasks = self.partition_tasks_by_client(snapshot, [client_name])[client_name]
+        all_tasks = client_tasks
 
         # Prepare headers and rows for tasks with a customer name
-        headers = ['Account', 'Ticket ID/Link', 'Subject', 'Severity', 'Status', 'Ticket Filed By', 'Board']
-        rows_with_customer = []
-        rows_without_pipe = []
-        for task in all_tasks:
-            task_name = task.get('name', '') or ''
-            has_pipe = '|' in task_name
-            priority = task.get('priority', {})
-            severity = priority.get('priority', 'normal') if priority else 'normal'
-            status = task.get('status', {})
-            current_status = status.get('status', 'Unknown') if status else 'Unknown'
-            filer_email = ""
-            custom_fields = task.get('custom_fields', [])
-            for field in custom_fields:
-                if field.get('name') == 'Work email address?':
-                    filer_email = field.get('value', '')
-                    break
-            if not filer_email or filer_email.strip() == "":
-                filer_email = "Not Available"
-            if has_pipe:
-                # Split on first pipe
-                parts = task_name.split('|', 1)
-                account = parts[0].strip()
-                subject = parts[1].strip() if len(parts) > 1 else ''
-                data_row = [
-                    account,
-                    task.get('url', ''),
-                    subject,
-                    severity,
-                    current_status,
-                    filer_email,
-                    task.get('board_name', '')
-                ]
-                rows_with_customer.append(data_row)
-            else:
-                data_row = [
-                    '',
-                    task.get('url', ''),
-                    task_name if task_name else 'No Title',
-                    severity,
-                    current_status,
-                    filer_email,
-                    task.get('board_name', '')
-                ]
-                rows_without_pipe.append(data_row)
+        headers = self.CLIENT_HEADERS
+        with get_metrics().phase('format'):
+            piped, unpiped = self.split_by_pipe(all_tasks)
+            rows_with_customer = self.format_rows(piped)
+            rows_without_pipe = self.format_rows(unpiped)
 
         sheets_service = GoogleSheetsService()
         sheets_service.SPREADSHEET_ID = spreadsheet_id
 
         # Check if the tab exists (case-insensitive), and use the correct case if found
         try:
-            sheet_metadata = sheets_service.service.spreadsheets().get(spreadsheetId=spreadsheet_id).execute()
-            sheet_names = [s['properties']['title'] for s in sheet_metadata.get('sheets', [])]
-            found_tab = None
-            for name in sheet_names:
-                if name.lower() == target_tab.lower():
-                    found_tab = name
-                    break
-            if found_tab:
-                target_tab = found_tab  # Use the actual case from the sheet
-            else:
-                print(f"Tab '{target_tab}' not found. Creating it...")
-                add_sheet_request = {
-                    'requests': [{
-                        'addSheet': {
-                            'properties': {
-                                'title': target_tab
-                            }
-                        }
-                    }]
-                }
-                sheets_service.service.spreadsheets().batchUpdate(
-                    spreadsheetId=spreadsheet_id,
-                    body=add_sheet_request
-                ).execute()
-                print(f"✅ Created tab '{target_tab}'")
+            target_tab = sheets_service.ensure_tab(target_tab, spreadsheet_id)
         except Exception as e:
             print(f"❌ Error checking/creating tab '{target_tab}': {e}")
             return False
 
         # Prepare label row for printing and writing
-        label_text = "TASKS WITHOUT PIPE DELIMITER"
-        label_row = [[label_text] + ["" for _ in range(6)]]
-
-        # Print output for user review before writing
-        print("\n--- Would write the following rows to the sheet (with customer) ---")
-        for row in rows_with_customer:
-            print(row)
-        print("\n--- Would write the following label row ---")
-        print(label_row[0])
-        print("\n--- Would write the following rows to the sheet (without pipe) ---")
-        for row in rows_without_pipe:
-            print(row)
-
-        # Always write header to A1:G1
-        header_range = f"'{target_tab}'!A1:G1"
-        header_body = {'values': [headers]}
-        try:
-            sheets_service.service.spreadsheets().values().update(
-                spreadsheetId=spreadsheet_id,
-                range=header_range,
-                valueInputOption='RAW',
-                body=header_body
-            ).execute()
-        except Exception as e:
-            print(f"⚠️ Could not write header row: {e}")
+        label_row = [self.NO_PIPE_LABEL_ROW]
 
-        # Find the last non-empty row after writing header
-        try:
-            existing_range = f"'{target_tab}'!A:G"
-            existing_result = sheets_service.service.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id,
-                range=existing_range
-            ).execute()
-            existing_values = existing_result.get('values', [])
-            last_row_index = -1
-            for i in range(len(existing_values)-1, -1, -1):
-                row = existing_values[i]
-                if any(cell.strip() for cell in row if cell):
-                    last_row_index = i
-                    break
-            start_row = max(last_row_index + 2, 2)  # Always start at row 2 or after last row
-        except Exception as e:
-            print(f"⚠️ Could not read existing data, starting at row 2: {e}")
-            start_row = 2
-
-        # Calculate ranges based on start_row
-        range_name1 = f"'{target_tab}'!A{start_row}:G{start_row + len(rows_with_customer) - 1}"
-        body1 = {'values': rows_with_customer}
-        start_row2 = start_row + len(rows_with_customer) + 1
-        range_label = f"'{target_tab}'!A{start_row2}:G{start_row2}"
-        range_name2 = f"'{target_tab}'!A{start_row2+1}:G{start_row2+len(rows_without_pipe)}"
-        body2 = {'values': rows_without_pipe}
-        try:
-            print(f"\n[DEBUG] Spreadsheet ID: {spreadsheet_id}")
-            print(f"[DEBUG] Tab name: '{target_tab}'")
-            print(f"[DEBUG] Range for customer rows: {range_name1}")
-            print(f"[DEBUG] Range for label row: {range_label}")
-            print(f"[DEBUG] Range for without pipe rows: {range_name2}")
-
-            print(f"Writing {len(rows_with_customer)-1} tasks with customer to {range_name1}")
-            resp1 = sheets_service.service.spreadsheets().values().update(
-                spreadsheetId=spreadsheet_id,
-                range=range_name1,
-                valueInputOption='RAW',
-                body=body1
-            ).execute()
-            print(f"[DEBUG] API response for customer rows: {resp1}")
+        # Rows for review before writing (LOG_LEVEL=DEBUG)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("--- Would write the following rows to the sheet (with customer) ---")
+            for row in rows_with_customer:
+                logger.debug("%s", row)
+            logger.debug("--- Would write the following label row ---")
+            logger.debug("%s", label_row[0])
+            logger.debug("--- Would write the following rows to the sheet (without pipe) ---")
+            for row in rows_without_pipe:
+                logger.debug("%s", row)
 
-            print(f"Writing label row to {range_label}")
-            resp_label = sheets_service.service.spreadsheets().values().update(
-                spreadsheetId=spreadsheet_id,
-                range=range_label,
-                valueInputOption='RAW',
-                body={'values': label_row}
-            ).execute()
-            print(f"[DEBUG] API response for label row: {resp_label}")
+        if self.client_mode == 'upsert':
+            try:
+                upsert = self.client_upsert(sheets_service, spreadsheet_id, target_tab)
+                # Rows of a board that failed to fetch must survive: only prune from a complete snapshot
+                complete = getattr(all_tasks, 'complete', True)
+                stats = upsert.sync_sections([rows_with_customer, rows_without_pipe], prune=complete)
+                if not complete:
+                    print(f"⚠️ {target_tab} tab: {stats['updated']} rows updated, {stats['appended']} appended, "
+                          f"{stats['unchanged']} unchanged; nothing removed because "
+                          f"{', '.join(all_tasks.failed_boards)} could not be fetched")
+                    return False
+                print(f"✅ {target_tab} tab: {stats['updated']} rows updated, {stats['appended']} appended, "
+                      f"{stats['unchanged']} unchanged, {stats['removed']} removed")
+                return True
+            except Exception as e:
+                print(f"❌ Error writing to tab {target_tab}: {e}")
+                return False
 
-            print(f"Writing {len(rows_without_pipe)-1} tasks without pipe to {range_name2}")
-            resp2 = sheets_service.service.spreadsheets().values().update(
-                spreadsheetId=spreadsheet_id,
-                range=range_name2,
-                valueInputOption='RAW',
-                body=body2
-            ).execute()
-            print(f"[DEBUG] API response for without pipe rows: {resp2}")
+        start_row = self._find_start_row(sheets_service, spreadsheet_id, target_tab)
+        plan = self._plan_client_sheet_write(target_tab, headers, start_row, rows_with_customer, rows_without_pipe)
+        try:
+            logger.debug("Spreadsheet ID: %s", spreadsheet_id)
+            logger.debug("Tab name: '%s'", target_tab)
+            for range_name in plan.ranges:
+                logger.debug("Range queued: %s", range_name)
 
-            print(f"✅ Wrote {len(rows_with_customer)-1} tasks with customer and {len(rows_without_pipe)-1} tasks without pipe to tab: {target_tab}")
+            print(f"Writing {len(plan.data)} ranges in one batchUpdate")
+            resp = sheets_service.batch_write(plan, spreadsheet_id)
+            self._record_written_rows(sheets_service, spreadsheet_id, target_tab,
+                                      start_row + len(rows_with_customer) + len(rows_without_pipe))
+            logger.debug("API response for batch write: %s", resp)
+
+            print(f"✅ Wrote {len(rows_with_customer)} tasks with customer and {len(rows_without_pipe)} tasks without pipe to tab: {target_tab}")
             return True
         except Exception as e:
             print(f"❌ Error writing to tab {target_tab}: {e}")
             import traceback
             traceback.print_exc()
             return False
+
+    def _find_start_row(self, sheets_service, spreadsheet_id, target_tab):
+        """First row after the last non-empty row of a tab (never above row 2, which follows the header)"""
+        try:
+            # Column A is blank on no-pipe rows, so probe A:B (B always holds the ticket link)
+            return sheets_service.append_position.next_row(spreadsheet_id, target_tab, probe_columns='A:B', min_row=2)
+        except Exception as e:
+            print(f"⚠️ Could not read existing data, starting at row 2: {e}")
+            return 2
+
+    def _record_written_rows(self, sheets_service, spreadsheet_id, target_tab, last_row):
+        """Remember the last row written so the next run finds its append position without a scan"""
+        try:
+            sheets_service.append_position.record_last_row(spreadsheet_id, target_tab, last_row)
+        except Exception as e:
+            print(f"⚠️ Could not record last written row: {e}")
+
+    def _plan_client_sheet_write(self, target_tab, headers, start_row, rows_with_customer, rows_without_pipe):
+        """Header, customer rows, label row and no-pipe rows queued as one write plan"""
+        range_name1, range_label, range_name2 = self.calculate_data_ranges(start_row, rows_with_customer, rows_without_pipe)
+        plan = SheetWritePlan(target_tab)
+        plan.add('A1:G1', [headers])
+        plan.add(range_name1, rows_with_customer)
+        plan.add(range_label, [self.NO_PIPE_LABEL_ROW])
+        plan.add(range_name2, rows_without_pipe)
+        return plan
+
+    # Separates tasks whose name has no 'Customer | Subject' pipe in the client sheets
+    NO_PIPE_LABEL_ROW = ["TASKS WITHOUT PIPE DELIMITER"] + ["" for _ in range(6)]
+
+    # ClickUp returns at most 100 tasks per page of /list/{id}/task
+    PAGE_SIZE = 100
+
+    # Columns A-G of the client and test template tabs; column B (task URL) is the upsert key
+    CLIENT_HEADERS = ['Account', 'Ticket ID/Link', 'Subject', 'Severity', 'Status', 'Ticket Filed By', 'Board']
+
+    # Columns A-E of the production tab; column A (task URL) is the upsert key
+    PRODUCTION_HEADERS = ['Ticket ID/Link', 'Subject', 'Severity', 'Status', 'Ticket Filed By']
+
+    # Aliases for each client for fuzzy matching against the customer name
+    CLIENT_ALIASES = {
+        'Dirt Vision': ['dirt vision', 'dirtvision', 'dv'],
+        'Gotham/Yes': ['gotham', 'yes'],
+        'Marquee': ['marquee'],
+        'Wurl': ['wurl'],
+        'Yahoo': ['yahoo']
+    }
+
     # Mapping of client names to their spreadsheet IDs
     CLIENT_SPREADSHEET_IDS = {
         'Dirt Vision': '10Tt5pcc_6_KJSisTCwEaUUnToXgVK6pX3aKpeeuc3Vs',
@@ -278,122 +268,39 @@ class ClickUpService:
     }
     def export_all_accounts_to_test_template(self):
         """Export all tasks from all boards to the test template spreadsheet, writing to the 'production' tab only, with an Account column."""
-        from src.sheets_service import GoogleSheetsService
         test_spreadsheet_id = "13raU31sm8wDz1xCQ5WpmHPbmlYgxRok1OLaH1uvJgPo"
         target_tab = "production"
 
         print("\n🔄 Exporting ALL tasks to test template spreadsheet (production tab)...")
-        all_tasks = []
-        for board_name, list_id in {**self.issue_boards, **self.feature_boards}.items():
-            tasks = self.get_tasks_from_list(list_id, board_name)
-            all_tasks.extend(tasks)
+        all_tasks = self.fetch_board_tasks(self.all_boards())
 
         # Prepare headers and rows for tasks with a customer name
-        headers = ['Account', 'Ticket ID/Link', 'Subject', 'Severity', 'Status', 'Ticket Filed By', 'Board']
-        rows_with_customer = []
-        rows_without_pipe = []
-        for task in all_tasks:
-            customer = self.extract_customer_name(task.get('name', ''))
-            has_pipe = '|' in (task.get('name', '') or '')
-            priority = task.get('priority', {})
-            severity = priority.get('priority', 'normal') if priority else 'normal'
-            status = task.get('status', {})
-            current_status = status.get('status', 'Unknown') if status else 'Unknown'
-            filer_email = ""
-            custom_fields = task.get('custom_fields', [])
-            for field in custom_fields:
-                if field.get('name') == 'Work email address?':
-                    filer_email = field.get('value', '')
-                    break
-            if not filer_email or filer_email.strip() == "":
-                filer_email = "Not Available"
-            data_row = [
-                customer if has_pipe else '',
-                task.get('url', ''),
-                task.get('name', 'No Title'),
-                severity,
-                current_status,
-                filer_email,
-                task.get('board_name', '')
-            ]
-            if has_pipe and customer:
-                rows_with_customer.append(data_row)
-            else:
-                rows_without_pipe.append(data_row)
+        headers = self.CLIENT_HEADERS
+        rows = self.format_rows(all_tasks, layout='account')
+        # The Account column is only filled when the name had a pipe and a customer before it
+        rows_with_customer = [row for row in rows if row[0]]
+        rows_without_pipe = [row for row in rows if not row[0]]
 
         sheets_service = GoogleSheetsService()
         sheets_service.SPREADSHEET_ID = test_spreadsheet_id
 
-        # Always write header to A1:G1
-        header_range = f"'{target_tab}'!A1:G1"
-        header_body = {'values': [headers]}
+        start_row = self._find_start_row(sheets_service, test_spreadsheet_id, target_tab)
+        plan = self._plan_client_sheet_write(target_tab, headers, start_row, rows_with_customer, rows_without_pipe)
         try:
-            sheets_service.service.spreadsheets().values().update(
-                spreadsheetId=test_spreadsheet_id,
-                range=header_range,
-                valueInputOption='RAW',
-                body=header_body
-            ).execute()
-        except Exception as e:
-            print(f"⚠️ Could not write header row: {e}")
-
-        # Find the last non-empty row after writing header
-        try:
-            existing_range = f"'{target_tab}'!A:G"
-            existing_result = sheets_service.service.spreadsheets().values().get(
-                spreadsheetId=test_spreadsheet_id,
-                range=existing_range
-            ).execute()
-            existing_values = existing_result.get('values', [])
-            last_row_index = -1
-            for i in range(len(existing_values)-1, -1, -1):
-                row = existing_values[i]
-                if any(cell.strip() for cell in row if cell):
-                    last_row_index = i
-                    break
-            start_row = max(last_row_index + 2, 2)  # Always start at row 2 or after last row
-        except Exception as e:
-            print(f"⚠️ Could not read existing data, starting at row 2: {e}")
-            start_row = 2
-
-        # Calculate ranges based on start_row
-        range_name1 = f"'{target_tab}'!A{start_row}:G{start_row + len(rows_with_customer) - 1}"
-        body1 = {'values': rows_with_customer}
-        start_row2 = start_row + len(rows_with_customer) + 1
-        label_text = "TASKS WITHOUT PIPE DELIMITER"
-        label_row = [[label_text] + ["" for _ in range(6)]]
-        range_label = f"'{target_tab}'!A{start_row2}:G{start_row2}"
-        range_name2 = f"'{target_tab}'!A{start_row2+1}:G{start_row2+len(rows_without_pipe)}"
-        body2 = {'values': rows_without_pipe}
-        try:
-            print(f"Writing {len(rows_with_customer)-1} tasks with customer to {range_name1}")
-            sheets_service.service.spreadsheets().values().update(
-                spreadsheetId=test_spreadsheet_id,
-                range=range_name1,
-                valueInputOption='RAW',
-                body=body1
-            ).execute()
-            print(f"Writing label row to {range_label}")
-            sheets_service.service.spreadsheets().values().update(
-                spreadsheetId=test_spreadsheet_id,
-                range=range_label,
-                valueInputOption='RAW',
-                body={'values': label_row}
-            ).execute()
-            print(f"Writing {len(rows_without_pipe)-1} tasks without pipe to {range_name2}")
-            sheets_service.service.spreadsheets().values().update(
-                spreadsheetId=test_spreadsheet_id,
-                range=range_name2,
-                valueInputOption='RAW',
-                body=body2
-            ).execute()
-            print(f"✅ Wrote {len(rows_with_customer)-1} tasks with customer and {len(rows_without_pipe)-1} tasks without pipe to tab: {target_tab}")
+            print(f"Writing {len(plan.data)} ranges in one batchUpdate")
+            sheets_service.batch_write(plan, test_spreadsheet_id)
+            self._record_written_rows(sheets_service, test_spreadsheet_id, target_tab,
+                                      start_row + len(rows_with_customer) + len(rows_without_pipe))
+            print(f"✅ Wrote {len(rows_with_customer)} tasks with customer and {len(rows_without_pipe)} tasks without pipe to tab: {target_tab}")
         except Exception as e:
             print(f"❌ Error writing to tab {target_tab}: {e}")
     def __init__(self):
         self.api_token = os.getenv('CLICKUP_API_TOKEN')
         self.team_id = os.getenv('CLICKUP_TEAM_ID')
-        self.base_url = 'https://api.clickup.com/api/v2'
+        # Override to point at a local stand-in (benchmarks/fake_api_server.py)
+        self.base_url = os.getenv('CLICKUP_BASE_URL', 'https://api.clickup.com/api/v2').rstrip('/')
+        # Shared pooled session - keeps connections to ClickUp alive between calls
+        self.http = get_http_client()
         
         self.headers = {
             'Authorization': self.api_token,
@@ -410,18 +317,38 @@ class ClickUpService:
             'Feature Requests': '901110903380'  # From the li/ URL
         }
 
+        # Bounded concurrency for board fetches; 1 worker behaves like the old sequential loop
+        self.fetch_workers = int(os.getenv('CLICKUP_FETCH_WORKERS', '8'))
+        # Pages requested ahead per board before we know where a list ends
+        self.page_window = int(os.getenv('CLICKUP_PAGE_WINDOW', '2'))
+
+        # Incremental mode: only fetch tasks updated since each list's stored watermark
+        self.incremental = os.getenv('CLICKUP_INCREMENTAL', 'false').lower() == 'true'
+        # Ignore watermarks on the next fetch and rebuild the stored snapshot from scratch
+        self.force_full_resync = False
+        self.state_store = None
+        # list_id -> {task_id: TaskRecord}; a long-running process merges deltas here instead of
+        # reloading the stored snapshot on every incremental fetch
+        self._snapshots = {}
+        # list_id -> watermark each in-memory snapshot was built at, see _list_snapshot
+        self._snapshot_watermarks = {}
+
+        # 'upsert' keeps one production row per task URL; 'append' is the old add-everything behaviour
+        self.production_mode = os.getenv('CLICKUP_PRODUCTION_MODE', 'upsert').lower()
+        # Same for the client tabs, which keep their customer / no-pipe sections in 'upsert' mode
+        self.client_mode = os.getenv('CLICKUP_CLIENT_MODE', 'upsert').lower()
+        # Client spreadsheets written concurrently by export_all_clients_to_spreadsheets; 1 = serial
+        self.client_export_workers = int(os.getenv('CLICKUP_CLIENT_EXPORT_WORKERS', '4'))
+        # Alias indexes per client set, see get_customer_router
+        self._routers = {}
+        # list_id -> filer email custom field ID (or None), see get_filer_field_id
+        self._filer_field_ids = {}
+        self._field_lock = threading.Lock()
+        self._field_list_locks = {}
+
     def extract_customer_name(self, task_name):
         """Extracts the customer name from a task name using the convention: 'Customer Name' | Short Description, or Customer Name | Short Description (no quotes)."""
-        import re
-        # Try quoted first
-        match = re.match(r'"([^"]+)"\s*\|', task_name)
-        if match:
-            return match.group(1).strip()
-        # Fallback: unquoted, take everything before the first pipe
-        match = re.match(r'([^|]+)\s*\|', task_name)
-        if match:
-            return match.group(1).strip()
-        return None
+        return extract_customer_name(task_name)
 
     def get_customer_tab_name(self, customer_name):
         """Returns a valid tab name for the customer, or None if not found."""
@@ -435,7 +362,7 @@ class ClickUpService:
         try:
             url = f"{self.base_url}/team"
             print(f"🔗 Testing connection to: {url}")
-            response = requests.get(url, headers=self.headers)
+            response = self.http.get(url, headers=self.headers)
             response.raise_for_status()
             print("✅ ClickUp API connection successful!")
             return True
@@ -443,65 +370,323 @@ class ClickUpService:
             print(f"❌ ClickUp API connection failed: {e}")
             return False
     
+    def get_filer_field_id(self, list_id):
+        """ID of the list's filer email custom field, looked up once per list from /list/{id}/field.
+
+        None if the list has no such field or the lookup failed (tasks then match the field by name).
+        """
+        with self._field_lock:
+            if list_id in self._filer_field_ids:
+                return self._filer_field_ids[list_id]
+            list_lock = self._field_list_locks.setdefault(list_id, threading.Lock())
+        # Only pages of the same list wait for its lookup; other lists' lookups run in parallel
+        with list_lock:
+            if list_id in self._filer_field_ids:
+                return self._filer_field_ids[list_id]
+            field_id = None
+            try:
+                response = self.http.get(f"{self.base_url}/list/{list_id}/field", headers=self.headers)
+                response.raise_for_status()
+                field_id = self._find_filer_field_id(response.json())
+            except requests.exceptions.RequestException as e:
+                print(f"⚠️ Could not read custom fields of list {list_id}: {e}")
+            with self._field_lock:
+                self._filer_field_ids[list_id] = field_id
+            return field_id
+
+    @staticmethod
+    def _find_filer_field_id(data):
+        for field in data.get('fields', []):
+            if field.get('name') == TaskRecord.FILER_EMAIL_FIELD:
+                return field.get('id')
+        return None
+
+    def _fetch_task_page(self, list_id, list_name, page, updated_since=None):
+        """Fetch one page of a list's tasks. Returns (tasks, is_last_page)."""
+        self.get_filer_field_id(list_id)
+        url = f"{self.base_url}/list/{list_id}/task"
+        params = self._task_page_params(page, updated_since)
+        response = self.http.get(url, headers=self.headers, params=params)
+        response.raise_for_status()
+        return self._parse_task_page(response.json(), list_id, list_name)
+
+    def _task_page_params(self, page, updated_since=None):
+        """Query parameters for one page of /list/{id}/task"""
+        params = {
+            'archived': 'false',
+            'include_closed': 'true',
+            'page': page
+        }
+        if updated_since is not None:
+            # Step back 1ms so tasks sharing the watermark's timestamp aren't skipped
+            params['date_updated_gt'] = updated_since - 1
+        return params
+
+    def _parse_task_page(self, data, list_id, list_name):
+        """Turn a /list/{id}/task response body into (tasks, is_last_page)"""
+        raw_tasks = data.get('tasks', [])
+
+        # One parse pass: keep only the fields the exports use, plus board context
+        field_id = self._filer_field_ids.get(list_id)
+        tasks = [TaskRecord.from_api(task, list_name, list_id, filer_field_id=field_id) for task in raw_tasks]
+
+        # Older responses don't carry last_page; a short page means we're done
+        is_last = data.get('last_page', len(raw_tasks) < self.PAGE_SIZE)
+        return tasks, is_last or not tasks
+
+    def iter_tasks(self, list_id, list_name="Unknown", updated_since=None):
+        """Yield every task in a ClickUp list, fetching pages lazily as the caller consumes them.
+
+        With `updated_since` (ClickUp ms timestamp) only tasks updated after it are returned.
+        """
+        page = 0
+        while True:
+            tasks, is_last = self._fetch_task_page(list_id, list_name, page, updated_since)
+            yield from tasks
+            if is_last:
+                return
+            page += 1
+
+    def get_task(self, task_id):
+        """One task as a TaskRecord (board name from our board mapping), or None if it isn't on a tracked board"""
+        response = self.http.get(f"{self.base_url}/task/{task_id}", headers=self.headers)
+        response.raise_for_status()
+        task = response.json()
+        list_id = str((task.get('list') or {}).get('id', ''))
+        board_names = {board_id: name for name, board_id in self.all_boards().items()}
+        if list_id not in board_names:
+            return None
+        return TaskRecord.from_api(task, board_names[list_id], list_id, filer_field_id=self.get_filer_field_id(list_id))
+
     def get_tasks_from_list(self, list_id, list_name="Unknown"):
-        """Get tasks from a specific ClickUp list"""
+        """Get all tasks from a specific ClickUp list (every page)"""
         try:
-            url = f"{self.base_url}/list/{list_id}/task"
             print(f"📋 Fetching tasks from {list_name} (ID: {list_id})...")
-            
-            params = {
-                'archived': 'false',
-                'include_closed': 'true'
-            }
-            
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            
-            tasks = response.json().get('tasks', [])
+
+            tasks = list(self.iter_tasks(list_id, list_name))
             print(f"✅ Found {len(tasks)} tasks in {list_name}")
-            
-            # Add board context to each task
-            for task in tasks:
-                task['board_name'] = list_name
-                task['board_id'] = list_id
-            
+
             return tasks
-            
+
         except requests.exceptions.RequestException as e:
             print(f"❌ Error fetching tasks from {list_name}: {e}")
             return []
-    
+
+    def fetch_boards(self, boards, full_resync=None):
+        """Fetch every page of every board concurrently on a bounded thread pool.
+
+        `boards` maps board name -> list ID. Results come back in the same order as a
+        sequential loop would produce: board order first, then page order. Up to
+        `page_window` pages per board are requested ahead of knowing where the list ends.
+
+        In incremental mode only tasks changed since each list's watermark are requested,
+        merged into the stored snapshot, and the full merged snapshot is returned.
+
+        Each board maps to a TaskSnapshot; a board whose fetch failed is listed in its
+        `failed_boards`, so callers know its tasks are missing.
+        """
+        boards = dict(boards)
+        pages = {name: {} for name in boards}
+        last_page = {}
+        failed = set()
+        next_page = {}
+
+        if full_resync is None:
+            full_resync = self.force_full_resync
+        since = {}
+        if self.incremental and not full_resync:
+            since = {name: self._get_list_watermark(list_id) for name, list_id in boards.items()}
+
+        for board_name, list_id in boards.items():
+            if since.get(board_name) is not None:
+                print(f"📋 Fetching tasks updated in {board_name} (ID: {list_id}) since last sync...")
+            else:
+                print(f"📋 Fetching tasks from {board_name} (ID: {list_id})...")
+
+        with ThreadPoolExecutor(max_workers=max(1, self.fetch_workers)) as pool:
+            pending = {}
+
+            def submit(board_name, page):
+                future = pool.submit(self._fetch_task_page, boards[board_name], board_name, page, since.get(board_name))
+                pending[future] = (board_name, page)
+
+            for board_name in boards:
+                # Deltas are usually a single short page, so don't speculate past page 0
+                window = 1 if since.get(board_name) is not None else max(1, self.page_window)
+                for page in range(window):
+                    submit(board_name, page)
+                next_page[board_name] = window
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    board_name, page = pending.pop(future)
+                    if board_name in failed:
+                        continue
+                    try:
+                        tasks, is_last = future.result()
+                    except requests.exceptions.RequestException as e:
+                        print(f"❌ Error fetching tasks from {board_name}: {e}")
+                        failed.add(board_name)
+                        continue
+                    pages[board_name][page] = tasks
+                    if is_last:
+                        last_page[board_name] = min(page, last_page.get(board_name, page))
+                    elif board_name not in last_page:
+                        submit(board_name, next_page[board_name])
+                        next_page[board_name] += 1
+
+        results = {}
+        for board_name in boards:
+            board_tasks = []
+            if board_name in failed:
+                if self.incremental:
+                    # Reuse the last snapshot of the list; its watermark stays put so nothing is skipped
+                    board_tasks = list(self._list_snapshot(boards[board_name])[0].values())
+                    print(f"⚠️ {board_name} could not be fetched; reusing its last snapshot ({len(board_tasks)} tasks)")
+                else:
+                    print(f"⚠️ {board_name} could not be fetched; its tasks are missing from this snapshot")
+            else:
+                stop = last_page.get(board_name)
+                for page in sorted(pages[board_name]):
+                    if stop is not None and page > stop:
+                        break
+                    board_tasks.extend(pages[board_name][page])
+                if self.incremental:
+                    changed = len(board_tasks)
+                    board_tasks = self._merge_list_snapshot(boards[board_name], board_tasks, since.get(board_name) is None)
+                    print(f"✅ Found {len(board_tasks)} tasks in {board_name} ({changed} fetched)")
+                else:
+                    print(f"✅ Found {len(board_tasks)} tasks in {board_name}")
+            results[board_name] = TaskSnapshot(board_tasks, [board_name] if board_name in failed else [])
+        return results
+
+    def get_state_store(self):
+        """SQLite store holding per-list watermarks and task snapshots for incremental mode"""
+        if self.state_store is None:
+            self.state_store = SyncStateStore(os.getenv('CLICKUP_SYNC_STATE') or None)
+        return self.state_store
+
+    def _get_list_watermark(self, list_id):
+        value = self.get_state_store().get_watermark('clickup', list_id)
+        return int(value) if value else None
+
+    def _list_snapshot(self, list_id):
+        """({task_id: TaskRecord}, watermark) of a list: the in-memory snapshot, or the stored one.
+
+        Another process sharing the state store (a CLI --incremental run next to the daemon) may
+        have merged deltas and moved the stored watermark past ours; the in-memory snapshot
+        lacks those tasks then, so the stored snapshot is loaded instead.
+        """
+        watermark = self._get_list_watermark(list_id) or 0
+        snapshot = self._snapshots.get(list_id)
+        if snapshot is None or self._snapshot_watermarks.get(list_id) != watermark:
+            store = self.get_state_store()
+            loaded = (TaskRecord.from_dict(record) for record in store.load_records('clickup', list_id))
+            snapshot = {task.id: task for task in loaded}
+        return snapshot, watermark
+
+    def _merge_list_snapshot(self, list_id, fetched, full):
+        """Merge fetched tasks into the stored snapshot for a list and advance its watermark.
+
+        A full fetch replaces the snapshot outright, which also drops tasks that were
+        deleted or archived since the last full resync.
+        """
+        store = self.get_state_store()
+        records = {task.id: task.to_dict() for task in fetched}
+        if full:
+            store.replace_records('clickup', list_id, records)
+            snapshot = {}
+            watermark = 0
+        else:
+            store.upsert_records('clickup', list_id, records)
+            snapshot, watermark = self._list_snapshot(list_id)
+        # Same ordering as the store: updated tasks keep their place, new ones go last
+        for task in fetched:
+            snapshot[task.id] = task
+            watermark = max(watermark, task.date_updated)
+        self._snapshots[list_id] = snapshot
+        self._snapshot_watermarks[list_id] = watermark
+        if watermark:
+            store.set_watermark('clickup', list_id, str(watermark))
+        return list(snapshot.values())
+
+    def resync_all(self):
+        """Full resync of every board: refetch everything and rebuild the stored snapshots"""
+        return self.fetch_board_tasks(self.all_boards(), full_resync=True)
+
+    def fetch_board_tasks(self, boards, full_resync=None):
+        """Fetch all boards concurrently and return their tasks as one TaskSnapshot in board order"""
+        all_tasks = []
+        failed_boards = []
+        with get_metrics().phase('fetch'):
+            fetched = self.fetch_boards(boards, full_resync=full_resync)
+        for tasks in fetched.values():
+            all_tasks.extend(tasks)
+            failed_boards.extend(tasks.failed_boards)
+        return TaskSnapshot(all_tasks, failed_boards)
+
+    def all_boards(self):
+        """Issue boards followed by feature boards"""
+        return {**self.issue_boards, **self.feature_boards}
+
     def get_issue_tasks(self):
         """Get tasks from issue boards (External + Internal) for production tab"""
-        all_issues = []
-        
         print("\n🚀 Fetching ISSUE tasks for production tab...")
         
-        for board_name, list_id in self.issue_boards.items():
-            tasks = self.get_tasks_from_list(list_id, board_name)
-            all_issues.extend(tasks)
+        all_issues = self.fetch_board_tasks(self.issue_boards)
         
         print(f"📊 Total issue tasks: {len(all_issues)}")
         return all_issues
     
     def get_feature_tasks(self):
         """Get tasks from feature boards for Project Summary tab"""
-        all_features = []
-        
         print("\n🚀 Fetching FEATURE tasks for Project Summary tab...")
         
-        for board_name, list_id in self.feature_boards.items():
-            tasks = self.get_tasks_from_list(list_id, board_name)
-            all_features.extend(tasks)
+        all_features = self.fetch_board_tasks(self.feature_boards)
         
         print(f"📊 Total feature tasks: {len(all_features)}")
         return all_features
     
+    def format_production_row(self, task):
+        """Production tab row (columns A-E) for a task"""
+        return self.format_rows([task], layout='production')[0]
+
+    def production_upsert(self, sheets_service, target_tab="production"):
+        """RowUpsertSync for the production tab, keyed by task URL, index kept in the state store"""
+        return RowUpsertSync(
+            sheets_service,
+            sheets_service.SPREADSHEET_ID,
+            target_tab,
+            width=len(self.PRODUCTION_HEADERS),
+            key_column=0,
+            header=self.PRODUCTION_HEADERS,
+            index_store=self.get_state_store(),
+            probe_columns='A:A'
+        )
+
+    def client_upsert(self, sheets_service, spreadsheet_id, target_tab):
+        """SectionedUpsertSync for a client tab: customer rows, the no-pipe label, rows without a pipe.
+
+        Keyed by task URL (column B), index kept in the state store.
+        """
+        return SectionedUpsertSync(
+            sheets_service,
+            spreadsheet_id,
+            target_tab,
+            width=len(self.CLIENT_HEADERS),
+            separators=[self.NO_PIPE_LABEL_ROW],
+            key_column=1,
+            header=self.CLIENT_HEADERS,
+            index_store=self.get_state_store(),
+            # Column A is blank on no-pipe rows; B always holds the ticket link
+            probe_columns='A:B'
+        )
+
+    @instrumented('export_issues_to_production')
     def export_issues_to_production(self):
-        """Export issue tasks to production tab - add new rows only, don't clear existing data"""
+        """Export issue tasks to production tab - one row per task, rewriting only rows that changed"""
         try:
-            from sheets_service import GoogleSheetsService
-            
             print("\n🔄 Exporting ISSUES to production tab...")
             
             tasks = self.get_issue_tasks()
@@ -512,75 +697,35 @@ class ClickUpService:
             
             sheets_service = GoogleSheetsService()
             target_tab = "production"
+            with get_metrics().phase('format'):
+                rows = self.format_rows(tasks, layout='production')
             
-            # Check if data already exists
+            if self.production_mode == 'upsert':
+                # Rows of a board that failed to fetch must survive: only prune from a complete snapshot
+                complete = getattr(tasks, 'complete', True)
+                stats = self.production_upsert(sheets_service, target_tab).sync(rows, prune=complete)
+                if not complete:
+                    print(f"⚠️ Production tab: {stats['updated']} rows updated, {stats['appended']} appended, "
+                          f"{stats['unchanged']} unchanged; nothing removed because "
+                          f"{', '.join(tasks.failed_boards)} could not be fetched")
+                    return False
+                print(f"✅ SUCCESS! Production tab: {stats['updated']} rows updated, "
+                      f"{stats['appended']} appended, {stats['unchanged']} unchanged, {stats['removed']} removed")
+                return True
+            
+            # Append mode: find the append position from column A only (or the recorded last row)
             try:
-                existing_range = f"'{target_tab}'!A1:E1000"  # Check existing data
-                existing_result = sheets_service.service.spreadsheets().values().get(
-                    spreadsheetId=sheets_service.SPREADSHEET_ID,
-                    range=existing_range
-                ).execute()
-                
-                existing_values = existing_result.get('values', [])
-                
-                # Find the last row with data
-                last_row = 0
-                for i, row in enumerate(existing_values):
-                    if any(cell.strip() for cell in row if cell):  # If any cell has content
-                        last_row = i + 1
-                
+                start_row = sheets_service.append_position.next_row(sheets_service.SPREADSHEET_ID, target_tab)
                 # If no data exists, start at row 1 with headers
-                if last_row == 0:
-                    start_row = 1
-                    include_headers = True
-                else:
-                    # Data exists, start after last row
-                    start_row = last_row + 1
-                    include_headers = False
-                    
+                include_headers = start_row == 1
             except Exception as e:
                 print(f"⚠️ Could not read existing data, starting at row 1: {e}")
                 start_row = 1
                 include_headers = True
             
-            # Prepare data rows
-            rows = []
-            
             # Add headers only if no data exists
             if include_headers:
-                headers = ['Ticket ID/Link', 'Subject', 'Severity', 'Status', 'Ticket Filed By']
-                rows.append(headers)
-            
-            for task in tasks:
-                # Get priority as-is from ClickUp
-                priority = task.get('priority', {})
-                severity = priority.get('priority', 'normal') if priority else 'normal'
-                
-                # Get status as-is from ClickUp
-                status = task.get('status', {})
-                current_status = status.get('status', 'Unknown') if status else 'Unknown'
-                
-                # Get filer email from custom fields
-                filer_email = ""
-                custom_fields = task.get('custom_fields', [])
-                for field in custom_fields:
-                    if field.get('name') == 'Work email address?':
-                        filer_email = field.get('value', '')
-                        break
-                
-                # If email is empty or None, use "Not Available"
-                if not filer_email or filer_email.strip() == "":
-                    filer_email = "Not Available"
-                
-                data_row = [
-                    task.get('url', ''),              # A: Ticket ID/Link
-                    task.get('name', 'No Title'),     # B: Subject
-                    severity,                         # C: Severity
-                    current_status,                   # D: Status  
-                    filer_email                       # E: Ticket Filed By
-                ]
-                
-                rows.append(data_row)
+                rows.insert(0, self.PRODUCTION_HEADERS)
             
             # Write new data - only 5 columns (A-E)
             body = {'values': rows}
@@ -594,6 +739,8 @@ class ClickUpService:
                 body=body
             ).execute()
             
+            self._record_written_rows(sheets_service, sheets_service.SPREADSHEET_ID, target_tab, start_row + len(rows) - 1)
+            
             print(f"✅ SUCCESS! Added {len(rows)} rows to production tab starting at row {start_row}")
             print(f"📊 Range used: {range_name}")
             return True
@@ -605,8 +752,6 @@ class ClickUpService:
     def export_features_to_project_summary(self):
         """Export feature requests to Project Summary tab - write only if no data exists"""
         try:
-            from sheets_service import GoogleSheetsService
-            
             print("\n🔄 Exporting FEATURES to Project Summary tab...")
             
             tasks = self.get_feature_tasks()
@@ -641,20 +786,12 @@ class ClickUpService:
             rows = [headers]
             
             for task in tasks:
-                # Get status as-is from ClickUp
-                status = task.get('status', {})
-                current_status = status.get('status', 'Unknown') if status else 'Unknown'
-                
-                # Get assignees for Owner/Group
-                assignees = task.get('assignees', [])
-                owner = assignees[0].get('username', '') if assignees else ''
-                
                 data_row = [
                     'Feature Request',  # Type of Request
-                    task.get('name', 'No Title'),  # Summary / Requirements
+                    task.name or 'No Title',  # Summary / Requirements
                     '',  # Notes/Next Steps (blank for now)
-                    current_status,  # Status
-                    owner  # Owner/Group
+                    task.status,  # Status
+                    task.owner  # Owner/Group (first assignee)
                 ]
                 
                 rows.append(data_row)
@@ -677,6 +814,7 @@ class ClickUpService:
             print(f"❌ Error exporting features: {e}")
             return False
     
+    @instrumented('export_all')
     def export_all(self):
         """Export both issues and features to their respective tabs"""
         issues_success = self.export_issues_to_production()
@@ -684,19 +822,67 @@ class ClickUpService:
         
         return issues_success and features_success
 
-    def export_all_clients_to_spreadsheets(self):
-        """Export all tasks for each client to their specific spreadsheet, using the efficient last-row logic."""
-        for client_name, spreadsheet_id in self.CLIENT_SPREADSHEET_IDS.items():
-            print(f"\n{'='*60}\nExporting for client: {client_name}\n{'='*60}")
-            try:
-                self.export_single_client_to_spreadsheet(client_name)
-            except Exception as e:
-                print(f"❌ Error exporting for {client_name}: {e}")
+    @instrumented('export_all_clients_to_spreadsheets')
+    def export_all_clients_to_spreadsheets(self, workers=None):
+        """Export all tasks for each client to their specific spreadsheet from one shared task snapshot.
+
+        Boards are fetched once and partitioned across clients in a single pass, so ClickUp
+        traffic stays constant no matter how many clients are mapped. Each client writes its
+        own spreadsheet, so up to `workers` (default client_export_workers) exports run at once;
+        a failing client never stops the others. Returns {client: {'ok', 'error', 'seconds'}}.
+        """
+        workers = max(1, workers or self.client_export_workers)
+        print("\n🚀 Fetching task snapshot for all clients...")
+        snapshot = self.fetch_task_snapshot()
+        partitions = self.partition_tasks_by_client(snapshot)
+
+        summary = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                client_name: executor.submit(self._export_client, client_name, partitions[client_name])
+                for client_name in self.CLIENT_SPREADSHEET_IDS
+            }
+            for client_name, future in futures.items():
+                summary[client_name] = future.result()
 
+        self._print_client_export_summary(summary)
+        return summary
+
+    def _export_client(self, client_name, client_tasks):
+        """Run one client's export and report its outcome instead of raising"""
+        print(f"\n{'='*60}\nExporting for client: {client_name}\n{'='*60}")
+        started = time.perf_counter()
+        try:
+            ok = bool(self.export_single_client_to_spreadsheet(client_name, client_tasks=client_tasks))
+            error = None if ok else 'export reported failure'
+        except Exception as e:
+            print(f"❌ Error exporting for {client_name}: {e}")
+            ok, error = False, str(e)
+        return {'ok': ok, 'error': error, 'seconds': round(time.perf_counter() - started, 3)}
+
+    def _print_client_export_summary(self, summary):
+        succeeded = [name for name, result in summary.items() if result['ok']]
+        print(f"\n📊 Client export summary: {len(succeeded)}/{len(summary)} succeeded")
+        for client_name, result in summary.items():
+            if result['ok']:
+                print(f"  ✅ {client_name} ({result['seconds']}s)")
+            else:
+                print(f"  ❌ {client_name} ({result['seconds']}s): {result['error']}")
 
 if __name__ == "__main__":
     import sys
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(), format='%(message)s')
     service = ClickUpService()
+    if '--incremental' in sys.argv:
+        service.incremental = True
+    if '--full-resync' in sys.argv:
+        service.incremental = True
+        service.force_full_resync = True
+    for arg in sys.argv:
+        if arg.startswith('--workers='):
+            service.client_export_workers = int(arg.split('=', 1)[1])
+        if arg.startswith('--metrics-dir='):
+            get_metrics().output_dir = arg.split('=', 1)[1]
     if len(sys.argv) > 1 and sys.argv[1].lower() == 'dirtvision':
         # Only export for Dirt Vision
         if service.test_connection():
@@ -726,4 +912,6 @@ if __name__ == "__main__":
             print("  - service.export_features_to_project_summary() - Export features only")
             print("  - service.export_all() - Export both")
             print("  - python src/clickup_service.py dirtvision   # Export only Dirt Vision")
-            print("  - python src/clickup_service.py allclients   # Export all mapped clients")
\ No newline at end of file
+            print("  - python src/clickup_service.py allclients   # Export all mapped clients")
+            print("  - add --incremental to fetch only tasks changed since the last run, --full-resync to rebuild")
+            print("  - add --workers=N to export N client spreadsheets at once (allclients)")
\ No newline at end of file
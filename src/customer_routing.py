@@ -0,0 +1,115 @@
+import re
+from functools import lru_cache
+
+# 'Customer Name' | Short Description - quoted first, then everything before the first pipe
+QUOTED_CUSTOMER = re.compile(r'"([^"]+)"\s*\|')
+UNQUOTED_CUSTOMER = re.compile(r'([^|]+)\s*\|')
+
+# Task names repeat across runs and boards; this bounds memory on huge snapshots
+EXTRACT_CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=EXTRACT_CACHE_SIZE)
+def extract_customer_name(task_name):
+    """Customer name from 'Customer Name' | Short Description (quotes optional), or None"""
+    if not task_name:
+        return None
+    match = QUOTED_CUSTOMER.match(task_name)
+    if match:
+        return match.group(1).strip()
+    match = UNQUOTED_CUSTOMER.match(task_name)
+    if match:
+        return match.group(1).strip()
+    return None
+
+
+class AliasIndex:
+    """Aho-Corasick automaton over lower-cased aliases.
+
+    One left-to-right scan of a string finds every alias occurring in it, however many
+    aliases there are. Each node's matches are a bitmask of client positions, so a scan
+    only ORs integers and the result decodes straight back to clients in their original order.
+    """
+
+    def __init__(self, aliases_by_client):
+        self.clients = list(aliases_by_client)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [0]
+        for position, client in enumerate(self.clients):
+            for alias in aliases_by_client[client]:
+                if alias:
+                    self._insert(alias.lower(), 1 << position)
+        self._link()
+        self._decode = lru_cache(maxsize=None)(self._decode_mask)
+
+    def _insert(self, alias, bit):
+        node = 0
+        for char in alias:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(0)
+            node = nxt
+        self._out[node] |= bit
+
+    def _link(self):
+        # Breadth-first so every fail target is finished before it is inherited from
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] |= self._out[self._fail[child]]
+
+    def _decode_mask(self, mask):
+        return tuple(client for position, client in enumerate(self.clients) if mask >> position & 1)
+
+    def match_mask(self, text):
+        """Bitmask of the clients with an alias occurring anywhere in `text` (already lower-cased)"""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        mask = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            mask |= out[node]
+        return mask
+
+    def match(self, text):
+        """Clients (in index order) with an alias occurring anywhere in `text`"""
+        return self._decode(self.match_mask(text.lower()))
+
+
+class CustomerRouter:
+    """Routes task names to clients: extract the customer, then one alias-index scan.
+
+    A task goes to every client whose alias appears in its extracted customer name.
+    """
+
+    def __init__(self, aliases_by_client, cache_size=EXTRACT_CACHE_SIZE):
+        self.index = AliasIndex(aliases_by_client)
+        self.clients = self.index.clients
+        self.route = lru_cache(maxsize=cache_size)(self._route)
+
+    def _route(self, task_name):
+        customer = extract_customer_name(task_name)
+        if not customer:
+            return ()
+        return self.index.match(customer)
+
+    def partition(self, tasks, name_of=lambda task: task.name):
+        """{client: [tasks]} for every client in the index, in one pass over `tasks`"""
+        partitions = {client: [] for client in self.clients}
+        for task in tasks:
+            for client in self.route(name_of(task)):
+                partitions[client].append(task)
+        return partitions
@@ -0,0 +1,176 @@
+import os
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+try:
+    from metrics import get_metrics, endpoint_name
+except ModuleNotFoundError:
+    from src.metrics import get_metrics, endpoint_name
+
+# (connect, read) timeout in seconds applied when a caller doesn't pass one
+DEFAULT_TIMEOUT = (5, 30)
+# Times a rate-limited (429) request is retried, honouring the server's Retry-After
+DEFAULT_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '3'))
+
+
+def rate_limit_retry(max_retries=DEFAULT_MAX_RETRIES):
+    """urllib3 Retry that waits out 429s; other errors still surface to the caller"""
+    return Retry(
+        total=max_retries,
+        connect=0,
+        read=0,
+        status_forcelist=(429,),
+        # Asana's /batch is a POST but only reads, so it is as safe to replay as a GET
+        allowed_methods=frozenset({'GET', 'POST'}),
+        respect_retry_after_header=True,
+        backoff_factor=0.5,
+        raise_on_status=False
+    )
+
+
+class TransportStats:
+    """Thread-safe per-host counters for connections opened and requests sent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._opened = {}
+        self._requests = {}
+
+    def connection_opened(self, host):
+        with self._lock:
+            self._opened[host] = self._opened.get(host, 0) + 1
+
+    def request_sent(self, host):
+        with self._lock:
+            self._requests[host] = self._requests.get(host, 0) + 1
+
+    def snapshot(self):
+        """Return counters per host plus totals, e.g. {'hosts': {...}, 'opened': 2, 'reused': 40}"""
+        with self._lock:
+            hosts = {}
+            for host in set(self._opened) | set(self._requests):
+                opened = self._opened.get(host, 0)
+                sent = self._requests.get(host, 0)
+                hosts[host] = {
+                    'requests': sent,
+                    'opened': opened,
+                    'reused': max(sent - opened, 0)
+                }
+        return {
+            'hosts': hosts,
+            'requests': sum(h['requests'] for h in hosts.values()),
+            'opened': sum(h['opened'] for h in hosts.values()),
+            'reused': sum(h['reused'] for h in hosts.values())
+        }
+
+    def reset(self):
+        with self._lock:
+            self._opened.clear()
+            self._requests.clear()
+
+
+def _counting_pool(base, stats):
+    """Build a urllib3 pool class that reports every new connection to stats."""
+    class CountingPool(base):
+        def _new_conn(self):
+            stats.connection_opened(self.host)
+            return super()._new_conn()
+    CountingPool.__name__ = f"Counting{base.__name__}"
+    return CountingPool
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that keeps connections alive per host and counts opens vs reuses."""
+
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool(HTTPConnectionPool, self.stats),
+            'https': _counting_pool(HTTPSConnectionPool, self.stats)
+        }
+
+    def send(self, request, **kwargs):
+        self.stats.request_sent(requests.utils.urlparse(request.url).hostname)
+        return super().send(request, **kwargs)
+
+
+def _retries_taken(response):
+    """How many times urllib3 re-sent this request (429s waited out) before the final response"""
+    retries = getattr(response.raw, 'retries', None)
+    return len(retries.history) if retries is not None else 0
+
+
+class HttpClient:
+    """Pooled keep-alive HTTP client shared by the ClickUp and Asana services."""
+
+    def __init__(self, pool_connections=10, pool_maxsize=20, timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES):
+        self.timeout = timeout
+        self.stats = TransportStats()
+        self.session = requests.Session()
+        # Ask for compressed bodies; requests decodes gzip/deflate transparently
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+        # pool_connections = number of hosts kept, pool_maxsize = sockets kept per host
+        adapter = CountingHTTPAdapter(
+            self.stats,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=rate_limit_retry(max_retries)
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        """Send a request through the shared session, applying the default timeout"""
+        kwargs.setdefault('timeout', self.timeout)
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except Exception:
+            get_metrics().record_call(endpoint_name(method, url), None, seconds=time.perf_counter() - started)
+            raise
+        get_metrics().record_call(
+            endpoint_name(method, url),
+            response.status_code,
+            response_bytes=len(response.content),
+            seconds=time.perf_counter() - started,
+            retries=_retries_taken(response)
+        )
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def connection_stats(self):
+        """Connections opened and reused so far, per host and in total"""
+        return self.stats.snapshot()
+
+    def close(self):
+        self.session.close()
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client():
+    """Return the process-wide pooled HttpClient, creating it on first use"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_lock:
+            if _shared_client is None:
+                _shared_client = HttpClient()
+    return _shared_client
@@ -0,0 +1,219 @@
+import os
+import re
+import json
+import time
+import threading
+import functools
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+# Phases every export reports, in display order
+PHASES = ('fetch', 'route', 'format', 'sheet_read', 'sheet_write')
+
+# Path segments that are IDs (ClickUp list/task IDs, Asana gids, spreadsheet IDs, A1 ranges)
+_ID_SEGMENT = re.compile(r"\d|[!'%]")
+# ...but not API versions (v2, 1.0, v4)
+_VERSION_SEGMENT = re.compile(r"^(v\d+|\d+\.\d+)$")
+
+
+def endpoint_name(method, url):
+    """'GET api.clickup.com/api/v2/list/{id}/task' - IDs templated so calls group per endpoint"""
+    parsed = urlparse(url)
+    segments = []
+    for segment in parsed.path.split('/'):
+        # Sheets puts the action after a colon (/spreadsheets/{id}:batchUpdate); A1 ranges have colons too
+        name, colon, action = segment.partition(':')
+        keep_action = action.isalpha() and action[0].islower()
+        if (_ID_SEGMENT.search(name) and not _VERSION_SEGMENT.match(name)) or (colon and not keep_action):
+            name = '{id}'
+        segments.append(name + colon + action if keep_action else name)
+    return f"{method} {parsed.hostname}{'/'.join(segments)}"
+
+
+def run_succeeded(result):
+    """Entry points return a bool, or a {client: {'ok': ...}} summary"""
+    if isinstance(result, dict):
+        return all(entry.get('ok') for entry in result.values() if isinstance(entry, dict))
+    return bool(result)
+
+
+class RunMetrics:
+    """Thread-safe counters for one export run: phase timings, API calls, retries and rows written.
+
+    Phase seconds are summed over threads, so with concurrent exports they can exceed the
+    run's wall time. Nested entry points (export_all_clients_to_spreadsheets calling
+    export_single_client_to_spreadsheet) are folded into the outermost run.
+    """
+
+    def __init__(self, output_dir=None):
+        self.output_dir = output_dir
+        self._lock = threading.Lock()
+        self._depth = 0
+        self.reset()
+
+    def reset(self, run_name=None):
+        with self._lock:
+            self.run_name = run_name
+            self.started_at = time.time()
+            self.phases = {}
+            self.api = {}
+            self.rows_written = 0
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - started)
+
+    def add_phase(self, name, seconds):
+        with self._lock:
+            entry = self.phases.setdefault(name, {'seconds': 0.0, 'count': 0})
+            entry['seconds'] += seconds
+            entry['count'] += 1
+
+    def record_call(self, endpoint, status, response_bytes=0, seconds=0.0, retries=0):
+        with self._lock:
+            entry = self.api.setdefault(endpoint, {'calls': 0, 'bytes': 0, 'seconds': 0.0, 'retries': 0, 'errors': 0})
+            entry['calls'] += 1
+            entry['bytes'] += response_bytes
+            entry['seconds'] += seconds
+            entry['retries'] += retries
+            if status is None or status >= 400:
+                entry['errors'] += 1
+
+    def add_rows_written(self, count):
+        with self._lock:
+            self.rows_written += count
+
+    @contextmanager
+    def run(self, name):
+        """Scope of one entry point; the outermost one resets the counters and writes the reports"""
+        with self._lock:
+            outermost = self._depth == 0
+            self._depth += 1
+        if outermost:
+            self.reset(name)
+        outcome = {'ok': False}
+        try:
+            yield outcome
+        finally:
+            with self._lock:
+                self._depth -= 1
+            if outermost:
+                self.finish(outcome['ok'])
+
+    def report(self, ok=None):
+        with self._lock:
+            finished_at = time.time()
+            return {
+                'run': self.run_name,
+                'ok': ok,
+                'started_at': datetime.fromtimestamp(self.started_at, timezone.utc).isoformat(timespec='seconds'),
+                'finished_at': datetime.fromtimestamp(finished_at, timezone.utc).isoformat(timespec='seconds'),
+                'seconds': round(finished_at - self.started_at, 3),
+                'phases': {name: {'seconds': round(entry['seconds'], 3), 'count': entry['count']}
+                           for name, entry in sorted(self.phases.items(), key=lambda item: _phase_order(item[0]))},
+                'api': {endpoint: dict(entry, seconds=round(entry['seconds'], 3))
+                        for endpoint, entry in sorted(self.api.items())},
+                'api_calls': sum(entry['calls'] for entry in self.api.values()),
+                'retries': sum(entry['retries'] for entry in self.api.values()),
+                'rows_written': self.rows_written,
+            }
+
+    def finish(self, ok):
+        """Print a one-line summary and, when an output directory is set, write both reports"""
+        report = self.report(ok)
+        phases = ', '.join(f"{name} {entry['seconds']}s" for name, entry in report['phases'].items())
+        print(f"📈 {report['run']}: {report['seconds']}s, {report['api_calls']} API calls, "
+              f"{report['retries']} retries, {report['rows_written']} rows written ({phases or 'no phases'})")
+        if self.output_dir:
+            try:
+                self.write_reports(report)
+            except Exception as e:
+                print(f"⚠️ Could not write metrics reports: {e}")
+        return report
+
+    def write_reports(self, report):
+        os.makedirs(self.output_dir, exist_ok=True)
+        _write_atomic(os.path.join(self.output_dir, f"{report['run']}.json"), json.dumps(report, indent=2))
+        _write_atomic(os.path.join(self.output_dir, f"{report['run']}.prom"), prometheus_text(report))
+
+
+def _phase_order(name):
+    return (PHASES.index(name) if name in PHASES else len(PHASES), name)
+
+
+def _write_atomic(path, text):
+    # node_exporter's textfile collector may read at any moment, so never expose a partial file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_label_value(value)}"' for key, value in labels.items()) + '}'
+
+
+def prometheus_text(report):
+    """A run report in the Prometheus text exposition format (for the node_exporter textfile collector)"""
+    run = report['run']
+    finished = datetime.fromisoformat(report['finished_at']).timestamp()
+    metrics = [
+        ('tracker_run_duration_seconds', 'gauge', 'Wall time of the last run',
+         [(_labels(run=run), report['seconds'])]),
+        ('tracker_run_success', 'gauge', '1 if the last run succeeded',
+         [(_labels(run=run), 1 if report['ok'] else 0)]),
+        ('tracker_run_last_timestamp_seconds', 'gauge', 'When the last run finished',
+         [(_labels(run=run), int(finished))]),
+        ('tracker_phase_duration_seconds', 'gauge', 'Seconds spent per phase in the last run',
+         [(_labels(run=run, phase=name), entry['seconds']) for name, entry in report['phases'].items()]),
+        ('tracker_api_requests', 'gauge', 'API calls per endpoint in the last run',
+         [(_labels(run=run, endpoint=name), entry['calls']) for name, entry in report['api'].items()]),
+        ('tracker_api_response_bytes', 'gauge', 'Response bytes per endpoint in the last run',
+         [(_labels(run=run, endpoint=name), entry['bytes']) for name, entry in report['api'].items()]),
+        ('tracker_api_retries', 'gauge', 'Retried calls per endpoint in the last run',
+         [(_labels(run=run, endpoint=name), entry['retries']) for name, entry in report['api'].items()]),
+        ('tracker_rows_written', 'gauge', 'Sheet rows written in the last run',
+         [(_labels(run=run), report['rows_written'])]),
+    ]
+    lines = []
+    for name, kind, help_text, samples in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+    return '\n'.join(lines) + '\n'
+
+
+_shared_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """Process-wide RunMetrics; reports go to METRICS_DIR when it is set"""
+    global _shared_metrics
+    if _shared_metrics is None:
+        with _metrics_lock:
+            if _shared_metrics is None:
+                _shared_metrics = RunMetrics(output_dir=os.getenv('METRICS_DIR'))
+    return _shared_metrics
+
+
+def instrumented(run_name):
+    """Decorator for export entry points: times the run and reports it when the outermost call returns"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with get_metrics().run(run_name) as outcome:
+                result = fn(*args, **kwargs)
+                outcome['ok'] = run_succeeded(result)
+                return result
+        return wrapper
+    return decorator
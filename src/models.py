@@ -0,0 +1,151 @@
+class TaskRecord:
+    """Compact ClickUp task: only the fields the exports read, parsed once from the API dict.
+
+    The raw task (description, checklists, watchers, every custom field...) is dropped
+    as soon as the record is built, so snapshots hold a handful of strings per task.
+    """
+
+    __slots__ = ('id', 'name', 'url', 'severity', 'status', 'filer_email', 'owner',
+                 'date_updated', 'board_name', 'board_id')
+
+    # Custom field holding the email of whoever filed the ticket
+    FILER_EMAIL_FIELD = 'Work email address?'
+
+    def __init__(self, id, name='', url='', severity='normal', status='Unknown', filer_email='Not Available',
+                 owner='', date_updated=0, board_name='', board_id=''):
+        self.id = id
+        self.name = name
+        self.url = url
+        self.severity = severity
+        self.status = status
+        self.filer_email = filer_email
+        self.owner = owner
+        self.date_updated = date_updated
+        self.board_name = board_name
+        self.board_id = board_id
+
+    @classmethod
+    def from_api(cls, task, board_name=None, board_id=None, filer_field_id=None):
+        """Build a record from a /list/{id}/task entry.
+
+        With `filer_field_id` (resolved once per list) the email field is matched by ID
+        instead of comparing every custom field's name.
+        """
+        # Get priority and status as-is from ClickUp
+        priority = task.get('priority')
+        status = task.get('status')
+
+        # Get filer email from custom fields; empty or missing becomes "Not Available"
+        filer_email = ''
+        key, wanted = ('id', filer_field_id) if filer_field_id else ('name', cls.FILER_EMAIL_FIELD)
+        for field in task.get('custom_fields') or []:
+            if field.get(key) == wanted:
+                filer_email = field.get('value') or ''
+                break
+        if not isinstance(filer_email, str) or not filer_email.strip():
+            filer_email = 'Not Available'
+
+        # First assignee is the Owner/Group of feature requests
+        assignees = task.get('assignees') or []
+
+        return cls(
+            id=task.get('id'),
+            name=task.get('name') or '',
+            url=task.get('url', ''),
+            severity=(priority.get('priority') or 'normal') if priority else 'normal',
+            status=(status.get('status') or 'Unknown') if status else 'Unknown',
+            filer_email=filer_email,
+            owner=assignees[0].get('username', '') if assignees else '',
+            date_updated=int(task.get('date_updated') or 0),
+            board_name=board_name if board_name is not None else task.get('board_name', ''),
+            board_id=board_id if board_id is not None else task.get('board_id', ''),
+        )
+
+    @classmethod
+    def coerce(cls, task):
+        """Accept either a record or a raw ClickUp task dict"""
+        return task if isinstance(task, cls) else cls.from_api(task)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Inverse of to_dict; raw API dicts (e.g. snapshots stored before records existed) are parsed instead"""
+        if 'severity' not in data:
+            return cls.from_api(data)
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def __eq__(self, other):
+        return isinstance(other, TaskRecord) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"TaskRecord(id={self.id!r}, name={self.name!r}, board_name={self.board_name!r})"
+
+
+class TaskSnapshot(list):
+    """Tasks of one or more boards, plus the names of boards whose fetch failed.
+
+    A failed board contributes its last known tasks (or none), so the snapshot is not
+    the whole truth: exports must not remove rows of tasks missing from it.
+    """
+
+    def __init__(self, tasks=(), failed_boards=()):
+        super().__init__(tasks)
+        self.failed_boards = tuple(failed_boards)
+
+    @property
+    def complete(self):
+        return not self.failed_boards
+
+
+class AsanaTaskRecord:
+    """Compact Asana task holding what the sheet row, comment cache and event sync need"""
+
+    __slots__ = ('gid', 'name', 'assignee_name', 'assignee_email', 'created_at', 'completed',
+                 'modified_at', 'memberships')
+
+    def __init__(self, gid, name='', assignee_name='', assignee_email='', created_at='', completed=False,
+                 modified_at=None, memberships=()):
+        self.gid = gid
+        self.name = name
+        self.assignee_name = assignee_name
+        self.assignee_email = assignee_email
+        self.created_at = created_at
+        self.completed = completed
+        self.modified_at = modified_at
+        # ((project_gid, section_gid), ...) when memberships were requested
+        self.memberships = memberships
+
+    @classmethod
+    def from_api(cls, task):
+        assignee = task.get('assignee') or {}
+        memberships = tuple(
+            ((m.get('project') or {}).get('gid'), (m.get('section') or {}).get('gid'))
+            for m in task.get('memberships') or []
+        )
+        return cls(
+            gid=task.get('gid'),
+            name=task.get('name') or '',
+            assignee_name=assignee.get('name', ''),
+            assignee_email=assignee.get('email', ''),
+            created_at=task.get('created_at') or '',
+            completed=bool(task.get('completed', False)),
+            modified_at=task.get('modified_at'),
+            memberships=memberships,
+        )
+
+    @classmethod
+    def coerce(cls, task):
+        """Accept either a record or a raw Asana task dict"""
+        return task if isinstance(task, cls) else cls.from_api(task)
+
+    def section_in(self, project_id):
+        """gid of the section this task sits in within `project_id`, or None"""
+        for project_gid, section_gid in self.memberships:
+            if project_gid == project_id and section_gid:
+                return section_gid
+        return None
+
+    def __repr__(self):
+        return f"AsanaTaskRecord(gid={self.gid!r}, name={self.name!r})"
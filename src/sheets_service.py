@@ -1,35 +1,821 @@
 import os
+import json
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
 from google.oauth2.credentials import Credentials
+from google.auth.credentials import AnonymousCredentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+import google_auth_httplib2
+import httplib2
 
-class GoogleSheetsService:
-    def __init__(self):
-        self.SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
-        self.SPREADSHEET_ID = '13raU31sm8wDz1xCQ5WpmHPbmlYgxRok1OLaH1uvJgPo'
-        self.service = self._authenticate()
+try:
+    from metrics import get_metrics, endpoint_name
+except ModuleNotFoundError:
+    from src.metrics import get_metrics, endpoint_name
+
+class SheetWritePlan:
+    """Collects the row groups of one spreadsheet refresh and sends them as a single values.batchUpdate"""
     
-    def _authenticate(self):
-        """Simple authentication with Google Sheets API"""
-        creds = None
+    def __init__(self, tab=None, value_input_option='RAW'):
+        self.tab = tab
+        self.value_input_option = value_input_option
+        self.data = []
+    
+    def _qualify(self, range_name):
+        if self.tab and '!' not in range_name:
+            return f"'{self.tab}'!{range_name}"
+        return range_name
+    
+    def add(self, range_name, rows):
+        """Queue rows for a range like 'A2:G10' (prefixed with the plan's tab); empty groups are skipped"""
+        if rows:
+            self.data.append({'range': self._qualify(range_name), 'values': rows})
+        return self
+    
+    @property
+    def ranges(self):
+        return [entry['range'] for entry in self.data]
+    
+    def body(self):
+        return {'valueInputOption': self.value_input_option, 'data': self.data}
+
+
+class SpreadsheetMetadataCache:
+    """Tab properties per spreadsheet, fetched once with a field mask and updated locally.
+    
+    Lives for the run by default. Set `ttl` (seconds) and `cache_path` to keep entries
+    on disk between runs as well.
+    """
+    
+    # Tab properties plus the small developer metadata entries we keep on tabs (e.g. last used row)
+    FIELDS = ('sheets(properties(title,sheetId,gridProperties),'
+              'developerMetadata(metadataId,metadataKey,metadataValue))')
+    
+    def __init__(self, service, ttl=None, cache_path=None):
+        self.service = service
+        self.ttl = ttl
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if self.ttl and self.cache_path and os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path) as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Ignoring unreadable sheet metadata cache: {e}")
+    
+    def _is_fresh(self, entry):
+        return self.ttl is None or time.time() - entry['fetched_at'] < self.ttl
+    
+    def _save(self):
+        if self.ttl and self.cache_path:
+            # Write a temp file and swap it in, so a reader never sees a half-written cache
+            tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.cache_path)
+    
+    def get_tabs(self, spreadsheet_id, refresh=False):
+        """Properties dicts (title, sheetId, gridProperties) of every tab in the spreadsheet"""
+        with self._lock:
+            entry = self._entries.get(spreadsheet_id)
+            if entry and not refresh and self._is_fresh(entry):
+                return list(entry['sheets'])
+        metadata = self.service.spreadsheets().get(
+            spreadsheetId=spreadsheet_id,
+            fields=self.FIELDS
+        ).execute()
+        sheets = [sheet.get('properties', {}) for sheet in metadata.get('sheets', [])]
+        developer_metadata = {
+            str(sheet.get('properties', {}).get('sheetId')): sheet.get('developerMetadata', [])
+            for sheet in metadata.get('sheets', [])
+        }
+        with self._lock:
+            self._entries[spreadsheet_id] = {
+                'fetched_at': time.time(),
+                'sheets': sheets,
+                'developer_metadata': developer_metadata
+            }
+            self._save()
+        return list(sheets)
+    
+    def get_developer_metadata(self, spreadsheet_id, sheet_id, key):
+        """Developer metadata entry with `key` on a tab, or None (served from the cached fetch)"""
+        self.get_tabs(spreadsheet_id)
+        with self._lock:
+            entries = self._entries[spreadsheet_id].get('developer_metadata', {}).get(str(sheet_id), [])
+            for entry in entries:
+                if entry.get('metadataKey') == key:
+                    return dict(entry)
+        return None
+    
+    def set_developer_metadata(self, spreadsheet_id, sheet_id, entry):
+        """Record a developer metadata entry we just wrote, replacing any entry with the same key"""
+        with self._lock:
+            cached = self._entries.get(spreadsheet_id)
+            if cached is None:
+                return
+            entries = cached.setdefault('developer_metadata', {}).setdefault(str(sheet_id), [])
+            entries[:] = [e for e in entries if e.get('metadataKey') != entry.get('metadataKey')] + [entry]
+            self._save()
+    
+    def tab_titles(self, spreadsheet_id):
+        return [properties.get('title', 'Unknown') for properties in self.get_tabs(spreadsheet_id)]
+    
+    def find_tab(self, spreadsheet_id, title):
+        """Case-insensitive tab lookup. Returns the tab's properties or None."""
+        wanted = title.lower()
+        for properties in self.get_tabs(spreadsheet_id):
+            if properties.get('title', '').lower() == wanted:
+                return properties
+        return None
+    
+    def add_tab(self, spreadsheet_id, properties):
+        """Record a tab we just created without refetching the spreadsheet"""
+        with self._lock:
+            entry = self._entries.get(spreadsheet_id)
+            if entry is not None:
+                entry['sheets'].append(properties)
+                self._save()
+    
+    def invalidate(self, spreadsheet_id=None):
+        with self._lock:
+            if spreadsheet_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(spreadsheet_id, None)
+            self._save()
+
+
+class AppendPositionService:
+    """Finds the first free row of a tab without downloading the tab.
+    
+    The last row we wrote is kept as developer metadata on the tab and comes back with
+    the (cached, field-masked) metadata fetch. A one-row probe just below it confirms
+    nobody appended by hand since; otherwise only the probe columns are read.
+    """
+    
+    METADATA_KEY = 'clickup_tracker.last_row'
+    
+    def __init__(self, service, metadata):
+        self.service = service
+        self.metadata = metadata
+    
+    def _row_is_empty(self, spreadsheet_id, tab, row, probe_columns):
+        first_column, _, last_column = probe_columns.partition(':')
+        result = self.service.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=f"'{tab}'!{first_column}{row}:{last_column or first_column}{row}",
+            fields='values'
+        ).execute()
+        return not any(cell.strip() for values_row in result.get('values', []) for cell in values_row if cell)
+    
+    def _last_used_row(self, spreadsheet_id, tab, probe_columns):
+        """1-based index of the last row with content in the probe columns (0 if none)"""
+        result = self.service.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id,
+            range=f"'{tab}'!{probe_columns}",
+            fields='values'
+        ).execute()
+        values = result.get('values', [])
+        for i in range(len(values) - 1, -1, -1):
+            if any(cell.strip() for cell in values[i] if cell):
+                return i + 1
+        return 0
+    
+    def next_row(self, spreadsheet_id, tab, probe_columns='A:A', min_row=1):
+        """1-based row to start appending at, never above `min_row`"""
+        properties = self.metadata.find_tab(spreadsheet_id, tab)
+        if properties:
+            entry = self.metadata.get_developer_metadata(spreadsheet_id, properties['sheetId'], self.METADATA_KEY)
+            if entry:
+                recorded = int(entry['metadataValue'])
+                if self._row_is_empty(spreadsheet_id, tab, recorded + 1, probe_columns):
+                    return max(recorded + 1, min_row)
+                print(f"⚠️ Rows were added to '{tab}' outside the exporter, rescanning {probe_columns}")
+        return max(self._last_used_row(spreadsheet_id, tab, probe_columns) + 1, min_row)
+    
+    def record_last_row(self, spreadsheet_id, tab, last_row):
+        """Store the last row written so the next run can find the append position in O(1)"""
+        properties = self.metadata.find_tab(spreadsheet_id, tab)
+        if not properties:
+            return
+        sheet_id = properties['sheetId']
+        existing = self.metadata.get_developer_metadata(spreadsheet_id, sheet_id, self.METADATA_KEY)
+        if existing:
+            request = {'updateDeveloperMetadata': {
+                'dataFilters': [{'developerMetadataLookup': {'metadataId': existing['metadataId']}}],
+                'developerMetadata': {'metadataValue': str(last_row)},
+                'fields': 'metadataValue'
+            }}
+            entry = dict(existing, metadataValue=str(last_row))
+        else:
+            request = {'createDeveloperMetadata': {'developerMetadata': {
+                'metadataKey': self.METADATA_KEY,
+                'metadataValue': str(last_row),
+                'location': {'sheetId': sheet_id},
+                'visibility': 'DOCUMENT'
+            }}}
+            entry = None
+        response = self.service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={'requests': [request]}
+        ).execute()
+        if entry is None:
+            reply = (response.get('replies') or [{}])[0]
+            entry = reply.get('createDeveloperMetadata', {}).get('developerMetadata')
+        if entry:
+            self.metadata.set_developer_metadata(spreadsheet_id, sheet_id, entry)
+
+
+def column_letter(index):
+    """0-based column index -> A1 letter(s)"""
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+class RowUpsertSync:
+    """Keeps exactly one row per key in a tab.
+    
+    A key -> (row, content digest) index says where each key lives. Rows whose contents
+    changed are rewritten in place, unseen keys are appended, and everything goes out
+    in one values.batchUpdate. A full sync also blanks the rows of keys that are gone and
+    any duplicate copies of a key (new keys reuse those rows before appending).
+    
+    The index is persisted in `index_store` (a SyncStateStore) so steady-state runs don't
+    read the tab at all. Before rewriting rows placed by a stored index, one read of the key
+    column checks nobody sorted or inserted rows, or added any below ours; if they did, the
+    index is rebuilt from the sheet (first occurrence of a key winning) and the writes
+    planned again.
+    """
+    
+    def __init__(self, sheets_service, spreadsheet_id, tab, width, key_column=0, header=None, index_store=None,
+                 probe_columns='A:A'):
+        self.sheets = sheets_service
+        self.spreadsheet_id = spreadsheet_id
+        self.tab = tab
+        self.width = width
+        self.key_column = key_column
+        self.header = header
+        self.index_store = index_store
+        # Columns AppendPositionService probes for rows added by hand below ours
+        self.probe_columns = probe_columns
+        self.scope = f'{spreadsheet_id}/{tab}'
+        self.index = None
+        self.index_from_sheet = False
+        # Rows holding extra copies of a key, found while rebuilding the index from the sheet
+        self._duplicate_rows = []
+        # Whether index_store already holds the whole index, so only changed keys need saving
+        self._index_saved = False
+        self._dirty = set()
+        self._removed = set()
+    
+    @property
+    def last_column(self):
+        return column_letter(self.width - 1)
+    
+    @staticmethod
+    def digest(row):
+        return hashlib.sha1(json.dumps([str(cell) for cell in row]).encode('utf-8')).hexdigest()
+    
+    def _pad(self, values):
+        return (list(values) + [''] * (self.width - len(values)))[:self.width]
+    
+    def _read_tab(self):
+        result = self.sheets.service.spreadsheets().values().get(
+            spreadsheetId=self.spreadsheet_id,
+            range=f"'{self.tab}'!A:{self.last_column}",
+            fields='values'
+        ).execute()
+        return result.get('values', [])
+    
+    def _key_of(self, values):
+        return values[self.key_column] if len(values) > self.key_column else ''
+    
+    def _is_header(self, row_number, values):
+        return row_number == 1 and self.header and self._key_of(values) == self.header[self.key_column]
+    
+    def load_index(self, rebuild=False):
+        """Load the key -> {'row', 'digest'} index from the store, or rebuild it from the sheet"""
+        if not rebuild and self.index_store is not None:
+            stored = self.index_store.load_records('sheets', self.scope)
+            if stored and self._usable_index(stored):
+                self.index = {entry['key']: entry for entry in stored}
+                self.index_from_sheet = False
+                self._duplicate_rows = []
+                self._index_saved = True
+                return self.index
+        self._rebuild_index()
+        self.index_from_sheet = True
+        self._index_saved = False
+        return self.index
+    
+    def _usable_index(self, stored):
+        return True
+    
+    def _rebuild_index(self):
+        self.index = {}
+        self._duplicate_rows = []
+        self._sheet_rows = 0
+        for i, values in enumerate(self._read_tab()):
+            if any(cell.strip() for cell in values if cell):
+                self._sheet_rows = i + 1
+            key = self._key_of(values)
+            if not key or self._is_header(i + 1, values):
+                continue
+            if key in self.index:
+                self._duplicate_rows.append(i + 1)
+            else:
+                self.index[key] = {'key': key, 'row': i + 1, 'digest': self.digest(self._pad(values))}
+    
+    def index_matches_sheet(self):
+        """One read of the key column: does every key still sit on the row the index says, with
+        nothing keyed below the last of them (rows added by hand or by another writer)?"""
+        column = column_letter(self.key_column)
+        result = self.sheets.service.spreadsheets().values().get(
+            spreadsheetId=self.spreadsheet_id,
+            range=f"'{self.tab}'!{column}:{column}",
+            fields='values'
+        ).execute()
+        keys = [values[0] if values else '' for values in result.get('values', [])]
+        # The API drops trailing empty rows, so the column ends at its last key
+        if len(keys) != self._last_keyed_row():
+            return False
+        for key, entry in self.index.items():
+            row = entry['row']
+            if row > len(keys) or keys[row - 1] != key:
+                return False
+        return True
+    
+    def _last_keyed_row(self):
+        """Last row the index expects a value in the key column (the header counts)"""
+        rows = [entry['row'] for entry in self.index.values()]
+        if self.header and self.header[self.key_column]:
+            rows.append(1)
+        return max(rows, default=0)
+    
+    def _next_free_row(self, index):
+        used = max((entry['row'] for entry in index.values()), default=0)
+        if self.index_from_sheet:
+            used = max(used, self._sheet_rows)
+        else:
+            # Stored index: make sure nobody appended below our rows by hand
+            used = max(used, self.sheets.append_position.next_row(self.spreadsheet_id, self.tab, self.probe_columns) - 1)
+        return used + 1
+    
+    def plan(self, rows, prune=True):
+        """Work out the writes for `rows`. Returns (SheetWritePlan, stats dict).
+        
+        With `prune`, `rows` is every live row: rows of keys not in it are blanked.
+        """
+        return self._verified_plan(lambda: self._plan(rows, prune))
+    
+    def _verified_plan(self, planner):
+        if self.index is None:
+            self.load_index()
+        plan, stats, index, touches_index = planner()
+        if touches_index and not self.index_from_sheet and not self.index_matches_sheet():
+            print(f"⚠️ Rows of '{self.tab}' were moved outside the exporter, rebuilding the row index")
+            self.load_index(rebuild=True)
+            plan, stats, index, touches_index = planner()
+        self.index = index
+        return plan, stats
+    
+    def _plan(self, rows, prune):
+        """(plan, stats, new index, whether rows the index points at get rewritten); self.index is untouched"""
+        plan = SheetWritePlan(self.tab)
+        stats = {'updated': 0, 'appended': 0, 'unchanged': 0, 'removed': len(self._duplicate_rows)}
+        index = dict(self.index)
+        
+        live = {}
+        for row in rows:
+            key = row[self.key_column]
+            if key and key not in live:
+                live[key] = row
+        
+        # Rows to blank (or hand to new keys): duplicate copies, then the rows of keys that are gone
+        free = list(self._duplicate_rows)
+        removed = set()
+        if prune:
+            for key in [key for key in index if key not in live]:
+                free.append(index.pop(key)['row'])
+                removed.add(key)
+            stats['removed'] += len(removed)
+        free.sort(reverse=True)
+        
+        changes = {}
+        dirty = set()
+        # Only looked up once something is appended, so in-place updates never read the sheet
+        next_row = None
+        for key, row in live.items():
+            digest = self.digest(row)
+            entry = index.get(key)
+            if entry is None:
+                if free:
+                    row_number = free.pop()
+                else:
+                    if next_row is None:
+                        next_row = self._next_free_row(index)
+                        if next_row == 1 and self.header:
+                            plan.add(f"A1:{self.last_column}1", [self.header])
+                            next_row = 2
+                    row_number = next_row
+                    next_row += 1
+                entry = {'key': key, 'row': row_number, 'digest': digest}
+                stats['appended'] += 1
+            elif entry['digest'] != digest:
+                entry = dict(entry, digest=digest)
+                stats['updated'] += 1
+            else:
+                stats['unchanged'] += 1
+                continue
+            index[key] = entry
+            dirty.add(key)
+            changes[entry['row']] = row
+        for row_number in free:
+            changes[row_number] = [''] * self.width
+        
+        self._add_changes(plan, changes)
+        self._dirty, self._removed = dirty, removed
+        return plan, stats, index, bool(stats['updated'] or removed)
+    
+    def _add_changes(self, plan, changes):
+        # Coalesce consecutive rows (all appends, runs of edits) into single ranges
+        run = []
+        for row_number in sorted(changes):
+            if run and row_number != run[-1] + 1:
+                self._add_run(plan, run, changes)
+                run = []
+            run.append(row_number)
+        if run:
+            self._add_run(plan, run, changes)
+    
+    def _add_run(self, plan, run, changes):
+        plan.add(f"A{run[0]}:{self.last_column}{run[-1]}", [changes[row_number] for row_number in run])
+    
+    def _last_row(self):
+        return max((entry['row'] for entry in self.index.values()), default=1 if self.header else 0)
+    
+    def _resized(self, stats):
+        return stats['appended'] or stats['removed']
+    
+    def sync(self, rows, prune=True):
+        """Plan and send the writes for `rows`, then persist the index. Returns the stats dict."""
+        return self._apply(*self.plan(rows, prune))
+    
+    def _apply(self, plan, stats):
+        if plan.data:
+            self.sheets.batch_write(plan, self.spreadsheet_id)
+        # Duplicates are gone from the sheet now; a rebuilt index no longer points at them
+        self._duplicate_rows = []
+        if self._resized(stats):
+            self.sheets.append_position.record_last_row(self.spreadsheet_id, self.tab, self._last_row())
+        self._save_index()
+        return stats
+    
+    def _save_index(self):
+        if self.index_store is None:
+            return
+        if not self._index_saved:
+            self.index_store.replace_records('sheets', self.scope, self.index)
+            self._index_saved = True
+            return
+        if self._dirty:
+            self.index_store.upsert_records('sheets', self.scope, {key: self.index[key] for key in self._dirty})
+        if self._removed:
+            self.index_store.delete_records('sheets', self.scope, list(self._removed))
+    
+    def upsert_row(self, row):
+        """Upsert a single row (e.g. from a webhook); no write at all if its contents are unchanged"""
+        return self.sync([row], prune=False)
+
+
+class SectionedUpsertSync(RowUpsertSync):
+    """RowUpsertSync for tabs laid out as a header, then sections split by fixed separator rows
+    (the client tabs: customer rows, the no-pipe label row, rows without a pipe).
+    
+    A sync lays the whole tab out again: keys keep their order within their section and new
+    keys go at the end of it. Only rows whose contents changed or moved are written, and
+    whatever is left below the layout is blanked. Index entries also record each key's
+    section; a separator always sits right after the last row of its section. Any write
+    placed by a stored index is checked against the key column first, since rows past the
+    stored layout may have been added by hand or by another writer.
+    """
+    
+    def __init__(self, sheets_service, spreadsheet_id, tab, width, separators, key_column=0, header=None,
+                 index_store=None, probe_columns='A:A'):
+        super().__init__(sheets_service, spreadsheet_id, tab, width, key_column, header, index_store, probe_columns)
+        self.separators = [self._pad(row) for row in separators]
+        self._sheet_digests = {}
+        self._sheet_values = {}
+        self._previous_last_row = 0
+    
+    def _usable_index(self, stored):
+        # Indexes written by a plain RowUpsertSync don't know the sections
+        return all('section' in entry for entry in stored)
+    
+    def _rebuild_index(self):
+        self.index = {}
+        self._duplicate_rows = []
+        self._sheet_digests = {}
+        self._sheet_values = {}
+        section = 0
+        for i, values in enumerate(self._read_tab()):
+            row_number = i + 1
+            padded = self._pad(values)
+            if not any(str(cell).strip() for cell in padded):
+                continue
+            self._sheet_digests[row_number] = self.digest(padded)
+            if section < len(self.separators) and padded == self.separators[section]:
+                section += 1
+                continue
+            key = self._key_of(values)
+            if not key or self._is_header(row_number, values):
+                continue
+            if key in self.index:
+                self._duplicate_rows.append(row_number)
+            else:
+                self.index[key] = {'key': key, 'row': row_number, 'digest': self.digest(padded), 'section': section}
+                self._sheet_values[key] = padded
+    
+    def _separator_rows(self, index):
+        """Row of each separator: right after the last row of its section"""
+        rows = []
+        boundary = 1 if self.header else 0
+        for number in range(len(self.separators)):
+            boundary = max([boundary] + [entry['row'] for entry in index.values() if entry['section'] == number]) + 1
+            rows.append(boundary)
+        return rows
+    
+    def _layout_rows(self, index):
+        """row -> digest of the header, the rows of `index` and the separators between its sections"""
+        rows = {}
+        if self.header:
+            rows[1] = self.digest(self._pad(self.header))
+        for entry in index.values():
+            rows[entry['row']] = entry['digest']
+        for row, separator in zip(self._separator_rows(index), self.separators):
+            rows[row] = self.digest(separator)
+        return rows
+    
+    def _last_keyed_row(self):
+        rows = [super()._last_keyed_row()]
+        rows += [row for row, separator in zip(self._separator_rows(self.index), self.separators)
+                 if separator[self.key_column]]
+        return max(rows)
+    
+    def _current_rows(self):
+        if self.index_from_sheet:
+            return dict(self._sheet_digests)
+        return self._layout_rows(self.index)
+    
+    def plan_sections(self, sections):
+        """Work out the writes that lay the tab out as `sections` (lists of rows, one per section)"""
+        return self._verified_plan(lambda: self._plan_layout(sections))
+    
+    def _plan_layout(self, sections):
+        layout = [self._pad(self.header)] if self.header else []
+        index = {}
+        seen = set()
+        for number, rows in enumerate(sections):
+            if number:
+                layout.append(self.separators[number - 1])
+            placed = []
+            for position, row in enumerate(rows):
+                key = row[self.key_column]
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                entry = self.index.get(key)
+                current = entry['row'] if entry is not None and entry['section'] == number else float('inf')
+                placed.append((current, position, key, self._pad(row)))
+            placed.sort(key=lambda item: item[:2])
+            for _, _, key, row in placed:
+                layout.append(row)
+                index[key] = {'key': key, 'row': len(layout), 'digest': self.digest(row), 'section': number}
         
-        # Try multiple paths for credentials
-        possible_paths = [
-            'credentials.json',           # Same directory as script
-            '../credentials.json',        # Parent directory  
-            '../../credentials.json'      # Two levels up
-        ]
+        stats = {'updated': 0, 'appended': 0, 'unchanged': 0}
+        for key, entry in index.items():
+            old = self.index.get(key)
+            if old is None:
+                stats['appended'] += 1
+            elif old['digest'] != entry['digest']:
+                stats['updated'] += 1
+            else:
+                stats['unchanged'] += 1
+        removed = set(self.index) - set(index)
+        stats['removed'] = len(removed) + len(self._duplicate_rows)
         
+        current = self._current_rows()
+        changes = {}
+        for row_number, row in enumerate(layout, start=1):
+            if current.get(row_number) != self.digest(row):
+                changes[row_number] = row
+        for row_number in current:
+            if row_number > len(layout):
+                changes[row_number] = [''] * self.width
+        plan = SheetWritePlan(self.tab)
+        self._add_changes(plan, changes)
+        
+        self._previous_last_row = max(current, default=0)
+        self._dirty = {key for key, entry in index.items() if self.index.get(key) != entry}
+        self._removed = removed
+        return plan, stats, index, bool(changes)
+    
+    def _last_row(self):
+        return max(self._layout_rows(self.index), default=0)
+    
+    def _resized(self, stats):
+        return self._last_row() != self._previous_last_row
+    
+    def sync_sections(self, sections, prune=True):
+        """Lay the tab out as `sections`, then persist the index. Returns the stats dict.
+        
+        Without `prune`, keys missing from `sections` keep their rows in their section; the
+        tab is read once for their contents when there are any.
+        """
+        if not prune:
+            sections = self._with_unlisted_rows(sections)
+        return self._apply(*self.plan_sections(sections))
+    
+    def _with_unlisted_rows(self, sections):
+        if self.index is None:
+            self.load_index()
+        listed = {row[self.key_column] for rows in sections for row in rows}
+        if all(key in listed for key in self.index):
+            return sections
+        if not self.index_from_sheet:
+            self.load_index(rebuild=True)
+        sections = [list(rows) for rows in sections]
+        for entry in sorted(self.index.values(), key=lambda entry: entry['row']):
+            if entry['key'] not in listed:
+                sections[entry['section']].append(self._sheet_values[entry['key']])
+        return sections
+    
+    def sync(self, rows, prune=True):
+        return self.sync_sections([rows], prune)
+    
+    def upsert_row(self, row, section=0):
+        """Upsert one row into `section`.
+        
+        A row already in that section is rewritten in place (nothing is written if it is
+        unchanged). A new or moved row shifts the rows below it, so the tab is read once for
+        their contents and laid out again.
+        """
+        if self.index is None:
+            self.load_index()
+        row = self._pad(row)
+        key = row[self.key_column]
+        entry = self.index.get(key)
+        if entry is not None and entry['section'] == section:
+            if entry['digest'] == self.digest(row):
+                return {'updated': 0, 'appended': 0, 'unchanged': 1, 'removed': 0}
+            if self.index_from_sheet or self.index_matches_sheet():
+                self._previous_last_row = self._last_row()
+                plan, stats, self.index, _ = self._plan([row], prune=False)
+                return self._apply(plan, stats)
+            print(f"⚠️ Rows of '{self.tab}' were moved outside the exporter, rebuilding the row index")
+            self.load_index(rebuild=True)
+        elif not self.index_from_sheet:
+            self.load_index(rebuild=True)
+        sections = [[] for _ in range(len(self.separators) + 1)]
+        for other in sorted(self.index.values(), key=lambda other: other['row']):
+            if other['key'] != key:
+                sections[other['section']].append(self._sheet_values[other['key']])
+        # Still in its section, the row keeps its place: the layout orders keys by current row
+        sections[section].append(row)
+        return self.sync_sections(sections)
+
+
+def metadata_cache_from_env(service):
+    """Build a SpreadsheetMetadataCache; SHEETS_METADATA_TTL/SHEETS_METADATA_CACHE enable on-disk reuse"""
+    ttl = os.getenv('SHEETS_METADATA_TTL')
+    return SpreadsheetMetadataCache(
+        service,
+        ttl=float(ttl) if ttl else None,
+        cache_path=os.getenv('SHEETS_METADATA_CACHE', '.sheets_metadata_cache.json')
+    )
+
+
+_shared_metadata_caches = {}
+_metadata_lock = threading.Lock()
+
+
+def get_metadata_cache(service):
+    """Return the process-wide SpreadsheetMetadataCache of a Sheets resource, creating it on first use.
+    
+    Every service object sharing one cache means one writer per process for the cache file.
+    """
+    with _metadata_lock:
+        cache = _shared_metadata_caches.get(id(service))
+        if cache is None or cache.service is not service:
+            cache = metadata_cache_from_env(service)
+            _shared_metadata_caches[id(service)] = cache
+        return cache
+
+
+def _rows_in_write(body):
+    """Rows carried by a values.update / values.batchUpdate request body"""
+    try:
+        payload = json.loads(body)
+    except (TypeError, ValueError):
+        return 0
+    if 'data' in payload:
+        return sum(len(entry.get('values', [])) for entry in payload['data'])
+    return len(payload.get('values', []))
+
+
+class MeteredHttp(httplib2.Http):
+    """httplib2.Http reporting every Sheets call to the run metrics.
+    
+    Reads count towards the sheet_read phase and writes towards sheet_write; 429 and 5xx
+    answers are counted as retries since RetryingHttpRequest sends those again.
+    """
+    
+    def request(self, uri, method='GET', body=None, *args, **kwargs):
+        started = time.perf_counter()
+        response, content = super().request(uri, method, body, *args, **kwargs)
+        seconds = time.perf_counter() - started
+        metrics = get_metrics()
+        metrics.record_call(endpoint_name(method, uri), response.status, response_bytes=len(content or b''),
+                            seconds=seconds, retries=1 if response.status == 429 or response.status >= 500 else 0)
+        if method == 'GET':
+            metrics.add_phase('sheet_read', seconds)
+        else:
+            metrics.add_phase('sheet_write', seconds)
+            if '/values' in uri and response.status < 400:
+                metrics.add_rows_written(_rows_in_write(body))
+        return response, content
+
+
+class RetryingHttpRequest(HttpRequest):
+    """HttpRequest whose execute() retries 429s and 5xx (with backoff) unless told otherwise"""
+    
+    NUM_RETRIES = int(os.getenv('SHEETS_MAX_RETRIES', '3'))
+    
+    def execute(self, http=None, num_retries=None):
+        return super().execute(http=http, num_retries=self.NUM_RETRIES if num_retries is None else num_retries)
+
+
+class SheetsClientFactory:
+    """Authenticates once and hands out one shared Sheets v4 resource for the whole process.
+    
+    httplib2.Http is not thread-safe, so every request is executed on an AuthorizedHttp
+    owned by the calling thread (all wrapping the same credentials). A daemon thread
+    refreshes the token shortly before it expires so no export pays for the refresh.
+    """
+    
+    SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+    
+    # Try multiple paths for credentials
+    CREDENTIALS_PATHS = [
+        'credentials.json',           # Same directory as script
+        '../credentials.json',        # Parent directory  
+        '../../credentials.json'      # Two levels up
+    ]
+    
+    def __init__(self, scopes=None, refresh_margin=300, api_endpoint=None):
+        self.scopes = scopes or self.SCOPES
+        self.refresh_margin = refresh_margin
+        # e.g. http://127.0.0.1:8099 for benchmarks/fake_api_server.py; plain http skips OAuth
+        self.api_endpoint = api_endpoint or os.getenv('SHEETS_API_ENDPOINT')
+        self.token_path = None
+        self._creds = None
+        self._service = None
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._refresher = None
+    
+    def credentials(self):
+        """Load (or obtain) the OAuth credentials once"""
+        with self._lock:
+            if self._creds is None:
+                if self.api_endpoint and self.api_endpoint.startswith('http://'):
+                    self._creds = AnonymousCredentials()
+                else:
+                    self._creds = self._load_credentials()
+                self._start_refresher()
+            return self._creds
+    
+    def _load_credentials(self):
+        creds = None
         creds_path = None
-        token_path = None
         
         # Find the credentials file
-        for path in possible_paths:
+        for path in self.CREDENTIALS_PATHS:
             if os.path.exists(path):
                 creds_path = path
                 # Set token path in same directory as credentials
-                token_path = path.replace('credentials.json', 'token.json')
+                self.token_path = path.replace('credentials.json', 'token.json')
                 break
         
         if not creds_path:
@@ -38,36 +824,112 @@ class GoogleSheetsService:
         print(f"🔑 Using credentials from: {creds_path}")
         
         # Check if we have saved credentials
-        if os.path.exists(token_path):
-            creds = Credentials.from_authorized_user_file(token_path, self.SCOPES)
+        if os.path.exists(self.token_path):
+            creds = Credentials.from_authorized_user_file(self.token_path, self.scopes)
         
         # If no valid credentials, authenticate
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 creds.refresh(Request())
             else:
-                flow = InstalledAppFlow.from_client_secrets_file(creds_path, self.SCOPES)
+                flow = InstalledAppFlow.from_client_secrets_file(creds_path, self.scopes)
                 creds = flow.run_local_server(port=0)
-            
-            # Save credentials for next time
-            with open(token_path, 'w') as token:
-                token.write(creds.to_json())
+            self._save_token(creds)
         
-        return build('sheets', 'v4', credentials=creds)
+        return creds
+    
+    def _save_token(self, creds):
+        # Save credentials for next time
+        with open(self.token_path, 'w') as token:
+            token.write(creds.to_json())
+    
+    def _start_refresher(self):
+        if self._refresher is None and getattr(self._creds, 'refresh_token', None):
+            self._refresher = threading.Thread(target=self._refresh_loop, name='sheets-token-refresh', daemon=True)
+            self._refresher.start()
+    
+    def seconds_until_refresh(self):
+        """How long the background thread sleeps before refreshing the token"""
+        expiry = self._creds.expiry
+        if expiry is None:
+            return None
+        # google-auth keeps expiry as a naive UTC datetime
+        remaining = (expiry - datetime.now(timezone.utc).replace(tzinfo=None)).total_seconds()
+        return max(remaining - self.refresh_margin, 0)
+    
+    def refresh(self):
+        """Refresh the token now and persist it"""
+        with self._lock:
+            self._creds.refresh(Request())
+            self._save_token(self._creds)
+    
+    def _refresh_loop(self):
+        while True:
+            delay = self.seconds_until_refresh()
+            if delay is None:
+                return
+            time.sleep(delay)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"⚠️ Background Sheets token refresh failed, retrying in 60s: {e}")
+                time.sleep(60)
+    
+    def thread_http(self):
+        """The calling thread's AuthorizedHttp (one keep-alive connection pool per thread)"""
+        http = getattr(self._local, 'http', None)
+        if http is None:
+            http = google_auth_httplib2.AuthorizedHttp(self.credentials(), http=MeteredHttp())
+            self._local.http = http
+        return http
+    
+    def _build_request(self, http, *args, **kwargs):
+        # Ignore the http the resource was built with; run on the current thread's own
+        return RetryingHttpRequest(self.thread_http(), *args, **kwargs)
+    
+    def service(self):
+        """The shared Sheets v4 resource; discovery runs once per process"""
+        with self._lock:
+            if self._service is None:
+                client_options = {'api_endpoint': self.api_endpoint} if self.api_endpoint else None
+                self._service = build('sheets', 'v4', http=self.thread_http(), requestBuilder=self._build_request,
+                                      client_options=client_options)
+            return self._service
+
+
+_shared_factory = None
+_factory_lock = threading.Lock()
+
+
+def get_sheets_factory():
+    """Return the process-wide SheetsClientFactory, creating it on first use"""
+    global _shared_factory
+    if _shared_factory is None:
+        with _factory_lock:
+            if _shared_factory is None:
+                _shared_factory = SheetsClientFactory()
+    return _shared_factory
+
+
+class GoogleSheetsService:
+    def __init__(self):
+        self.SCOPES = SheetsClientFactory.SCOPES
+        self.SPREADSHEET_ID = '13raU31sm8wDz1xCQ5WpmHPbmlYgxRok1OLaH1uvJgPo'
+        self.service = self._authenticate()
+        self.metadata = get_metadata_cache(self.service)
+        self.append_position = AppendPositionService(self.service, self.metadata)
+    
+    def _authenticate(self):
+        """Shared Sheets resource - authentication and discovery happen once per process"""
+        return get_sheets_factory().service()
     
     def get_sheet_tabs(self):
         """Get all tab names in the spreadsheet"""
         try:
-            sheet_metadata = self.service.spreadsheets().get(
-                spreadsheetId=self.SPREADSHEET_ID
-            ).execute()
-            
-            sheets = sheet_metadata.get('sheets', [])
             tab_names = []
             
             print("📋 Available tabs in the spreadsheet:")
-            for sheet in sheets:
-                properties = sheet.get('properties', {})
+            for properties in self.metadata.get_tabs(self.SPREADSHEET_ID):
                 title = properties.get('title', 'Unknown')
                 sheet_id = properties.get('sheetId', 'Unknown')
                 print(f"  - Tab: '{title}' (ID: {sheet_id})")
@@ -79,6 +941,37 @@ class GoogleSheetsService:
             print(f"❌ Error getting sheet tabs: {e}")
             return []
     
+    def find_tab(self, title, spreadsheet_id=None):
+        """Actual title of a tab matched case-insensitively, or None"""
+        properties = self.metadata.find_tab(spreadsheet_id or self.SPREADSHEET_ID, title)
+        return properties.get('title') if properties else None
+    
+    def ensure_tab(self, title, spreadsheet_id=None):
+        """Return the existing tab's title (matched case-insensitively), creating the tab if missing"""
+        spreadsheet_id = spreadsheet_id or self.SPREADSHEET_ID
+        found = self.find_tab(title, spreadsheet_id)
+        if found:
+            return found
+        print(f"Tab '{title}' not found. Creating it...")
+        response = self.service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id,
+            body={'requests': [{'addSheet': {'properties': {'title': title}}}]}
+        ).execute()
+        for reply in response.get('replies', []):
+            if 'addSheet' in reply:
+                self.metadata.add_tab(spreadsheet_id, reply['addSheet'].get('properties', {'title': title}))
+        print(f"✅ Created tab '{title}'")
+        return title
+    
+    def batch_write(self, plan, spreadsheet_id=None):
+        """Send every range queued in a SheetWritePlan in one values.batchUpdate call"""
+        if not plan.data:
+            return None
+        return self.service.spreadsheets().values().batchUpdate(
+            spreadsheetId=spreadsheet_id or self.SPREADSHEET_ID,
+            body=plan.body()
+        ).execute()
+    
     def write_test_data(self, formatted_data):
         """Write test data to the correct tab"""
         try:
@@ -0,0 +1,256 @@
+import os
+import time
+import random
+import signal
+import threading
+
+try:
+    from clickup_service import ClickUpService
+    from asana_service import AsanaService
+    from sheets_service import get_sheets_factory
+    from metrics import instrumented
+except ModuleNotFoundError:
+    from src.clickup_service import ClickUpService
+    from src.asana_service import AsanaService
+    from src.sheets_service import get_sheets_factory
+    from src.metrics import instrumented
+
+
+def parse_intervals(text):
+    """'Dirt Vision=300,Yahoo=1800' -> {'Dirt Vision': 300.0, 'Yahoo': 1800.0}"""
+    intervals = {}
+    for item in (text or '').split(','):
+        name, sep, seconds = item.rpartition('=')
+        if sep and name.strip():
+            intervals[name.strip()] = float(seconds)
+    return intervals
+
+
+class SyncJob:
+    """One recurring sync: runs `action` every `interval` seconds, +/- `jitter` of the interval"""
+
+    def __init__(self, name, interval, action, jitter=0.1):
+        self.name = name
+        self.interval = interval
+        self.action = action
+        self.jitter = jitter
+        self.next_run = 0.0
+        self.runs = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_seconds = None
+
+    def schedule(self, now, rng):
+        # Jitter spreads jobs with equal intervals apart so they don't hit the APIs in lockstep
+        spread = self.interval * self.jitter
+        self.next_run = now + max(self.interval + rng.uniform(-spread, spread), 0)
+
+    def __repr__(self):
+        return f"SyncJob(name={self.name!r}, interval={self.interval!r})"
+
+
+class SyncDaemon:
+    """Keeps the ClickUp/Asana services, HTTP sessions, Sheets client and task snapshots warm in one
+    process and runs incremental syncs on per-client and per-source schedules.
+
+    Client exports that come due together share one incremental ClickUp fetch. An urgent
+    watcher fetches board deltas on a short cadence; when an urgent/high-priority ticket
+    changes, the exports of the clients it belongs to (and production, for issue boards)
+    run right away instead of waiting for their next slot. A periodic full resync refetches
+    every board from scratch, so tasks deleted or archived in ClickUp leave the snapshot, and
+    then runs every ClickUp export so their rows leave the sheets too.
+    """
+
+    URGENT_SEVERITIES = ('urgent', 'high')
+
+    def __init__(self, clickup=None, asana=None, client_intervals=None, default_client_interval=None,
+                 production_interval=None, asana_interval=None, urgent_interval=None, jitter=None,
+                 full_resync_interval=None, snapshot_max_age=None, clock=time.monotonic, seed=None):
+        self.clickup = clickup or ClickUpService()
+        self.asana = asana
+        # Warm mode only makes sense incrementally: every cycle fetches deltas since the last one
+        self.clickup.incremental = True
+        # Repeated exports must rewrite the client tabs' rows, never append another copy of them
+        self.clickup.client_mode = 'upsert'
+        self.clickup.production_mode = 'upsert'
+        if self.asana is not None:
+            self.asana.incremental = True
+
+        self.clock = clock
+        self.rng = random.Random(seed)
+        self.jitter = float(os.getenv('SYNC_JITTER', '0.1')) if jitter is None else jitter
+        # A ClickUp snapshot younger than this is reused instead of fetching again
+        self.snapshot_max_age = float(os.getenv('SYNC_SNAPSHOT_MAX_AGE', '30')) if snapshot_max_age is None else snapshot_max_age
+        self._snapshot = None
+        self._snapshot_at = None
+        # task id -> date_updated of urgent tickets, so only real changes expedite anything
+        self._urgent_seen = None
+        self._stop = threading.Event()
+
+        if client_intervals is None:
+            client_intervals = parse_intervals(os.getenv('SYNC_CLIENT_INTERVALS'))
+        if default_client_interval is None:
+            default_client_interval = float(os.getenv('SYNC_CLIENT_INTERVAL', '900'))
+        if production_interval is None:
+            production_interval = float(os.getenv('SYNC_PRODUCTION_INTERVAL', '600'))
+        if asana_interval is None:
+            asana_interval = float(os.getenv('SYNC_ASANA_INTERVAL', '1800'))
+        if urgent_interval is None:
+            urgent_interval = float(os.getenv('SYNC_URGENT_INTERVAL', '60'))
+        if full_resync_interval is None:
+            full_resync_interval = float(os.getenv('SYNC_FULL_RESYNC_INTERVAL', '86400'))
+
+        self.jobs = {}
+        for client_name in self.clickup.CLIENT_SPREADSHEET_IDS:
+            interval = client_intervals.get(client_name, default_client_interval)
+            self._add_job(f'clickup:{client_name}', interval, lambda name=client_name: self.export_client(name))
+        self._add_job('clickup:production', production_interval, self.clickup.export_issues_to_production)
+        if self.asana is not None:
+            self._add_job('asana:wurl', asana_interval, self.asana.export_to_wurl_sheets)
+        if urgent_interval > 0:
+            self._add_job('clickup:urgent', urgent_interval, self.check_urgent)
+        self._add_job('clickup:full-resync', full_resync_interval, self.full_resync)
+
+    def _add_job(self, name, interval, action):
+        if interval <= 0:
+            print(f"⏸️ {name} disabled (interval {interval})")
+            return
+        self.jobs[name] = SyncJob(name, interval, action, self.jitter)
+
+    def snapshot(self, max_age=None):
+        """The ClickUp task snapshot, fetched incrementally when older than `max_age` seconds"""
+        max_age = self.snapshot_max_age if max_age is None else max_age
+        now = self.clock()
+        if self._snapshot is None or now - self._snapshot_at >= max_age:
+            self._snapshot = self.clickup.fetch_task_snapshot()
+            self._snapshot_at = now
+        return self._snapshot
+
+    @instrumented('export_single_client_to_spreadsheet')
+    def export_client(self, client_name):
+        tasks = self.clickup.partition_tasks_by_client(self.snapshot(), [client_name])[client_name]
+        return self.clickup.export_single_client_to_spreadsheet(client_name, client_tasks=tasks)
+
+    @instrumented('check_urgent')
+    def check_urgent(self):
+        """Fetch deltas and run the jobs affected by changed urgent/high tickets now. Returns the job names."""
+        snapshot = self.snapshot(max_age=0)
+        urgent = {task.id: task for task in snapshot if (task.severity or '').lower() in self.URGENT_SEVERITIES}
+        first_pass = self._urgent_seen is None
+        changed = [task for task_id, task in urgent.items()
+                   if not first_pass and self._urgent_seen.get(task_id) != task.date_updated]
+        self._urgent_seen = {task_id: task.date_updated for task_id, task in urgent.items()}
+        if not changed:
+            return []
+
+        expedited = set()
+        issue_board_ids = set(self.clickup.issue_boards.values())
+        if any(task.board_id in issue_board_ids for task in changed):
+            expedited.add('clickup:production')
+        for client_name, tasks in self.clickup.partition_tasks_by_client(changed).items():
+            if tasks:
+                expedited.add(f'clickup:{client_name}')
+        expedited = [name for name in self.jobs if name in expedited]
+        now = self.clock()
+        for name in expedited:
+            self.jobs[name].next_run = now
+        print(f"🚨 {len(changed)} urgent ticket(s) changed - running now: {', '.join(expedited)}")
+        return expedited
+
+    @instrumented('full_resync')
+    def full_resync(self):
+        """Refetch every board from scratch and run every ClickUp export now. Returns the job names."""
+        self._snapshot = self.clickup.resync_all()
+        now = self._snapshot_at = self.clock()
+        due = [name for name in self.jobs if name.startswith('clickup:') and name not in ('clickup:urgent', 'clickup:full-resync')]
+        for name in due:
+            self.jobs[name].next_run = now
+        print(f"🔄 Full resync: {len(self._snapshot)} tasks - running now: {', '.join(due)}")
+        return due
+
+    def run_job(self, job):
+        """Run one job, never letting its failure escape, and schedule its next run"""
+        started = self.clock()
+        try:
+            result = job.action()
+            ok = result is not False
+            job.last_error = None if ok else 'job reported failure'
+        except Exception as e:
+            print(f"❌ {job.name} failed: {e}")
+            ok = False
+            job.last_error = str(e)
+        job.runs += 1
+        if not ok:
+            job.failures += 1
+        job.last_seconds = round(self.clock() - started, 3)
+        job.schedule(self.clock(), self.rng)
+        return ok
+
+    def run_pending(self):
+        """Run every job that is due, soonest first. Returns the names of the jobs run."""
+        ran = []
+        while not self._stop.is_set():
+            now = self.clock()
+            due = [job for job in self.jobs.values() if job.next_run <= now and job.name not in ran]
+            if not due:
+                break
+            job = min(due, key=lambda j: j.next_run)
+            self.run_job(job)
+            ran.append(job.name)
+        return ran
+
+    def seconds_until_next(self):
+        if not self.jobs:
+            return None
+        return max(min(job.next_run for job in self.jobs.values()) - self.clock(), 0)
+
+    def warm_up(self):
+        """Authenticate with Google and build the Sheets client before the first cycle"""
+        try:
+            get_sheets_factory().service()
+        except Exception as e:
+            print(f"⚠️ Could not warm up the Sheets client, will retry on first write: {e}")
+
+    def run_forever(self):
+        """Run until stop() (or SIGINT/SIGTERM via install_signal_handlers)"""
+        self.warm_up()
+        # Stagger the first runs across one jitter window instead of firing everything at once
+        now = self.clock()
+        for job in self.jobs.values():
+            job.next_run = now + self.rng.uniform(0, job.interval * self.jitter)
+        # The first cycle runs every export anyway; the first full resync is one interval away
+        if 'clickup:full-resync' in self.jobs:
+            self.jobs['clickup:full-resync'].schedule(now, self.rng)
+        print(f"🔁 Sync daemon running {len(self.jobs)} jobs: " +
+              ', '.join(f"{job.name} every {job.interval:g}s" for job in self.jobs.values()))
+        while not self._stop.is_set():
+            self.run_pending()
+            delay = self.seconds_until_next()
+            if delay is None:
+                break
+            self._stop.wait(delay)
+        print("👋 Sync daemon stopped")
+
+    def stop(self):
+        self._stop.set()
+
+    def install_signal_handlers(self):
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self.stop())
+
+
+if __name__ == "__main__":
+    import sys
+    import logging
+    logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO').upper(), format='%(message)s')
+    asana = None if '--no-asana' in sys.argv else AsanaService()
+    daemon = SyncDaemon(asana=asana)
+    if '--once' in sys.argv:
+        # Every job once, e.g. to check configuration before leaving the daemon running
+        daemon.warm_up()
+        for job in daemon.jobs.values():
+            if job.name != 'clickup:full-resync':
+                daemon.run_job(job)
+    else:
+        daemon.install_signal_handlers()
+        daemon.run_forever()
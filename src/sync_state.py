@@ -0,0 +1,94 @@
+import json
+import os
+import sqlite3
+import threading
+
+
+class SyncStateStore:
+    """SQLite-backed watermarks and cached records for incremental syncs.
+
+    Everything is namespaced by (source, scope), e.g. ('clickup', list_id) or
+    ('asana', project_gid), so one state file serves every service.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv('SYNC_STATE_PATH', 'sync_state.sqlite3')
+        self._lock = threading.Lock()
+        # Board fetches run on a thread pool, so the connection is shared behind a lock
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks ("
+                " source TEXT NOT NULL, scope TEXT NOT NULL, value TEXT,"
+                " PRIMARY KEY (source, scope))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS records ("
+                " source TEXT NOT NULL, scope TEXT NOT NULL, record_id TEXT NOT NULL, payload TEXT NOT NULL,"
+                " PRIMARY KEY (source, scope, record_id))"
+            )
+
+    def get_watermark(self, source, scope):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM watermarks WHERE source = ? AND scope = ?", (source, scope)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_watermark(self, source, scope, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO watermarks (source, scope, value) VALUES (?, ?, ?)"
+                " ON CONFLICT (source, scope) DO UPDATE SET value = excluded.value",
+                (source, scope, value)
+            )
+
+    def upsert_records(self, source, scope, records):
+        """Insert or update records given as {record_id: json-serialisable payload}"""
+        rows = self._record_rows(source, scope, records)
+        with self._lock, self._conn:
+            self._insert_rows(rows)
+
+    def replace_records(self, source, scope, records):
+        """Drop everything stored for (source, scope) and store `records` instead, in one transaction"""
+        rows = self._record_rows(source, scope, records)
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM records WHERE source = ? AND scope = ?", (source, scope))
+            self._insert_rows(rows)
+
+    @staticmethod
+    def _record_rows(source, scope, records):
+        return [(source, scope, str(record_id), json.dumps(payload)) for record_id, payload in records.items()]
+
+    def _insert_rows(self, rows):
+        # ON CONFLICT keeps the original rowid, so load order stays first-seen order
+        self._conn.executemany(
+            "INSERT INTO records (source, scope, record_id, payload) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (source, scope, record_id) DO UPDATE SET payload = excluded.payload",
+            rows
+        )
+
+    def delete_records(self, source, scope, record_ids):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM records WHERE source = ? AND scope = ? AND record_id = ?",
+                [(source, scope, str(record_id)) for record_id in record_ids]
+            )
+
+    def load_records(self, source, scope):
+        """All payloads stored for (source, scope), in first-seen order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM records WHERE source = ? AND scope = ? ORDER BY rowid",
+                (source, scope)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def clear(self, source, scope):
+        """Forget the watermark and records for (source, scope)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM records WHERE source = ? AND scope = ?", (source, scope))
+            self._conn.execute("DELETE FROM watermarks WHERE source = ? AND scope = ?", (source, scope))
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,246 @@
+import os
+import json
+import hmac
+import queue
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from clickup_service import ClickUpService
+    from sheets_service import GoogleSheetsService
+    from models import TaskRecord
+except ModuleNotFoundError:
+    from src.clickup_service import ClickUpService
+    from src.sheets_service import GoogleSheetsService
+    from src.models import TaskRecord
+
+WEBHOOK_PATH = '/clickup/webhook'
+
+# ClickUp events that can change a task's sheet row
+TASK_EVENTS = ('taskCreated', 'taskUpdated', 'taskStatusUpdated', 'taskPriorityUpdated')
+
+# history_items fields shown in a row: name (account/subject), status, priority (severity),
+# the filer email custom field and moves between lists (board)
+ROW_FIELDS = ('name', 'status', 'priority', 'custom_field', 'section_moved')
+
+
+def verify_signature(secret, body, signature):
+    """ClickUp signs the raw body with HMAC-SHA256 of the webhook secret, hex-encoded in X-Signature"""
+    expected = hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature or '')
+
+
+def default_sheets_factory(spreadsheet_id=None):
+    sheets_service = GoogleSheetsService()
+    if spreadsheet_id:
+        sheets_service.SPREADSHEET_ID = spreadsheet_id
+    return sheets_service
+
+
+class WebhookProcessor:
+    """Applies one ClickUp webhook event to the sheets: the task's row is upserted in every
+    client spreadsheet it routes to (and in production for issue boards), nothing else.
+
+    Events whose history only touches fields the sheets don't show are dropped without
+    any API call; otherwise the task is fetched once and each row is rewritten only if its
+    contents changed. Row indexes are loaded from the state store for every event, since
+    scheduled exports (which share the store) may have moved rows in between.
+    
+    Each tab is only touched when its scheduled export is keyed too (client_mode and
+    production_mode 'upsert'): rebuilding an index from an appended tab would blank every
+    older copy of a ticket. A new ticket in a client tab goes to the end of its section,
+    above or below the no-pipe label.
+    """
+
+    PRODUCTION_TAB = 'production'
+    CLIENT_TAB = 'Production'
+
+    def __init__(self, clickup=None, sheets_factory=default_sheets_factory):
+        self.clickup = clickup or ClickUpService()
+        self.sheets_factory = sheets_factory
+        self._sheets = {}
+        self._client_tabs = {}
+
+    def touches_row(self, payload):
+        """Whether an event can change a row; an event without history is assumed to"""
+        if payload.get('event') != 'taskUpdated':
+            return True
+        items = payload.get('history_items') or []
+        if not items:
+            return True
+        for item in items:
+            field = item.get('field')
+            if field == 'custom_field':
+                custom_field = item.get('custom_field') or {}
+                if custom_field.get('name', TaskRecord.FILER_EMAIL_FIELD) == TaskRecord.FILER_EMAIL_FIELD:
+                    return True
+            elif field in ROW_FIELDS:
+                return True
+        return False
+
+    def process(self, payload):
+        """Apply one event. Returns {'event', 'task_id', 'action', 'targets': {target: upsert stats}}."""
+        event = payload.get('event')
+        task_id = payload.get('task_id')
+        result = {'event': event, 'task_id': task_id, 'action': 'ignored', 'targets': {}}
+        if event not in TASK_EVENTS or not task_id:
+            return result
+        if not self.touches_row(payload):
+            result['action'] = 'skipped'
+            return result
+
+        task = self.clickup.get_task(task_id)
+        if task is None:
+            # Not on a tracked board
+            return result
+
+        result['action'] = 'synced'
+        if self.clickup.client_mode == 'upsert':
+            clients = [name for name, tasks in self.clickup.partition_tasks_by_client([task]).items() if tasks]
+            piped, _ = self.clickup.split_by_pipe([task])
+            section = 0 if piped else 1
+            row = self.clickup.format_rows([task])[0]
+            for client_name in clients:
+                spreadsheet_id = self.clickup.CLIENT_SPREADSHEET_IDS[client_name]
+                result['targets'][client_name] = self._client_upsert(spreadsheet_id).upsert_row(row, section)
+        if self.clickup.production_mode == 'upsert' and task.board_id in set(self.clickup.issue_boards.values()):
+            row = self.clickup.format_rows([task], layout='production')[0]
+            result['targets']['production'] = self._production_upsert().upsert_row(row)
+        return result
+
+    def _sheets_for(self, spreadsheet_id):
+        if spreadsheet_id not in self._sheets:
+            self._sheets[spreadsheet_id] = self.sheets_factory(spreadsheet_id)
+        return self._sheets[spreadsheet_id]
+
+    def _client_upsert(self, spreadsheet_id):
+        sheets_service = self._sheets_for(spreadsheet_id)
+        if spreadsheet_id not in self._client_tabs:
+            self._client_tabs[spreadsheet_id] = sheets_service.ensure_tab(self.CLIENT_TAB, spreadsheet_id)
+        return self.clickup.client_upsert(sheets_service, spreadsheet_id, self._client_tabs[spreadsheet_id])
+
+    def _production_upsert(self):
+        return self.clickup.production_upsert(self._sheets_for(None), self.PRODUCTION_TAB)
+
+
+class WebhookWorker:
+    """Single background thread applying queued events in order, so the HTTP handler can answer
+    ClickUp at once. An event for a task that is already queued is dropped: the task is fetched
+    fresh when its turn comes, which covers both changes."""
+
+    def __init__(self, processor):
+        self.processor = processor
+        self.queue = queue.Queue()
+        self.stats = {'received': 0, 'coalesced': 0, 'ignored': 0, 'skipped': 0, 'synced': 0, 'failed': 0}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='clickup-webhooks', daemon=True)
+        self._thread.start()
+
+    def submit(self, payload):
+        """Queue an event. Returns False when it was coalesced into one already waiting."""
+        key = payload.get('task_id') if payload.get('event') in TASK_EVENTS else None
+        with self._lock:
+            self.stats['received'] += 1
+            if key is not None and key in self._pending:
+                self.stats['coalesced'] += 1
+                return False
+            self._pending.add(key)
+        self.queue.put((key, payload))
+        return True
+
+    def _run(self):
+        while True:
+            key, payload = self.queue.get()
+            with self._lock:
+                # Later events for this task are queued again: they may carry newer changes
+                self._pending.discard(key)
+            try:
+                result = self.processor.process(payload)
+                action = result['action']
+                if action == 'synced':
+                    print(f"🔔 {result['event']} {result['task_id']}: " +
+                          (', '.join(f"{target} {self._describe(stats)}" for target, stats in result['targets'].items())
+                           or 'no client or production row'))
+            except Exception as e:
+                print(f"❌ Webhook {payload.get('event')} for task {payload.get('task_id')} failed: {e}")
+                action = 'failed'
+            with self._lock:
+                self.stats[action] += 1
+            self.queue.task_done()
+
+    @staticmethod
+    def _describe(stats):
+        for outcome in ('appended', 'updated'):
+            if stats[outcome]:
+                return outcome
+        return 'unchanged'
+
+    def join(self):
+        """Block until every queued event has been applied"""
+        self.queue.join()
+
+
+def make_server(worker, host='127.0.0.1', port=8090, secret=None):
+    """ThreadingHTTPServer accepting ClickUp webhooks on WEBHOOK_PATH; port 0 picks a free port"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status, body):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == '/health':
+                with worker._lock:
+                    stats = dict(worker.stats)
+                return self._reply(200, dict(stats, queued=worker.queue.qsize()))
+            self._reply(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != WEBHOOK_PATH:
+                return self._reply(404, {'error': 'not found'})
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            if secret and not verify_signature(secret, body, self.headers.get('X-Signature')):
+                return self._reply(401, {'error': 'bad signature'})
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                return self._reply(400, {'error': 'invalid JSON'})
+            if not isinstance(payload, dict):
+                return self._reply(400, {'error': 'expected a JSON object'})
+            queued = worker.submit(payload)
+            self._reply(200, {'queued': queued})
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    import sys
+    host = os.getenv('WEBHOOK_HOST', '127.0.0.1')
+    port = int(os.getenv('WEBHOOK_PORT', '8090'))
+    for arg in sys.argv:
+        if arg.startswith('--port='):
+            port = int(arg.split('=', 1)[1])
+        if arg.startswith('--host='):
+            host = arg.split('=', 1)[1]
+    secret = os.getenv('CLICKUP_WEBHOOK_SECRET')
+    worker = WebhookWorker(WebhookProcessor())
+    server = make_server(worker, host, port, secret)
+    print(f"🔔 Listening for ClickUp webhooks on http://{host}:{server.server_address[1]}{WEBHOOK_PATH}"
+          f" ({'signatures verified' if secret else 'no CLICKUP_WEBHOOK_SECRET, signatures not checked'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
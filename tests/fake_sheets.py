@@ -0,0 +1,10 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+from sheets_store import InMemorySheetsService  # noqa: E402
+
+
+class FakeSheetsService(InMemorySheetsService):
+    """Minimal in-memory stand-in for the googleapiclient Sheets v4 resource."""
@@ -0,0 +1,223 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+import pytest
+import requests
+from asana_service import AsanaService
+from sync_state import SyncStateStore
+
+
+class _FakeResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+class _FakeAsanaHttp:
+    """In-memory Asana project: sections, tasks, stories and an events feed."""
+
+    def __init__(self):
+        self.sections = [{'gid': 's1', 'name': 'Live'}, {'gid': 's2', 'name': 'QA'}]
+        self.tasks = {
+            't1': {'gid': 't1', 'name': 'Channel 1', 'section': 's1'},
+            't2': {'gid': 't2', 'name': 'Channel 2', 'section': 's2'},
+        }
+        self.stories = {'t1': [{'type': 'comment', 'text': 'hello'}]}
+        self.events = []
+        self.token = 0
+        self.calls = []
+        self.failing = set()
+
+    def _task_body(self, task):
+        body = {k: v for k, v in task.items() if k != 'section'}
+        body['memberships'] = [{'project': {'gid': 'p1'}, 'section': {'gid': task['section']}}]
+        return body
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        path = url.split('/api/1.0')[1]
+        params = params or {}
+        self.calls.append(path)
+        if path == '/projects/p1/sections':
+            return _FakeResponse(200, {'data': self.sections})
+        if path == '/tasks':
+            tasks = [self._task_body(t) for t in self.tasks.values() if t['section'] == params['section']]
+            return _FakeResponse(200, {'data': tasks})
+        if path.endswith('/stories'):
+            return _FakeResponse(200, {'data': self.stories.get(path.split('/')[2], [])})
+        if path.startswith('/tasks/'):
+            if path in self.failing:
+                return _FakeResponse(503, {'errors': [{'message': 'unavailable'}]})
+            task = self.tasks.get(path.split('/')[2])
+            if task is None:
+                return _FakeResponse(404, {'errors': []})
+            return _FakeResponse(200, {'data': self._task_body(task)})
+        if path == '/events':
+            if 'sync' not in params:
+                return _FakeResponse(412, {'sync': f'tok{self.token}'})
+            events, self.events = self.events, []
+            self.token += 1
+            return _FakeResponse(200, {'data': events, 'sync': f'tok{self.token}', 'has_more': False})
+        raise AssertionError(f'unexpected path {path}')
+
+    def post(self, url, headers=None, json=None, **kwargs):
+        path = url.split('/api/1.0')[1]
+        assert path == '/batch'
+        actions = json['data']['actions']
+        assert len(actions) <= 10
+        self.calls.append(path)
+        results = []
+        for action in actions:
+            task_id = action['relative_path'].split('/')[2]
+            results.append({'status_code': 200, 'body': {'data': self.stories.get(task_id, [])}})
+        return _FakeResponse(200, {'data': results})
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = AsanaService()
+    service.http = _FakeAsanaHttp()
+    service.incremental = True
+    service.state_store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    return service
+
+
+def test_incremental_sync_refetches_only_changed_tasks(service):
+    first = service.get_all_tasks_for_sheets('p1')
+    assert [(r['channel_name'], r['section'], r['last_update']) for r in first] == [
+        ('Channel 1', 'Live', 'hello'), ('Channel 2', 'QA', 'No comments')]
+
+    fake = service.http
+    fake.calls.clear()
+    assert [r['channel_name'] for r in service.get_all_tasks_for_sheets('p1')] == ['Channel 1', 'Channel 2']
+    assert fake.calls == ['/events']
+
+    fake.tasks['t2']['section'] = 's1'
+    fake.stories['t2'] = [{'type': 'comment', 'text': 'moved to live'}]
+    del fake.tasks['t1']
+    fake.events = [
+        {'action': 'added', 'resource': {'gid': 't2', 'resource_type': 'task'},
+         'parent': {'gid': 's1', 'resource_type': 'section'}},
+        {'action': 'added', 'resource': {'gid': 'st9', 'resource_type': 'story'},
+         'parent': {'gid': 't2', 'resource_type': 'task'}},
+        {'action': 'deleted', 'resource': {'gid': 't1', 'resource_type': 'task'}},
+    ]
+    fake.calls.clear()
+    rows = service.get_all_tasks_for_sheets('p1')
+    assert [(r['channel_name'], r['section'], r['last_update']) for r in rows] == [
+        ('Channel 2', 'Live', 'moved to live')]
+    assert '/tasks' not in fake.calls and '/projects/p1/sections' not in fake.calls
+
+
+def test_failed_task_refetch_keeps_rows_and_replays_events(service):
+    service.get_all_tasks_for_sheets('p1')
+    fake = service.http
+    fake.tasks['t2']['name'] = 'Channel 2 renamed'
+    fake.events = [{'action': 'changed', 'resource': {'gid': 't2', 'resource_type': 'task'},
+                    'parent': {'gid': 'p1', 'resource_type': 'project'}}]
+    token = service.state_store.get_watermark('asana', 'p1')
+
+    fake.failing = {'/tasks/t2'}
+    rows = service.get_all_tasks_for_sheets('p1')
+    assert [r['channel_name'] for r in rows] == ['Channel 1', 'Channel 2']
+    assert service.state_store.get_watermark('asana', 'p1') == token
+
+    # The next run starts from the same token; the fake replays the change as Asana would
+    fake.failing = set()
+    fake.events = [{'action': 'changed', 'resource': {'gid': 't2', 'resource_type': 'task'},
+                    'parent': {'gid': 'p1', 'resource_type': 'project'}}]
+    rows = service.get_all_tasks_for_sheets('p1')
+    assert [r['channel_name'] for r in rows] == ['Channel 1', 'Channel 2 renamed']
+    assert service.state_store.get_watermark('asana', 'p1') != token
+
+
+def test_last_comments_are_fetched_in_batches_of_ten(service):
+    fake = service.http
+    fake.stories = {f't{i}': [{'type': 'comment', 'text': f'c{i}'}, {'type': 'system', 'text': 'x'}] for i in range(25)}
+    tasks = [{'gid': f't{i}', 'modified_at': '2024-01-01T00:00:00Z'} for i in range(25)]
+    last = service.get_last_comments(tasks)
+    assert fake.calls == ['/batch', '/batch', '/batch']
+    assert last['t0'] == 'c0' and last['t24'] == 'c24'
+
+
+def test_last_comment_cache_skips_unchanged_tasks(service):
+    fake = service.http
+    fake.stories = {'t1': [{'type': 'comment', 'text': 'x' * 900}], 't2': [{'type': 'comment', 'text': 'old'}]}
+    tasks = [{'gid': 't1', 'modified_at': 'm1'}, {'gid': 't2', 'modified_at': 'm1'}]
+    first = service.get_last_comments(tasks)
+    assert len(first['t1']) == service.LAST_UPDATE_MAX_LENGTH
+
+    fake.calls.clear()
+    assert service.get_last_comments(tasks) == first
+    assert fake.calls == []
+
+    fake.stories['t2'] = [{'type': 'comment', 'text': 'new'}]
+    again = service.get_last_comments([tasks[0], {'gid': 't2', 'modified_at': 'm2'}])
+    assert again['t2'] == 'new'
+    assert fake.calls == ['/batch']
+
+
+def test_full_scan_uses_batch_for_comments(service):
+    service.incremental = False
+    service.get_all_tasks_for_sheets('p1')
+    assert service.http.calls.count('/batch') == 1
+    assert not any(path.endswith('/stories') for path in service.http.calls)
+
+
+class _PagedHttp:
+    def __init__(self, items, fail_at=None):
+        self.items = items
+        self.fail_at = fail_at
+        self.calls = []
+
+    def get(self, url, headers=None, params=None, **kwargs):
+        self.calls.append(dict(params))
+        offset = int(params.get('offset', 0))
+        if offset == self.fail_at:
+            return _FakeResponse(500, {'errors': [{'message': 'Server Error'}]})
+        limit = params['limit']
+        page = self.items[offset:offset + limit]
+        more = offset + limit < len(self.items)
+        next_page = {'offset': str(offset + limit), 'path': '', 'uri': ''} if more else None
+        return _FakeResponse(200, {'data': page, 'next_page': next_page})
+
+
+def test_collection_reads_follow_next_page():
+    service = AsanaService()
+    service.http = _PagedHttp([{'gid': str(i)} for i in range(250)])
+    tasks = service.get_tasks_in_section('s1')
+    assert [t.gid for t in tasks] == [str(i) for i in range(250)]
+    assert [c.get('offset') for c in service.http.calls] == [None, '100', '200']
+    assert all(c['limit'] == 100 for c in service.http.calls)
+
+
+def test_get_last_comment_streams_stories():
+    service = AsanaService()
+    stories = [{'type': 'comment', 'text': f'c{i}'} if i % 3 == 0 else {'type': 'system', 'text': 's'} for i in range(230)]
+    service.http = _PagedHttp(stories)
+    assert service.get_last_comment('t1') == 'c228'
+
+
+def test_failed_page_raises_instead_of_truncating():
+    service = AsanaService()
+    service.http = _PagedHttp([{'gid': str(i)} for i in range(250)], fail_at=100)
+    with pytest.raises(requests.exceptions.HTTPError):
+        list(service.iter_collection('/tasks', {'section': 's1'}))
+
+
+def test_failed_full_scan_stores_nothing(service):
+    service.http.tasks['t2']['section'] = 's9'
+    service.http.sections.append({'gid': 's9', 'name': 'Broken'})
+    original_get = service.http.get
+
+    def get(url, headers=None, params=None, **kwargs):
+        if (params or {}).get('section') == 's9':
+            return _FakeResponse(503, {'errors': []})
+        return original_get(url, headers=headers, params=params, **kwargs)
+    service.http.get = get
+    with pytest.raises(requests.exceptions.HTTPError):
+        service.get_all_tasks_for_sheets('p1')
+    assert service.state_store.load_records('asana', 'p1') == []
+    assert service.state_store.get_watermark('asana', 'p1') is None
@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+import pytest
+from fake_sheets import FakeSheetsService
+from asana_sheets_service import AsanaSheetsService
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    fake = FakeSheetsService({'Live': [['old']]})
+    monkeypatch.setattr(AsanaSheetsService, '_authenticate', lambda self: fake)
+    monkeypatch.delenv('SHEETS_METADATA_TTL', raising=False)
+    return fake
+
+
+def _task(section, name):
+    return {'section': section, 'channel_name': name, 'assigned_to': 'A', 'email': 'a@x.com',
+            'date_created': '2024-01-01', 'status': 'Open', 'last_update': ''}
+
+
+def test_export_creates_tabs_and_writes_everything_in_three_calls(fake):
+    sections = ['Live'] + [f'Section {i}' for i in range(11)]
+    tasks = [_task(section, f'{section} channel') for section in sections]
+    assert AsanaSheetsService().export_asana_data(tasks) is True
+
+    assert [call[0] for call in fake.calls] == ['get', 'batchUpdate', 'values.batchUpdate']
+    assert fake.calls[1] == ('batchUpdate', 12)  # 11 new sections + summary; 'Live' already exists
+    assert len(fake.calls[2][1]) == 13
+    assert fake.tabs['Section 3'][5][0] == 'Section 3 channel'
+    assert fake.tabs['Live'][5][0] == 'Live channel'
+    assert fake.tabs['Asana Summary'][0] == ['ASANA DASHBOARD SUMMARY']
+
+
+def test_export_skips_tab_creation_when_all_tabs_exist(fake):
+    service = AsanaSheetsService()
+    service.export_asana_data([_task('Live', 'one')])
+    fake.calls.clear()
+    service.export_asana_data([_task('Live', 'two')])
+    assert [call[0] for call in fake.calls] == ['values.batchUpdate']
@@ -0,0 +1,88 @@
+import sys
+import os
+import asyncio
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+import pytest
+import aiohttp
+from async_services import AsyncClickUpService, AsyncAsanaService
+
+
+class _FakeAsyncHttp:
+    def __init__(self, routes):
+        self.routes = routes
+        self.calls = []
+
+    async def get(self, url, headers=None, params=None, raise_for_status=False):
+        path = url.split('/api/')[1].split('/', 1)[1]
+        self.calls.append((path, dict(params or {})))
+        body = self.routes(path, params or {})
+        if body is None:
+            # A route answering None stands for a 500
+            if raise_for_status:
+                raise aiohttp.ClientError(f'500 Server Error for {path}')
+            return 500, None
+        return 200, body
+
+    async def close(self):
+        pass
+
+
+def test_async_clickup_walks_pages_for_every_board():
+    def routes(path, params):
+        if path.endswith('/field'):
+            return {'fields': []}
+        list_id = path.split('/')[1]
+        page = int(params['page'])
+        count = {'L1': [100, 4], 'L2': [2]}[list_id]
+        return {
+            'tasks': [{'id': f'{list_id}-{page}-{i}'} for i in range(count[page])],
+            'last_page': page == len(count) - 1
+        }
+
+    service = AsyncClickUpService(http=_FakeAsyncHttp(routes))
+    tasks = asyncio.run(service.fetch_board_tasks({'A': 'L1', 'B': 'L2'}))
+    assert len(tasks) == 106
+    assert tasks[0].board_name == 'A'
+    assert tasks[-1].id == 'L2-0-1'
+
+
+def test_async_asana_matches_sync_formatting():
+    def routes(path, params):
+        if path.startswith('projects/'):
+            return {'data': [{'gid': 's1', 'name': 'Live'}]}
+        if path == 'tasks':
+            return {'data': [
+                {'gid': 't1', 'name': 'Channel 1', 'completed': True, 'created_at': '2024-01-02T03:04:05Z',
+                 'assignee': {'name': 'Ann', 'email': 'ann@example.com'}},
+                {'gid': 't2', 'name': 'Channel 2'},
+            ]}
+        if path == 'tasks/t1/stories':
+            return {'data': [{'type': 'comment', 'text': 'first'}, {'type': 'system', 'text': 'moved'},
+                             {'type': 'comment', 'text': 'latest'}]}
+        return {'data': []}
+
+    service = AsyncAsanaService(http=_FakeAsyncHttp(routes))
+    tasks = asyncio.run(service.get_all_tasks_for_sheets('p1'))
+    assert tasks == [
+        {'channel_name': 'Channel 1', 'assigned_to': 'Ann', 'email': 'ann@example.com',
+         'date_created': '2024-01-02', 'status': 'Completed', 'last_update': 'latest', 'section': 'Live'},
+        {'channel_name': 'Channel 2', 'assigned_to': 'Unassigned', 'email': '',
+         'date_created': '', 'status': 'In Progress', 'last_update': 'No comments', 'section': 'Live'},
+    ]
+
+
+def test_async_asana_raises_on_a_failed_section_page():
+    def routes(path, params):
+        if path == 'tasks':
+            if params.get('offset') == '2':
+                return None
+            return {'data': [{'gid': 't1', 'name': 'Channel 1'}], 'next_page': {'offset': '2'}}
+        if path == 'tasks/t1/stories':
+            return None
+        return {'data': []}
+
+    service = AsyncAsanaService(http=_FakeAsyncHttp(routes))
+    with pytest.raises(aiohttp.ClientError):
+        asyncio.run(service.get_tasks_in_section('s1'))
+    # Comments keep the sync service's print-and-return-[] behaviour
+    assert asyncio.run(service.get_task_comments('t1')) == []
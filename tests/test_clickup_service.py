@@ -2,7 +2,9 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
 import pytest
+import requests
 from clickup_service import ClickUpService
+from sync_state import SyncStateStore
 
 
 def test_format_task_row_pipe():
@@ -37,3 +39,333 @@ def test_calculate_data_ranges():
     assert r1 == 'A2:G3'
     assert rlabel == 'A4:G4'
     assert r2 == 'A5:G5'
+
+class _FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+class _FakeListHttp:
+    """Serves /list/{id}/task pages from a dict of list_id -> list of pages."""
+
+    def __init__(self, pages_by_list):
+        self.pages_by_list = pages_by_list
+        self.calls = []
+        # list IDs answering 500
+        self.failing = set()
+
+    def get(self, url, headers=None, params=None):
+        if url.endswith('/field'):
+            return _FakeResponse({'fields': []})
+        list_id = url.split('/list/')[1].split('/')[0]
+        if list_id in self.failing:
+            raise requests.exceptions.HTTPError(f'500 Server Error for list {list_id}')
+        page = int(params.get('page', 0))
+        self.calls.append((list_id, page))
+        pages = self.pages_by_list[list_id]
+        tasks = pages[page] if page < len(pages) else []
+        return _FakeResponse({'tasks': tasks, 'last_page': page >= len(pages) - 1})
+
+
+def _make_pages(prefix, sizes):
+    return [[{'id': f'{prefix}-{p}-{i}', 'name': f'Task {p}-{i}'} for i in range(size)] for p, size in enumerate(sizes)]
+
+
+def test_get_tasks_from_list_walks_every_page():
+    service = ClickUpService()
+    service.http = _FakeListHttp({'L1': _make_pages('L1', [100, 100, 7])})
+    tasks = service.get_tasks_from_list('L1', 'Board1')
+    assert len(tasks) == 207
+    assert [c[1] for c in service.http.calls] == [0, 1, 2]
+    assert all(t.board_name == 'Board1' and t.board_id == 'L1' for t in tasks)
+
+
+def test_iter_tasks_is_lazy():
+    service = ClickUpService()
+    service.http = _FakeListHttp({'L1': _make_pages('L1', [100, 100])})
+    tasks = service.iter_tasks('L1', 'Board1')
+    first = next(tasks)
+    assert first.id == 'L1-0-0'
+    assert service.http.calls == [('L1', 0)]
+
+
+def test_fetch_boards_keeps_board_and_page_order():
+    service = ClickUpService()
+    service.fetch_workers = 4
+    service.http = _FakeListHttp({
+        'L1': _make_pages('L1', [100, 100, 3]),
+        'L2': _make_pages('L2', [5]),
+        'L3': _make_pages('L3', [100, 0]),
+    })
+    tasks = service.fetch_board_tasks({'A': 'L1', 'B': 'L2', 'C': 'L3'})
+    expected = [t['id'] for pages in (_make_pages('L1', [100, 100, 3]), _make_pages('L2', [5]), _make_pages('L3', [100, 0])) for page in pages for t in page]
+    assert [t.id for t in tasks] == expected
+    assert {t.board_name for t in tasks} == {'A', 'B', 'C'}
+
+
+def test_partition_tasks_by_client_routes_in_one_pass():
+    service = ClickUpService()
+    tasks = [
+        {'name': '"Dirt Vision" | Stream down'},
+        {'name': 'DV | Ads missing'},
+        {'name': 'Gotham | Login bug'},
+        {'name': 'Yahoo | Feed'},
+        {'name': 'No pipe at all'},
+    ]
+    partitions = service.partition_tasks_by_client(tasks)
+    assert set(partitions) == set(service.CLIENT_SPREADSHEET_IDS)
+    assert [t['name'] for t in partitions['Dirt Vision']] == ['"Dirt Vision" | Stream down', 'DV | Ads missing']
+    assert [t['name'] for t in partitions['Gotham/Yes']] == ['Gotham | Login bug']
+    assert [t['name'] for t in partitions['Yahoo']] == ['Yahoo | Feed']
+    assert partitions['Marquee'] == []
+
+
+def test_export_all_clients_fetches_boards_once():
+    service = ClickUpService()
+    service.http = _FakeListHttp({
+        '75793048': [[{'id': '1', 'name': 'Wurl | Outage'}, {'id': '2', 'name': 'Marquee | Bug'}]],
+        '901103923965': [[]],
+        '901110903380': [[]],
+    })
+    exported = {}
+    service.export_single_client_to_spreadsheet = lambda name, client_tasks=None: exported.setdefault(name, client_tasks)
+    service.export_all_clients_to_spreadsheets()
+    assert len(service.http.calls) == 3 * service.page_window
+    assert [t.id for t in exported['Wurl']] == ['1']
+    assert [t.id for t in exported['Marquee']] == ['2']
+
+
+def test_export_all_clients_isolates_failures():
+    service = ClickUpService()
+    service.http = _FakeListHttp({'75793048': [[]], '901103923965': [[]], '901110903380': [[]]})
+
+    def export(name, client_tasks=None):
+        if name == 'Marquee':
+            raise RuntimeError('quota exceeded')
+        return name != 'Wurl'
+
+    service.export_single_client_to_spreadsheet = export
+    summary = service.export_all_clients_to_spreadsheets(workers=3)
+    assert list(summary) == list(service.CLIENT_SPREADSHEET_IDS)
+    assert summary['Marquee']['ok'] is False and summary['Marquee']['error'] == 'quota exceeded'
+    assert summary['Wurl']['ok'] is False
+    assert [name for name, result in summary.items() if result['ok']] == ['Dirt Vision', 'Gotham/Yes', 'Yahoo']
+
+
+class _FakeUpdatedHttp:
+    """Serves one list whose tasks honour the date_updated_gt filter."""
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.calls = []
+
+    def get(self, url, headers=None, params=None):
+        if url.endswith('/field'):
+            return _FakeResponse({'fields': []})
+        self.calls.append(dict(params))
+        since = params.get('date_updated_gt')
+        tasks = [dict(t) for t in self.tasks if since is None or int(t['date_updated']) > since]
+        return _FakeResponse({'tasks': tasks, 'last_page': True})
+
+
+def test_incremental_fetch_merges_changes_into_snapshot(tmp_path):
+    service = ClickUpService()
+    service.incremental = True
+    service.state_store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    service.http = _FakeUpdatedHttp([
+        {'id': 'a', 'name': 'A', 'date_updated': '1000'},
+        {'id': 'b', 'name': 'B', 'date_updated': '2000'},
+    ])
+    first = service.fetch_board_tasks({'Board': 'L1'})
+    assert [t.id for t in first] == ['a', 'b']
+    assert 'date_updated_gt' not in service.http.calls[0]
+
+    service.http.tasks[0] = {'id': 'a', 'name': 'A renamed', 'date_updated': '3000'}
+    service.http.tasks.append({'id': 'c', 'name': 'C', 'date_updated': '3500'})
+    service.http.calls.clear()
+    second = service.fetch_board_tasks({'Board': 'L1'})
+    assert service.http.calls[0]['date_updated_gt'] == 1999
+    assert [(t.id, t.name) for t in second] == [('a', 'A renamed'), ('b', 'B'), ('c', 'C')]
+    assert service.state_store.get_watermark('clickup', 'L1') == '3500'
+
+    service.http.tasks = [{'id': 'c', 'name': 'C', 'date_updated': '3500'}]
+    resynced = service.fetch_board_tasks({'Board': 'L1'}, full_resync=True)
+    assert [t.id for t in resynced] == ['c']
+
+
+def test_incremental_snapshot_picks_up_deltas_merged_by_another_process(tmp_path):
+    path = str(tmp_path / 'state.sqlite3')
+    http = _FakeUpdatedHttp([{'id': 'a', 'name': 'A', 'date_updated': '1000'},
+                             {'id': 'b', 'name': 'B', 'date_updated': '1000'}])
+    daemon, cli = ClickUpService(), ClickUpService()
+    for service in (daemon, cli):
+        service.incremental = True
+        service.state_store = SyncStateStore(path)
+        service.http = http
+    daemon.fetch_board_tasks({'Board': 'L1'})
+
+    # A CLI run merges both renames and moves the shared watermark past the first one
+    http.tasks = [{'id': 'a', 'name': 'A renamed', 'date_updated': '2000'},
+                  {'id': 'b', 'name': 'B renamed', 'date_updated': '3000'}]
+    cli.fetch_board_tasks({'Board': 'L1'})
+    assert [t.name for t in daemon.fetch_board_tasks({'Board': 'L1'})] == ['A renamed', 'B renamed']
+
+
+def test_client_sheet_write_is_one_plan():
+    service = ClickUpService()
+    headers = ['Account', 'Ticket ID/Link', 'Subject', 'Severity', 'Status', 'Ticket Filed By', 'Board']
+    plan = service._plan_client_sheet_write('Production', headers, 5, [['a'] * 7, ['b'] * 7], [['c'] * 7])
+    assert plan.ranges == [
+        "'Production'!A1:G1",
+        "'Production'!A5:G6",
+        "'Production'!A7:G7",
+        "'Production'!A8:G8",
+    ]
+    assert plan.body()['valueInputOption'] == 'RAW'
+    assert plan.data[2]['values'] == [service.NO_PIPE_LABEL_ROW]
+
+
+def test_client_sheet_write_skips_empty_groups():
+    service = ClickUpService()
+    plan = service._plan_client_sheet_write('Production', ['h'] * 7, 2, [], [['c'] * 7])
+    assert plan.ranges == ["'Production'!A1:G1", "'Production'!A2:G2", "'Production'!A3:G3"]
+
+
+def test_format_rows_builds_every_layout_column_wise():
+    service = ClickUpService()
+    tasks = [
+        {'name': 'Wurl | Outage', 'url': 'u1', 'priority': {'priority': 'urgent'}, 'status': {'status': 'open'},
+         'custom_fields': [], 'board_name': 'B'},
+        {'name': 'No pipe', 'url': 'u2', 'board_name': 'B'},
+    ]
+    assert service.format_rows(tasks) == [
+        ['Wurl', 'u1', 'Outage', 'urgent', 'open', 'Not Available', 'B'],
+        ['', 'u2', 'No pipe', 'normal', 'Unknown', 'Not Available', 'B'],
+    ]
+    assert service.format_rows(tasks, layout='account')[0][:3] == ['Wurl', 'u1', 'Wurl | Outage']
+    assert service.format_rows(tasks, layout='production')[1] == ['u2', 'No pipe', 'normal', 'Unknown', 'Not Available']
+
+
+class _FieldHttp:
+    """One list whose filer email custom field has ID 'f-email'; counts /field lookups."""
+
+    def __init__(self):
+        self.field_calls = 0
+
+    def get(self, url, headers=None, params=None):
+        if url.endswith('/field'):
+            self.field_calls += 1
+            return _FakeResponse({'fields': [{'id': 'f-other', 'name': 'Other'},
+                                             {'id': 'f-email', 'name': 'Work email address?'}]})
+        page = int(params['page'])
+        task = {'id': f't{page}', 'name': 'Yahoo | Feed', 'custom_fields': [
+            {'id': 'f-other', 'name': 'Work email address?', 'value': 'wrong@x.com'},
+            {'id': 'f-email', 'name': 'Renamed field', 'value': f'filer{page}@x.com'},
+        ]}
+        return _FakeResponse({'tasks': [task], 'last_page': page == 1})
+
+
+def test_filer_field_resolved_once_per_list_by_id():
+    service = ClickUpService()
+    service.http = _FieldHttp()
+    tasks = service.get_tasks_from_list('L1', 'Board')
+    assert service.http.field_calls == 1
+    assert [task.filer_email for task in tasks] == ['filer0@x.com', 'filer1@x.com']
+
+
+def test_field_lookups_of_different_lists_run_concurrently():
+    import threading
+    started = threading.Barrier(2, timeout=5)
+
+    class _SlowFieldHttp(_FieldHttp):
+        def get(self, url, headers=None, params=None):
+            if url.endswith('/field'):
+                # Both lookups must be in flight at once, or the barrier times out
+                started.wait()
+            return super().get(url, headers, params)
+
+    service = ClickUpService()
+    service.http = _SlowFieldHttp()
+    threads = [threading.Thread(target=service.get_filer_field_id, args=(list_id,)) for list_id in ('L1', 'L2')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not started.broken
+    assert service._filer_field_ids == {'L1': 'f-email', 'L2': 'f-email'}
+
+
+def test_client_export_upserts_rows_and_keeps_sections(monkeypatch, tmp_path):
+    from fake_sheets import FakeSheetsService
+    import sheets_service
+    fake = FakeSheetsService({'Production': []})
+    monkeypatch.setattr(sheets_service.GoogleSheetsService, '_authenticate', lambda self: fake)
+    monkeypatch.delenv('SHEETS_METADATA_TTL', raising=False)
+    service = ClickUpService()
+    service.state_store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    tasks = [{'id': '1', 'name': 'Yahoo | Down', 'url': 'u1', 'board_name': 'B'},
+             {'id': '2', 'name': 'No pipe', 'url': 'u2', 'board_name': 'B'}]
+    for _ in range(3):
+        assert service.export_single_client_to_spreadsheet('Yahoo', client_tasks=tasks)
+    assert [row[1] for row in fake.tabs['Production']] == ['Ticket ID/Link', 'u1', '', 'u2']
+    assert fake.tabs['Production'][2] == service.NO_PIPE_LABEL_ROW
+
+    # A new customer task goes above the label and the task that is gone leaves the tab
+    tasks = [tasks[0], {'id': '3', 'name': 'Yahoo | Slow', 'url': 'u3', 'board_name': 'B'}]
+    assert service.export_single_client_to_spreadsheet('Yahoo', client_tasks=tasks)
+    assert [row[1] for row in fake.tabs['Production']] == ['Ticket ID/Link', 'u1', 'u3', '']
+    assert fake.tabs['Production'][3] == service.NO_PIPE_LABEL_ROW
+
+
+def test_production_export_keeps_rows_of_a_board_that_failed(monkeypatch, tmp_path):
+    from fake_sheets import FakeSheetsService
+    import sheets_service
+    fake = FakeSheetsService({'production': []})
+    monkeypatch.setattr(sheets_service.GoogleSheetsService, '_authenticate', lambda self: fake)
+    monkeypatch.delenv('SHEETS_METADATA_TTL', raising=False)
+    service = ClickUpService()
+    service.state_store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    service.http = _FakeListHttp({
+        '75793048': [[{'id': '1', 'name': 'Yahoo | Down', 'url': 'u1'}]],
+        '901103923965': [[{'id': '2', 'name': 'Internal', 'url': 'u2'}, {'id': '3', 'name': 'Other', 'url': 'u3'}]],
+    })
+    assert service.export_issues_to_production()
+
+    service.http.failing.add('901103923965')
+    assert service.export_issues_to_production() is False
+    assert [row[0] for row in fake.tabs['production']] == ['Ticket ID/Link', 'u1', 'u2', 'u3']
+
+
+def test_failed_board_reuses_its_snapshot_and_keeps_client_rows(monkeypatch, tmp_path):
+    from fake_sheets import FakeSheetsService
+    import sheets_service
+    fake = FakeSheetsService({'Production': []})
+    monkeypatch.setattr(sheets_service.GoogleSheetsService, '_authenticate', lambda self: fake)
+    monkeypatch.delenv('SHEETS_METADATA_TTL', raising=False)
+    service = ClickUpService()
+    service.incremental = True
+    service.state_store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    service.http = _FakeListHttp({
+        '75793048': [[{'id': '1', 'name': 'Yahoo | Down', 'url': 'u1', 'date_updated': '1000'}]],
+        '901103923965': [[{'id': '2', 'name': 'Yahoo | Slow', 'url': 'u2', 'date_updated': '1000'}]],
+        '901110903380': [[]],
+    })
+    assert service.export_single_client_to_spreadsheet('Yahoo')
+
+    # Incremental: the failed board contributes its last snapshot
+    service.http.failing.add('901103923965')
+    snapshot = service.fetch_task_snapshot()
+    assert snapshot.failed_boards == ('Issues (Internal)',)
+    assert [task.id for task in snapshot] == ['1', '2']
+    assert service.state_store.get_watermark('clickup', '901103923965') == '1000'
+
+    # Without a snapshot to fall back on, the board's rows stay in the tab
+    service.incremental = False
+    assert service.export_single_client_to_spreadsheet('Yahoo') is False
+    assert [row[1] for row in fake.tabs['Production']] == ['Ticket ID/Link', 'u1', 'u2', '']
@@ -0,0 +1,32 @@
+import sys
+import os
+import random
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from customer_routing import AliasIndex, CustomerRouter, extract_customer_name
+
+
+def test_extract_customer_name_handles_quotes_and_empty_names():
+    assert extract_customer_name('"Dirt Vision" | Stream down') == 'Dirt Vision'
+    assert extract_customer_name('Wurl | Outage') == 'Wurl'
+    assert extract_customer_name('No pipe here') is None
+    assert extract_customer_name('') is None
+
+
+def test_alias_index_finds_overlapping_aliases():
+    index = AliasIndex({'Gotham/Yes': ['gotham', 'yes'], 'Eyes': ['eyes'], 'Dirt Vision': ['dv', 'dirt vision']})
+    assert index.match('Eyes') == ('Gotham/Yes', 'Eyes')
+    assert index.match('DV gotham') == ('Gotham/Yes', 'Dirt Vision')
+    assert index.match('marquee') == ()
+
+
+def test_router_matches_naive_substring_scan_with_many_clients():
+    rng = random.Random(7)
+    words = ['alpha', 'beta', 'gamma', 'delta', 'omega', 'sigma', 'tau', 'pi', 'rho', 'nu']
+    aliases = {f'Client {i}': [f'{rng.choice(words)}{i}', rng.choice(words) + rng.choice(words)] for i in range(2000)}
+    router = CustomerRouter(aliases)
+    names = [f'{rng.choice(words)}{rng.randrange(2500)} {rng.choice(words)}{rng.choice(words)} | Issue' for _ in range(500)]
+    for name in names:
+        customer = extract_customer_name(name).lower()
+        expected = tuple(client for client, client_aliases in aliases.items()
+                         if any(alias in customer for alias in client_aliases))
+        assert router.route(name) == expected
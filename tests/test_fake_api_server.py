@@ -0,0 +1,74 @@
+import sys
+import os
+import threading
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+import pytest
+from fake_api_server import FakeApi, make_server
+from http_client import HttpClient
+from clickup_service import ClickUpService
+from asana_service import AsanaService
+from asana_sheets_service import AsanaSheetsService
+
+
+@pytest.fixture
+def fake_api():
+    api = FakeApi(tasks_per_list=250, asana_tasks=30, asana_sections=3, page_size=100, rate_limit=0.2, retry_after=0)
+    server = make_server(api)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield api, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_clickup_pages_come_through_rate_limits(fake_api, monkeypatch):
+    api, base = fake_api
+    monkeypatch.setenv('CLICKUP_BASE_URL', f"{base}/api/v2")
+    service = ClickUpService()
+    service.http = HttpClient(max_retries=10)
+    tasks = service.get_tasks_from_list('list-1', 'Board')
+    assert len(tasks) == 250
+    assert len({t.id for t in tasks}) == 250
+    assert api.stats['rate_limited'] > 0
+
+
+def test_asana_sections_and_stories(fake_api, monkeypatch):
+    _, base = fake_api
+    monkeypatch.setenv('ASANA_BASE_URL', f"{base}/api/1.0")
+    service = AsanaService()
+    service.incremental = False
+    service.comment_cache = False
+    service.http = HttpClient(max_retries=10)
+    tasks = service.get_all_tasks_for_sheets('proj-1')
+    assert len(tasks) == 30
+
+
+def test_sheets_values_round_trip():
+    api = FakeApi()
+    api.sheets.write('sheet', "'production'!B2:C3", [['a', 'b'], ['c', 'd']])
+    status, body = api.sheets.read('sheet', "'production'!A1:C3")
+    assert status == 200
+    assert body['values'] == [[], ['', 'a', 'b'], ['', 'c', 'd']]
+
+
+def test_asana_export_to_wurl_sheets(fake_api, monkeypatch, tmp_path):
+    import sheets_service
+    api, base = fake_api
+    monkeypatch.setenv('ASANA_BASE_URL', f"{base}/api/1.0")
+    monkeypatch.setenv('SHEETS_API_ENDPOINT', base)
+    monkeypatch.setenv('SHEETS_METADATA_CACHE', str(tmp_path / 'metadata.json'))
+    monkeypatch.delenv('SHEETS_METADATA_TTL', raising=False)
+    monkeypatch.setattr(sheets_service, '_shared_factory', None)
+    service = AsanaService()
+    service.incremental = False
+    service.comment_cache = False
+    service.http = HttpClient(max_retries=10)
+    assert service.export_to_wurl_sheets()
+    sheets = AsanaSheetsService()
+    tabs = api.sheets.spreadsheets[sheets.SPREADSHEET_ID]['tabs']
+    assert tabs['Asana Summary']
+    # Every section gets its own populated tab
+    for section in api.asana.sections:
+        assert tabs[sheets._clean_tab_name(section['name'])]
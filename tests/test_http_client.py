@@ -0,0 +1,52 @@
+import sys
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+import pytest
+from http_client import HttpClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_connections_are_reused(server):
+    client = HttpClient()
+    for _ in range(5):
+        assert client.get(f"{server}/team").json() == {'ok': True}
+    stats = client.connection_stats()
+    assert stats['requests'] == 5
+    assert stats['opened'] == 1
+    assert stats['reused'] == 4
+    assert stats['hosts']['127.0.0.1']['requests'] == 5
+    client.close()
+
+
+def test_default_timeout_and_compression_headers(server):
+    client = HttpClient(timeout=(1, 2))
+    response = client.get(f"{server}/team")
+    assert response.request.headers['Accept-Encoding'] == 'gzip, deflate'
+    assert client.timeout == (1, 2)
+    client.close()
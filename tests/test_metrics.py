@@ -0,0 +1,61 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+import pytest
+from metrics import RunMetrics, endpoint_name, prometheus_text
+
+
+def test_endpoint_name_templates_ids_but_keeps_versions_and_actions():
+    assert endpoint_name('GET', 'https://api.clickup.com/api/v2/list/901103923965/task?page=3') == \
+        'GET api.clickup.com/api/v2/list/{id}/task'
+    assert endpoint_name('GET', 'https://app.asana.com/api/1.0/tasks/12034/stories') == \
+        'GET app.asana.com/api/1.0/tasks/{id}/stories'
+    assert endpoint_name('POST', 'https://sheets.googleapis.com/v4/spreadsheets/1xv3wc:batchUpdate') == \
+        'POST sheets.googleapis.com/v4/spreadsheets/{id}:batchUpdate'
+    assert endpoint_name('GET', "https://sheets.googleapis.com/v4/spreadsheets/1xv3/values/'production'!A:E") == \
+        'GET sheets.googleapis.com/v4/spreadsheets/{id}/values/{id}'
+
+
+def test_nested_runs_fold_into_one_report(tmp_path):
+    metrics = RunMetrics(output_dir=str(tmp_path))
+    with metrics.run('export_all_clients_to_spreadsheets') as outer:
+        metrics.add_phase('fetch', 1.5)
+        metrics.record_call('GET api.clickup.com/api/v2/list/{id}/task', 200, response_bytes=1000, retries=2)
+        metrics.record_call('GET api.clickup.com/api/v2/list/{id}/task', 500)
+        with metrics.run('export_single_client_to_spreadsheet') as inner:
+            metrics.add_phase('sheet_write', 0.25)
+            metrics.add_rows_written(40)
+            inner['ok'] = True
+        outer['ok'] = True
+
+    # Only the outermost run writes reports
+    assert sorted(os.listdir(tmp_path)) == ['export_all_clients_to_spreadsheets.json',
+                                            'export_all_clients_to_spreadsheets.prom']
+    with open(tmp_path / 'export_all_clients_to_spreadsheets.json') as f:
+        report = json.load(f)
+    assert report['ok'] is True
+    assert list(report['phases']) == ['fetch', 'sheet_write']
+    assert report['api']['GET api.clickup.com/api/v2/list/{id}/task'] == {
+        'calls': 2, 'bytes': 1000, 'seconds': 0.0, 'retries': 2, 'errors': 1}
+    assert report['retries'] == 2
+    assert report['rows_written'] == 40
+
+
+def test_prometheus_text_escapes_labels():
+    metrics = RunMetrics()
+    metrics.reset('export_all')
+    metrics.record_call('GET host/path "quoted"', 200)
+    text = prometheus_text(metrics.report(ok=False))
+    assert 'tracker_run_success{run="export_all"} 0' in text
+    assert 'tracker_api_requests{run="export_all",endpoint="GET host/path \\"quoted\\""} 1' in text
+    assert '# TYPE tracker_rows_written gauge' in text
+
+
+def test_failed_run_is_reported_when_entry_point_raises(tmp_path):
+    metrics = RunMetrics(output_dir=str(tmp_path))
+    with pytest.raises(RuntimeError):
+        with metrics.run('export_all'):
+            raise RuntimeError('boom')
+    with open(tmp_path / 'export_all.json') as f:
+        assert json.load(f)['ok'] is False
@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from models import TaskRecord, AsanaTaskRecord
+
+
+RAW_TASK = {
+    'id': 'abc', 'name': 'Wurl | Outage', 'url': 'https://app.clickup.com/t/abc',
+    'priority': {'priority': 'urgent'}, 'status': {'status': 'in progress'},
+    'custom_fields': [{'name': 'Other', 'value': 'x'}, {'name': 'Work email address?', 'value': 'a@wurl.com'}],
+    'assignees': [{'username': 'sam'}], 'date_updated': '1700000000000',
+    'description': 'long text ' * 200, 'checklists': [{'items': list(range(50))}], 'watchers': [{'id': 1}] * 10,
+}
+
+
+def test_task_record_keeps_export_fields_only():
+    record = TaskRecord.from_api(RAW_TASK, 'Board', 'L1')
+    assert (record.severity, record.status, record.filer_email, record.owner) == ('urgent', 'in progress', 'a@wurl.com', 'sam')
+    assert record.date_updated == 1700000000000
+    assert (record.board_name, record.board_id) == ('Board', 'L1')
+    assert not hasattr(record, '__dict__')
+
+
+def test_task_record_defaults_for_missing_fields():
+    record = TaskRecord.from_api({'id': '1', 'priority': None, 'status': None, 'custom_fields': [
+        {'name': 'Work email address?', 'value': '  '}]})
+    assert (record.name, record.severity, record.status, record.filer_email) == ('', 'normal', 'Unknown', 'Not Available')
+
+
+def test_task_record_round_trips_and_reads_legacy_snapshots():
+    record = TaskRecord.from_api(RAW_TASK, 'Board', 'L1')
+    assert TaskRecord.from_dict(record.to_dict()) == record
+    legacy = dict(RAW_TASK, board_name='Board', board_id='L1')
+    assert TaskRecord.from_dict(legacy) == record
+
+
+def test_asana_record_section_lookup():
+    record = AsanaTaskRecord.from_api({'gid': 't1', 'name': 'Channel', 'assignee': None, 'memberships': [
+        {'project': {'gid': 'p0'}, 'section': {'gid': 's0'}},
+        {'project': {'gid': 'p1'}, 'section': {'gid': 's1'}},
+    ]})
+    assert record.section_in('p1') == 's1'
+    assert record.section_in('p9') is None
+    assert record.assignee_name == ''
@@ -0,0 +1,257 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+import pytest
+from fake_sheets import FakeSheetsService
+from sheets_service import GoogleSheetsService, SpreadsheetMetadataCache, SheetWritePlan, RowUpsertSync, SectionedUpsertSync
+from sync_state import SyncStateStore
+import threading
+from datetime import datetime, timedelta, timezone
+from google.oauth2.credentials import Credentials
+from sheets_service import SheetsClientFactory
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    fake = FakeSheetsService({'Production': [], 'Summary': []})
+    monkeypatch.setattr(GoogleSheetsService, '_authenticate', lambda self: fake)
+    monkeypatch.delenv('SHEETS_METADATA_TTL', raising=False)
+    return fake
+
+
+def test_metadata_fetched_once_with_field_mask(fake):
+    service = GoogleSheetsService()
+    assert service.find_tab('production') == 'Production'
+    assert service.find_tab('PRODUCTION') == 'Production'
+    assert service.find_tab('missing') is None
+    assert fake.calls == [('get', SpreadsheetMetadataCache.FIELDS)]
+
+
+def test_ensure_tab_updates_cache_locally(fake):
+    service = GoogleSheetsService()
+    assert service.ensure_tab('New Tab') == 'New Tab'
+    assert service.ensure_tab('new tab') == 'New Tab'
+    assert [call[0] for call in fake.calls] == ['get', 'batchUpdate']
+
+
+def test_metadata_cache_persists_with_ttl(fake, tmp_path):
+    path = str(tmp_path / 'meta.json')
+    SpreadsheetMetadataCache(fake, ttl=60, cache_path=path).get_tabs('sheet1')
+    fake.calls.clear()
+    assert SpreadsheetMetadataCache(fake, ttl=60, cache_path=path).tab_titles('sheet1') == ['Production', 'Summary']
+    assert fake.calls == []
+
+
+def test_services_share_one_metadata_cache_and_save_it_whole(fake, tmp_path, monkeypatch):
+    import json
+    from asana_sheets_service import AsanaSheetsService
+    path = str(tmp_path / 'meta.json')
+    monkeypatch.setenv('SHEETS_METADATA_TTL', '60')
+    monkeypatch.setenv('SHEETS_METADATA_CACHE', path)
+    monkeypatch.setattr(AsanaSheetsService, '_authenticate', lambda self: fake)
+    services = [GoogleSheetsService(), AsanaSheetsService()]
+    assert services[0].metadata is services[1].metadata
+
+    threads = [threading.Thread(target=services[i % 2].metadata.get_tabs, args=(f'sheet{i}',)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with open(path) as f:
+        assert sorted(json.load(f)) == [f'sheet{i}' for i in range(8)]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_batch_write_sends_one_request(fake):
+    service = GoogleSheetsService()
+    plan = SheetWritePlan('Production').add('A1:B1', [['h1', 'h2']]).add('A2:B3', [['a', 'b'], ['c', 'd']])
+    service.batch_write(plan)
+    assert fake.calls == [('values.batchUpdate', ["'Production'!A1:B1", "'Production'!A2:B3"])]
+    assert fake.tabs['Production'] == [['h1', 'h2'], ['a', 'b'], ['c', 'd']]
+
+
+def test_append_position_scans_only_probe_columns_then_uses_metadata(fake):
+    fake.tabs['Production'] = [['h'] * 7, ['a', 'url1'], ['', 'url2'], [], []]
+    service = GoogleSheetsService()
+    positions = service.append_position
+    assert positions.next_row('sheet1', 'Production', probe_columns='A:B', min_row=2) == 4
+    assert ('values.get', "'Production'!A:B") in fake.calls
+
+    positions.record_last_row('sheet1', 'Production', 10)
+    fake.calls.clear()
+    assert positions.next_row('sheet1', 'Production', probe_columns='A:B', min_row=2) == 11
+    assert fake.calls == [('values.get', "'Production'!A11:B11")]
+
+    positions.record_last_row('sheet1', 'Production', 12)
+    assert len(fake.developer_metadata) == 1
+    assert fake.developer_metadata[0]['metadataValue'] == '12'
+
+
+def test_append_position_rescans_after_manual_rows(fake):
+    service = GoogleSheetsService()
+    positions = service.append_position
+    positions.record_last_row('sheet1', 'Production', 1)
+    fake.tabs['Production'] = [['h'], ['manual'], ['manual']]
+    assert positions.next_row('sheet1', 'Production') == 4
+
+
+HEADER = ['Link', 'Subject', 'Status']
+
+
+def _upsert(service, store):
+    return RowUpsertSync(service, service.SPREADSHEET_ID, 'Production', width=3, header=HEADER, index_store=store)
+
+
+def test_upsert_rewrites_changed_rows_and_appends_new_ones(fake, tmp_path):
+    store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    service = GoogleSheetsService()
+    rows = [['u1', 'One', 'open'], ['u2', 'Two', 'open'], ['u3', 'Three', 'open']]
+    assert _upsert(service, store).sync(rows) == {'updated': 0, 'appended': 3, 'unchanged': 0, 'removed': 0}
+    assert fake.tabs['Production'] == [HEADER] + rows
+
+    fake.calls.clear()
+    rows[1] = ['u2', 'Two', 'closed']
+    stats = _upsert(service, store).sync(rows + [['u4', 'Four', 'open']])
+    assert stats == {'updated': 1, 'appended': 1, 'unchanged': 2, 'removed': 0}
+    assert fake.tabs['Production'] == [HEADER] + rows + [['u4', 'Four', 'open']]
+    # Stored index: no read of the tab, one batched write with only the changed and new rows
+    writes = [call for call in fake.calls if call[0] == 'values.batchUpdate']
+    assert writes == [('values.batchUpdate', ["'Production'!A3:C3", "'Production'!A5:C5"])]
+    assert not any(call == ('values.get', "'Production'!A:C") for call in fake.calls)
+
+
+def test_upsert_without_changes_writes_nothing(fake, tmp_path):
+    store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    service = GoogleSheetsService()
+    rows = [['u1', 'One', 'open']]
+    _upsert(service, store).sync(rows)
+    fake.calls.clear()
+    assert _upsert(service, store).sync(rows) == {'updated': 0, 'appended': 0, 'unchanged': 1, 'removed': 0}
+    assert not any(call[0] == 'values.batchUpdate' for call in fake.calls)
+
+
+def test_upsert_rebuilds_index_from_existing_sheet(fake):
+    fake.tabs['Production'] = [HEADER, ['u1', 'One', 'open'], ['u1', 'One', 'open'], ['u2', 'Two', 'open']]
+    service = GoogleSheetsService()
+    stats = _upsert(service, None).sync([['u2', 'Two', 'done'], ['u3', 'Three', 'open']])
+    assert stats == {'updated': 1, 'appended': 1, 'unchanged': 0, 'removed': 2}
+    # u1 is gone and its duplicate copy is blanked; the new key takes the first freed row
+    assert fake.tabs['Production'][1:] == [['u3', 'Three', 'open'], ['', '', ''], ['u2', 'Two', 'done']]
+    assert len([call for call in fake.calls if call[0] == 'values.batchUpdate']) == 1
+
+
+def test_upsert_blanks_rows_of_keys_that_are_gone(fake, tmp_path):
+    store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    service = GoogleSheetsService()
+    _upsert(service, store).sync([['u1', 'One', 'open'], ['u2', 'Two', 'open'], ['u3', 'Three', 'open']])
+    stats = _upsert(service, store).sync([['u1', 'One', 'open'], ['u2', 'Two', 'open']])
+    assert stats['removed'] == 1
+    assert fake.tabs['Production'][3] == ['', '', '']
+    assert {entry['key'] for entry in store.load_records('sheets', f'{service.SPREADSHEET_ID}/Production')} == {'u1', 'u2'}
+    # A single-row upsert never removes the other rows
+    assert _upsert(service, store).upsert_row(['u1', 'One', 'done'])['removed'] == 0
+    assert fake.tabs['Production'][2] == ['u2', 'Two', 'open']
+
+
+def test_upsert_rebuilds_index_when_rows_were_sorted_by_hand(fake, tmp_path):
+    store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    service = GoogleSheetsService()
+    _upsert(service, store).sync([['u1', 'One', 'open'], ['u2', 'Two', 'open']])
+    fake.tabs['Production'][1:3] = [['u2', 'Two', 'open'], ['u1', 'One', 'open']]
+    stats = _upsert(service, store).sync([['u1', 'One', 'done'], ['u2', 'Two', 'open']])
+    assert stats == {'updated': 1, 'appended': 0, 'unchanged': 1, 'removed': 0}
+    assert fake.tabs['Production'][1:] == [['u2', 'Two', 'open'], ['u1', 'One', 'done']]
+
+
+def _factory(expiry=None):
+    factory = SheetsClientFactory()
+    # Pre-seeded credentials: no credentials.json lookup and no refresher thread
+    factory._creds = Credentials(token='token', expiry=expiry)
+    return factory
+
+
+def test_factory_builds_once_and_uses_per_thread_http():
+    factory = _factory()
+    service = factory.service()
+    assert factory.service() is service
+    here = service.spreadsheets().get(spreadsheetId='sheet1').http
+    other = []
+    worker = threading.Thread(target=lambda: other.append(service.spreadsheets().get(spreadsheetId='sheet1').http))
+    worker.start()
+    worker.join()
+    assert here is factory.thread_http()
+    assert other[0] is not here
+    assert other[0].credentials is here.credentials
+
+
+def test_factory_refreshes_before_expiry():
+    expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=3600)
+    factory = _factory(expiry)
+    assert 3290 < factory.seconds_until_refresh() <= 3300
+    assert _factory().seconds_until_refresh() is None
+
+
+LABEL = ['NO PIPE', '', '']
+
+
+def test_sectioned_upsert_inserts_new_rows_into_their_section(fake, tmp_path):
+    store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    service = GoogleSheetsService()
+    fake.tabs['Production'] = [HEADER, ['u1', 'One', 'open'], ['u1', 'One', 'open'], list(LABEL), ['u2', 'Two', 'open']]
+
+    def upsert():
+        return SectionedUpsertSync(service, service.SPREADSHEET_ID, 'Production', width=3, separators=[LABEL],
+                                   header=HEADER, index_store=store)
+    # Rebuilt from a tab written by the old append mode: the duplicate copy goes away
+    stats = upsert().sync_sections([[['u1', 'One', 'open']], [['u2', 'Two', 'open']]])
+    assert stats == {'updated': 0, 'appended': 0, 'unchanged': 2, 'removed': 1}
+    assert fake.tabs['Production'] == [HEADER, ['u1', 'One', 'open'], LABEL, ['u2', 'Two', 'open'], ['', '', '']]
+
+    fake.calls.clear()
+    assert upsert().upsert_row(['u1', 'One', 'done'])['updated'] == 1
+    assert upsert().upsert_row(['u3', 'Three', 'open'], section=0)['appended'] == 1
+    assert fake.tabs['Production'][:5] == [HEADER, ['u1', 'One', 'done'], ['u3', 'Three', 'open'], LABEL,
+                                           ['u2', 'Two', 'open']]
+    # An unchanged row costs no call at all
+    calls = len(fake.calls)
+    assert upsert().upsert_row(['u3', 'Three', 'open'])['unchanged'] == 1
+    assert len(fake.calls) == calls
+
+
+def test_sectioned_sync_without_prune_keeps_unlisted_rows(fake, tmp_path):
+    store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    service = GoogleSheetsService()
+
+    def upsert():
+        return SectionedUpsertSync(service, service.SPREADSHEET_ID, 'Production', width=3, separators=[LABEL],
+                                   header=HEADER, index_store=store)
+    upsert().sync_sections([[['u1', 'One', 'open'], ['u2', 'Two', 'open']], [['u3', 'Three', 'open']]])
+    stats = upsert().sync_sections([[['u1', 'One', 'done']], []], prune=False)
+    assert stats == {'updated': 1, 'appended': 0, 'unchanged': 2, 'removed': 0}
+    assert fake.tabs['Production'] == [HEADER, ['u1', 'One', 'done'], ['u2', 'Two', 'open'], LABEL,
+                                       ['u3', 'Three', 'open']]
+
+
+def test_upsert_rebuilds_index_when_rows_were_added_below_it(fake, tmp_path):
+    store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    service = GoogleSheetsService()
+    _upsert(service, store).sync([['u1', 'One', 'open'], ['u2', 'Two', 'open']])
+    fake.tabs['Production'].append(['u9', 'Stray', 'open'])
+    stats = _upsert(service, store).sync([['u1', 'One', 'done'], ['u2', 'Two', 'open']])
+    assert stats['removed'] == 1
+    assert fake.tabs['Production'] == [HEADER, ['u1', 'One', 'done'], ['u2', 'Two', 'open'], ['', '', '']]
+
+
+def test_sectioned_sync_finds_rows_added_below_the_layout(fake, tmp_path):
+    store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    service = GoogleSheetsService()
+
+    def upsert():
+        return SectionedUpsertSync(service, service.SPREADSHEET_ID, 'Production', width=3, separators=[LABEL],
+                                   header=HEADER, index_store=store)
+    upsert().sync_sections([[['u1', 'One', 'open']], [['u2', 'Two', 'open']]])
+    fake.tabs['Production'].append(['u9', 'Stray', 'open'])
+    stats = upsert().sync_sections([[['u1', 'One', 'open'], ['u3', 'Three', 'open']], [['u2', 'Two', 'open']]])
+    assert stats == {'updated': 0, 'appended': 1, 'unchanged': 2, 'removed': 1}
+    assert fake.tabs['Production'] == [HEADER, ['u1', 'One', 'open'], ['u3', 'Three', 'open'], LABEL,
+                                       ['u2', 'Two', 'open']]
@@ -0,0 +1,130 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+from clickup_service import ClickUpService
+from models import TaskRecord
+from sync_daemon import SyncDaemon, parse_intervals
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingClickUp(ClickUpService):
+    """ClickUpService with the network parts replaced by a mutable in-memory snapshot"""
+
+    def __init__(self, tasks):
+        super().__init__()
+        self.tasks = tasks
+        self.fetches = 0
+        self.exports = []
+
+    def fetch_task_snapshot(self):
+        self.fetches += 1
+        return list(self.tasks)
+
+    def export_single_client_to_spreadsheet(self, client_name, client_tasks=None):
+        self.exports.append((client_name, sorted(t.id for t in client_tasks)))
+        return True
+
+    def export_issues_to_production(self):
+        self.exports.append(('production', None))
+        return True
+
+    def resync_all(self):
+        self.resyncs = getattr(self, 'resyncs', 0) + 1
+        return list(self.tasks)
+
+
+def task(task_id, name, severity='normal', updated=1, board_id='75793048'):
+    return TaskRecord(task_id, name=name, severity=severity, date_updated=updated, board_id=board_id)
+
+
+def make_daemon(tasks, **kwargs):
+    clickup = RecordingClickUp(tasks)
+    clock = FakeClock()
+    options = dict(default_client_interval=300, production_interval=600, urgent_interval=60,
+                   full_resync_interval=0, jitter=0.1, snapshot_max_age=30, clock=clock, seed=7)
+    options.update(kwargs)
+    return SyncDaemon(clickup=clickup, **options), clickup, clock
+
+
+def test_parse_intervals():
+    assert parse_intervals('Dirt Vision=300, Yahoo=1800,bad') == {'Dirt Vision': 300.0, 'Yahoo': 1800.0}
+    assert parse_intervals(None) == {}
+
+
+def test_per_client_intervals_and_jitter_bounds():
+    daemon, _, clock = make_daemon([], client_intervals={'Yahoo': 1800})
+    assert daemon.jobs['clickup:Yahoo'].interval == 1800
+    assert daemon.jobs['clickup:Wurl'].interval == 300
+    for _ in range(50):
+        job = daemon.jobs['clickup:Wurl']
+        job.schedule(clock.now, daemon.rng)
+        assert clock.now + 270 <= job.next_run <= clock.now + 330
+
+
+def test_clients_due_together_share_one_fetch():
+    tasks = [task('1', 'Yahoo | Down'), task('2', 'Wurl | Slow')]
+    daemon, clickup, clock = make_daemon(tasks, urgent_interval=0)
+    ran = daemon.run_pending()
+    assert 'clickup:Yahoo' in ran and 'clickup:Wurl' in ran and 'clickup:production' in ran
+    assert clickup.fetches == 1
+    assert ('Yahoo', ['1']) in clickup.exports
+
+    # Nothing is due until the shortest interval (minus jitter) has passed
+    clock.now += 100
+    assert daemon.run_pending() == []
+    clock.now += 300
+    daemon.run_pending()
+    assert clickup.fetches == 2
+
+
+def test_urgent_change_expedites_only_affected_jobs():
+    tasks = [task('1', 'Yahoo | Down', severity='urgent'), task('2', 'Wurl | Slow')]
+    daemon, clickup, clock = make_daemon(tasks)
+    daemon.run_pending()
+    clickup.exports.clear()
+
+    # First urgent pass only learns the current state; an untouched ticket changes nothing
+    clock.now += 61
+    assert daemon.check_urgent() == []
+
+    tasks[0] = task('1', 'Yahoo | Down', severity='urgent', updated=2)
+    tasks[1] = task('2', 'Wurl | Slow', updated=2)
+    assert daemon.check_urgent() == ['clickup:Yahoo', 'clickup:production']
+    daemon.run_pending()
+    assert [name for name, _ in clickup.exports] == ['Yahoo', 'production']
+
+
+def test_failing_job_is_rescheduled_and_others_still_run():
+    daemon, clickup, clock = make_daemon([task('1', 'Yahoo | Down')], urgent_interval=0)
+
+    def boom():
+        raise RuntimeError('sheets down')
+    daemon.jobs['clickup:production'].action = boom
+
+    ran = daemon.run_pending()
+    assert 'clickup:production' in ran and 'clickup:Yahoo' in ran
+    job = daemon.jobs['clickup:production']
+    assert job.failures == 1 and job.last_error == 'sheets down'
+    assert job.next_run > clock.now
+
+
+def test_full_resync_replaces_snapshot_and_runs_every_clickup_export():
+    tasks = [task('1', 'Yahoo | Down'), task('2', 'Wurl | Slow')]
+    daemon, clickup, clock = make_daemon(tasks, urgent_interval=0, full_resync_interval=86400)
+    daemon.run_pending()
+    clickup.exports.clear()
+
+    # A task deleted in ClickUp only leaves the snapshot through a full refetch
+    del tasks[1]
+    clock.now += 100
+    daemon.full_resync()
+    assert clickup.resyncs == 2 and [t.id for t in daemon.snapshot()] == ['1']
+    daemon.run_pending()
+    assert ('Wurl', []) in clickup.exports and ('production', None) in clickup.exports
@@ -0,0 +1,20 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+import pytest
+from sync_state import SyncStateStore
+
+
+def test_replace_records_swaps_the_scope(tmp_path):
+    store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    store.upsert_records('clickup', 'L1', {'a': {'id': 'a'}, 'b': {'id': 'b'}})
+    store.replace_records('clickup', 'L1', {'c': {'id': 'c'}})
+    assert store.load_records('clickup', 'L1') == [{'id': 'c'}]
+
+
+def test_failed_replace_keeps_the_old_records(tmp_path):
+    store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    store.upsert_records('clickup', 'L1', {'a': {'id': 'a'}})
+    with pytest.raises(TypeError):
+        store.replace_records('clickup', 'L1', {'b': {'id': object()}})
+    assert store.load_records('clickup', 'L1') == [{'id': 'a'}]
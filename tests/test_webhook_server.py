@@ -0,0 +1,182 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+import hmac
+import json
+import hashlib
+import urllib.request
+import urllib.error
+import threading
+import pytest
+from fake_sheets import FakeSheetsService
+from clickup_service import ClickUpService
+from sheets_service import GoogleSheetsService
+from sync_state import SyncStateStore
+from webhook_server import (WebhookProcessor, WebhookWorker, make_server, default_sheets_factory,
+                            verify_signature, WEBHOOK_PATH)
+
+YAHOO_SHEET = ClickUpService.CLIENT_SPREADSHEET_IDS['Yahoo']
+
+# Recorded ClickUp webhook bodies (trimmed to the fields we read)
+STATUS_UPDATED = {
+    'event': 'taskStatusUpdated',
+    'task_id': '86a1b2c3',
+    'webhook_id': 'wh-1',
+    'history_items': [{'id': '1', 'field': 'status', 'before': {'status': 'open'}, 'after': {'status': 'in progress'}}],
+}
+DESCRIPTION_UPDATED = {
+    'event': 'taskUpdated',
+    'task_id': '86a1b2c3',
+    'webhook_id': 'wh-1',
+    'history_items': [{'id': '2', 'field': 'content', 'before': 'old', 'after': 'new'}],
+}
+LIST_CREATED = {'event': 'listCreated', 'list_id': '901', 'webhook_id': 'wh-1'}
+
+
+class _FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._data
+
+
+class _TaskHttp:
+    """Serves /task/{id} from a dict of raw tasks; counts task fetches"""
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.task_calls = 0
+
+    def get(self, url, headers=None, params=None):
+        if url.endswith('/field'):
+            return _FakeResponse({'fields': []})
+        self.task_calls += 1
+        return _FakeResponse(self.tasks[url.rsplit('/', 1)[1]])
+
+
+def raw_task(status='open', priority='high', task_id='86a1b2c3', name='Yahoo | Feed down'):
+    return {
+        'id': task_id, 'name': name, 'url': f'https://app.clickup.com/t/{task_id}',
+        'status': {'status': status}, 'priority': {'priority': priority}, 'date_updated': '1700000000000',
+        'list': {'id': '75793048'},
+        'custom_fields': [{'id': 'f-email', 'name': 'Work email address?', 'value': 'ops@yahoo.com'}],
+    }
+
+
+@pytest.fixture
+def setup(monkeypatch, tmp_path):
+    monkeypatch.delenv('SHEETS_METADATA_TTL', raising=False)
+    fakes = {}
+
+    def sheets_factory(spreadsheet_id=None):
+        # The production spreadsheet has its tab; client spreadsheets get theirs from ensure_tab
+        fake = fakes.setdefault(spreadsheet_id, FakeSheetsService({'production': []} if spreadsheet_id is None else {}))
+        monkeypatch.setattr(GoogleSheetsService, '_authenticate', lambda self: fake)
+        return default_sheets_factory(spreadsheet_id)
+
+    clickup = ClickUpService()
+    clickup.http = _TaskHttp({'86a1b2c3': raw_task()})
+    clickup.state_store = SyncStateStore(str(tmp_path / 'state.sqlite3'))
+    return WebhookProcessor(clickup, sheets_factory), clickup, fakes
+
+
+def test_status_update_upserts_client_and_production_rows(setup):
+    processor, clickup, fakes = setup
+    result = processor.process(STATUS_UPDATED)
+    assert result['action'] == 'synced'
+    assert set(result['targets']) == {'Yahoo', 'production'}
+
+    client_rows = fakes[YAHOO_SHEET].tabs['Production']
+    assert client_rows[0] == ClickUpService.CLIENT_HEADERS
+    assert client_rows[1][:3] == ['Yahoo', 'https://app.clickup.com/t/86a1b2c3', 'Feed down']
+    assert len(fakes[None].tabs['production']) == 2
+
+    # Only the changed row is rewritten, in place
+    clickup.http.tasks['86a1b2c3'] = raw_task(status='closed')
+    result = processor.process(STATUS_UPDATED)
+    assert result['targets']['Yahoo'] == {'updated': 1, 'appended': 0, 'unchanged': 0, 'removed': 0}
+    assert len(fakes[YAHOO_SHEET].tabs['Production']) == 3
+
+
+def test_repeated_event_writes_nothing(setup):
+    processor, clickup, fakes = setup
+    processor.process(STATUS_UPDATED)
+    for fake in fakes.values():
+        fake.calls.clear()
+    result = processor.process(STATUS_UPDATED)
+    assert result['targets']['Yahoo'] == {'updated': 0, 'appended': 0, 'unchanged': 1, 'removed': 0}
+    assert not any(call[0] == 'values.batchUpdate' for fake in fakes.values() for call in fake.calls)
+
+
+def test_irrelevant_events_make_no_api_calls(setup):
+    processor, clickup, fakes = setup
+    assert processor.process(DESCRIPTION_UPDATED)['action'] == 'skipped'
+    assert processor.process(LIST_CREATED)['action'] == 'ignored'
+    assert clickup.http.task_calls == 0 and fakes == {}
+
+
+def test_new_task_goes_above_the_no_pipe_label(setup):
+    processor, clickup, fakes = setup
+    processor.process(STATUS_UPDATED)
+    clickup.http.tasks['t2'] = raw_task(task_id='t2', name='Yahoo | Slow start')
+    processor.process({'event': 'taskCreated', 'task_id': 't2'})
+    links = [row[1] for row in fakes[YAHOO_SHEET].tabs['Production']]
+    assert links == ['Ticket ID/Link', 'https://app.clickup.com/t/86a1b2c3', 'https://app.clickup.com/t/t2', '']
+    assert fakes[YAHOO_SHEET].tabs['Production'][3] == ClickUpService.NO_PIPE_LABEL_ROW
+
+
+def test_update_cleans_up_copies_left_by_append_exports(setup):
+    processor, clickup, fakes = setup
+    old_row = clickup.format_rows([clickup.get_task('86a1b2c3')])[0]
+    fakes[YAHOO_SHEET] = FakeSheetsService({'Production': [
+        ClickUpService.CLIENT_HEADERS, list(old_row), list(ClickUpService.NO_PIPE_LABEL_ROW),
+        ClickUpService.CLIENT_HEADERS, list(old_row), list(ClickUpService.NO_PIPE_LABEL_ROW),
+    ]})
+    clickup.http.tasks['86a1b2c3'] = raw_task(status='closed')
+    assert processor.process(STATUS_UPDATED)['targets']['Yahoo']['updated'] == 1
+    rows = fakes[YAHOO_SHEET].tabs['Production']
+    assert [row[4] for row in rows if row[1].startswith('https://')] == ['closed']
+
+
+def test_append_mode_client_tabs_are_left_alone(setup):
+    processor, clickup, fakes = setup
+    clickup.client_mode = 'append'
+    assert set(processor.process(STATUS_UPDATED)['targets']) == {'production'}
+    assert YAHOO_SHEET not in fakes
+
+
+def test_append_mode_production_tab_is_left_alone(setup):
+    processor, clickup, fakes = setup
+    clickup.production_mode = 'append'
+    assert set(processor.process(STATUS_UPDATED)['targets']) == {'Yahoo'}
+    assert None not in fakes
+
+
+def test_server_verifies_signature_and_queues_events(setup):
+    processor, clickup, fakes = setup
+    worker = WebhookWorker(processor)
+    server = make_server(worker, port=0, secret='s3cret')
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}{WEBHOOK_PATH}"
+    body = json.dumps(STATUS_UPDATED).encode('utf-8')
+    try:
+        request = urllib.request.Request(url, data=body, headers={'X-Signature': 'bad'})
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request)
+        assert error.value.code == 401
+
+        signature = hmac.new(b's3cret', body, hashlib.sha256).hexdigest()
+        assert verify_signature('s3cret', body, signature)
+        request = urllib.request.Request(url, data=body, headers={'X-Signature': signature})
+        with urllib.request.urlopen(request) as response:
+            assert json.loads(response.read()) == {'queued': True}
+        worker.join()
+        assert worker.stats['synced'] == 1
+        assert len(fakes[YAHOO_SHEET].tabs['Production']) == 3
+    finally:
+        server.shutdown()
+        server.server_close()